@@ -0,0 +1,115 @@
+"""
+SafeZonePH Area Index
+Inverted index from a city, or a barangay within its city, to the users who live
+there. It is stored in the database and kept in step with users rows from session
+hooks, so finding an alert's recipients is an indexed lookup rather than a scan of
+every profile.
+"""
+
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy import Table, event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# Areas that address every resident rather than a named place
+ALL_AREAS = {"all", "all areas", "all barangays"}
+
+_AREA_PREFIX = re.compile(r"^(?:brgy\.?|barangay|city of)\s+")
+_AREA_SUFFIX = re.compile(r"\s+city$")
+
+
+def area_key(name: Optional[str]) -> Optional[str]:
+    """Normalized lookup key, so "Brgy. San Miguel" matches a profile saying "san miguel"."""
+    if not name:
+        return None
+    key = " ".join(name.casefold().split())
+    key = _AREA_SUFFIX.sub("", _AREA_PREFIX.sub("", key))
+    return key or None
+
+
+def barangay_key(city: Optional[str], barangay: Optional[str]) -> Optional[str]:
+    """Key of a barangay within its city ("pasig|san miguel"). Barangay names repeat
+    across cities, so only a barangay with no known city is keyed by name alone."""
+    city_key, name_key = area_key(city), area_key(barangay)
+    if name_key is None:
+        return None
+    return f"{city_key}|{name_key}" if city_key else name_key
+
+
+def user_area_keys(city: Optional[str], barangay: Optional[str]) -> set[str]:
+    """Keys a user is found under: their city and their barangay within it"""
+    return {key for key in (area_key(city), barangay_key(city, barangay)) if key is not None}
+
+
+def alert_area_keys(area: str, home_city: Optional[str] = None) -> set[str]:
+    """Keys an alert's affected area reaches. "San Miguel, Pasig" is a barangay in a
+    city. A bare name is a city, or a barangay in the alert's home city, or one whose
+    residents gave no city."""
+    if "," in area:
+        barangay, _, city = area.rpartition(",")
+        key = barangay_key(city, barangay)
+        return {key} if key is not None else set()
+    return {key for key in (area_key(area), barangay_key(home_city, area)) if key is not None}
+
+
+def covers_everyone(areas: Iterable[str]) -> bool:
+    return any(area_key(area) in ALL_AREAS for area in areas)
+
+
+class AreaIndex:
+    """Maintains table (area, user_id) from the city / barangay of users rows.
+
+    Rows are rewritten inside the flushing transaction, so the index commits or
+    rolls back with the profile change that caused it, on every worker at once.
+    """
+
+    def __init__(self, table: Table, user_model, fields: tuple[str, str] = ("city", "barangay")):
+        self.table = table
+        self.user_model = user_model
+        self.fields = fields
+
+    def _keys(self, user) -> set[str]:
+        return user_area_keys(*(getattr(user, field) for field in self.fields))
+
+    def install(self, session_class: type[Session]):
+        @event.listens_for(session_class, "after_flush")
+        def reindex_flushed_users(session, flush_context):
+            changes = {}
+            for obj in session.new:
+                if isinstance(obj, self.user_model):
+                    changes[obj.id] = self._keys(obj)
+            for obj in session.dirty:
+                if isinstance(obj, self.user_model):
+                    state = inspect(obj)
+                    if any(state.attrs[field].history.has_changes() for field in self.fields):
+                        changes[obj.id] = self._keys(obj)
+            for obj in session.deleted:
+                if isinstance(obj, self.user_model):
+                    changes[obj.id] = set()
+            if changes:
+                self.write(session.connection(), changes)
+
+    def write(self, conn: Connection, changes: dict[int, set[str]]):
+        """Replace the index rows of each user id with the given keys"""
+        conn.execute(self.table.delete().where(self.table.c.user_id.in_(list(changes))))
+        rows = [{"area": key, "user_id": user_id} for user_id, keys in changes.items() for key in keys]
+        if rows:
+            conn.execute(self.table.insert(), rows)
+
+    def recipients(self, db: Session, areas: Iterable[str], after_id: int, limit: int,
+                   home_city: Optional[str] = None) -> list[int]:
+        """Next `limit` user ids above after_id living in any of areas, ascending.
+        Bare barangay names are looked up in home_city (see alert_area_keys)."""
+        areas = list(areas)
+        if covers_everyone(areas):
+            user_id = self.user_model.id
+            query = select(user_id).where(user_id > after_id)
+        else:
+            keys = set().union(*(alert_area_keys(area, home_city) for area in areas))
+            if not keys:
+                return []
+            user_id = self.table.c.user_id
+            query = select(user_id).where(self.table.c.area.in_(keys), user_id > after_id).distinct()
+        return list(db.execute(query.order_by(user_id).limit(limit)).scalars())
@@ -0,0 +1,257 @@
+"""
+SafeZonePH In-Process Caches
+Small thread-safe LRU caches with per-entry expiry, and a byte-bounded cache of
+rendered responses with an optional on-disk tier shared by a host's workers.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Response
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a time-to-live"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# ==========================================
+# RESPONSE CACHE
+# ==========================================
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    media_type: str
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.media_type)
+
+
+class ByteLRUCache:
+    """LRU cache bounded by the total size of its entries rather than their count"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class DiskCache:
+    """One file per key under a directory the workers on a host share. Writes are
+    atomic renames, so no reader sees a partial body; every trim_every writes the
+    directory is trimmed back to max_bytes, oldest files first."""
+
+    def __init__(self, directory: str, max_bytes: int, trim_every: int = 64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.trim_every = trim_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        media_type, _, body = data.partition(b"\n")
+        return CachedResponse(body=body, media_type=media_type.decode())
+
+    def set(self, key: str, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry.media_type.encode() + b"\n" + entry.body)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            return  # The disk tier is best effort
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.trim_every == 0
+        if due:
+            self.trim()
+
+    def trim(self):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def stats(self) -> dict:
+        return {"directory": self.directory, "max_bytes": self.max_bytes}
+
+
+class ResponseCache:
+    """Rendered response bodies: memory first, then disk (promoting hits back into
+    memory), then render(). Callers put a version in the key, so a write invalidates
+    by moving the key rather than deleting entries; superseded bodies age out."""
+
+    def __init__(self, memory: ByteLRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    def _count(self, tier: Optional[str]):
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    def fetch(self, key: str, render: Callable[[], Response]) -> Response:
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count("memory")
+            return Response(content=entry.body, media_type=entry.media_type)
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self._count("disk")
+                self.memory.set(key, entry)
+                return Response(content=entry.body, media_type=entry.media_type)
+
+        self._count(None)
+        response = render()
+        if response.status_code == 200:
+            entry = CachedResponse(body=bytes(response.body), media_type=response.media_type)
+            self.memory.set(key, entry)
+            if self.disk is not None:
+                self.disk.set(key, entry)
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"hits": dict(self.hits), "misses": self.misses}
+        stats["memory"] = self.memory.stats()
+        stats["disk"] = self.disk.stats() if self.disk is not None else None
+        return stats
+
+
+def response_cache_from_env() -> Optional[ResponseCache]:
+    """RESPONSE_CACHE_MAX_BYTES=0 turns the cache off; RESPONSE_CACHE_DIR adds the disk tier"""
+    max_bytes = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    if max_bytes <= 0:
+        return None
+    directory = os.getenv("RESPONSE_CACHE_DIR")
+    disk = None
+    if directory:
+        disk = DiskCache(directory, int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)))
+    return ResponseCache(ByteLRUCache(max_bytes), disk)
@@ -0,0 +1,206 @@
+"""
+SafeZonePH Check-In Monitor
+Server-side detection of missed buddy check-ins. Every active session's next
+deadline sits in a hashed timer wheel, rescheduled as sessions are committed,
+so nothing polls the buddy_sessions table and a dead phone still raises an alert.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# How long a sweep that failed (database unavailable, say) waits before retrying its sessions
+RETRY_SECONDS = 30
+
+
+def to_timestamp(value: datetime) -> float:
+    """Naive UTC datetime (as stored) -> seconds since the epoch"""
+    return (value - EPOCH).total_seconds()
+
+
+def next_deadline(last_check_in: Optional[datetime], missed_alert_at: Optional[datetime],
+                  interval_minutes: Optional[int]) -> Optional[datetime]:
+    """When the session is next overdue: one interval after the later of the last
+    check-in and the last missed-check-in alert"""
+    baseline = max((value for value in (last_check_in, missed_alert_at) if value is not None), default=None)
+    if baseline is None or not interval_minutes:
+        return None
+    return baseline + timedelta(minutes=interval_minutes)
+
+
+class TimerWheel:
+    """Hashed timer wheel: O(1) schedule / cancel, and each tick only looks at one slot.
+
+    A timer lands in slot (deadline tick % slots) and keeps its absolute tick, so
+    timers further out than one revolution simply wait in their slot until a pass
+    reaches their tick.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: list[dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._timers: dict[Hashable, tuple[int, float]] = {}  # key -> (tick, deadline)
+        self._cursor: Optional[int] = None  # last tick advanced through
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Set (or move) key's timer to fire at deadline (seconds since the epoch)"""
+        self.cancel(key)
+        tick = int(deadline // self.tick)
+        if self._cursor is not None and tick <= self._cursor:
+            tick = self._cursor + 1  # Already due: fire on the next advance
+        self._wheel[tick % self.slots][key] = tick
+        self._timers[key] = (tick, deadline)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._wheel[timer[0] % self.slots][key]
+        return True
+
+    def advance(self, now: float) -> list[tuple[Hashable, float]]:
+        """Remove and return (key, deadline) for every timer due at or before now"""
+        target = int(now // self.tick)
+        if self._cursor is None:
+            # First advance: anything scheduled before the wheel started is due
+            self._cursor = min((tick for tick, _ in self._timers.values()), default=target) - 1
+        if target <= self._cursor:
+            return []
+        # One pass over every slot is enough however far behind the wheel is
+        ticks = range(self._cursor + 1, target + 1)
+        if len(ticks) > self.slots:
+            ticks = range(target - self.slots + 1, target + 1)
+        expired = []
+        for tick in ticks:
+            slot = self._wheel[tick % self.slots]
+            due = [key for key, timer_tick in slot.items() if timer_tick <= target]
+            for key in due:
+                del slot[key]
+                expired.append((key, self._timers.pop(key)[1]))
+        self._cursor = target
+        return expired
+
+
+class CheckInMonitor:
+    """Keeps a TimerWheel of active buddy sessions and hands overdue ones to on_missed.
+
+    The wheel is only a schedule, never the authority: on_missed(session_ids) must
+    atomically claim each alert against the database and return the sessions that
+    still need a timer with their new deadlines. A stale timer (a check-in made on
+    another worker, a session ended while loading) therefore just costs one
+    conditional UPDATE and a reschedule.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[..., Iterable[tuple]],
+        on_missed: Callable[[list[int]], Awaitable[Iterable[tuple[int, Optional[datetime]]]]],
+        tick: float = 1.0,
+        slots: int = 512,
+    ):
+        # loader(db) yields (session_id, last_check_in, missed_alert_at, check_in_interval) for active sessions
+        self._loader = loader
+        self._on_missed = on_missed
+        self._lock = threading.Lock()
+        self._wheel = TimerWheel(tick=tick, slots=slots)
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._wheel)
+
+    def schedule(self, session_id: int, deadline: Optional[datetime]):
+        with self._lock:
+            if deadline is None:
+                self._wheel.cancel(session_id)
+            else:
+                self._wheel.schedule(session_id, to_timestamp(deadline))
+
+    def cancel(self, session_id: int):
+        with self._lock:
+            self._wheel.cancel(session_id)
+
+    def load(self, db) -> int:
+        """Rebuild the schedule from the database (on startup). Timers set by commits
+        that landed while loading are newer than the snapshot and are kept."""
+        count = 0
+        for session_id, last_check_in, missed_alert_at, interval in self._loader(db):
+            deadline = next_deadline(last_check_in, missed_alert_at, interval)
+            if deadline is None:
+                continue
+            with self._lock:
+                if session_id not in self._wheel:
+                    self._wheel.schedule(session_id, to_timestamp(deadline))
+                    count += 1
+        return count
+
+    def due(self, now: Optional[float] = None) -> list[int]:
+        with self._lock:
+            expired = self._wheel.advance(to_timestamp(datetime.utcnow()) if now is None else now)
+        return [session_id for session_id, _ in expired]
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        session_ids = self.due(now)
+        if not session_ids:
+            return 0
+        try:
+            rescheduled = await self._on_missed(session_ids)
+        except Exception:
+            retry_at = datetime.utcnow() + timedelta(seconds=RETRY_SECONDS)
+            with self._lock:
+                for session_id in session_ids:
+                    if session_id not in self._wheel:
+                        self._wheel.schedule(session_id, to_timestamp(retry_at))
+            raise
+        for session_id, deadline in rescheduled:
+            if deadline is not None:
+                self.schedule(session_id, deadline)
+        self.fired += len(session_ids)
+        return len(session_ids)
+
+    async def _run(self, load: Callable[[], Awaitable[int]]):
+        while True:
+            try:
+                loaded = await load()
+                break
+            except Exception:
+                logger.exception("loading active buddy sessions failed")
+                await asyncio.sleep(RETRY_SECONDS)
+        logger.info("check-in monitor tracking %d active buddy sessions", loaded)
+        interval = self._wheel.tick
+        while True:
+            started = time.monotonic()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("missed check-in sweep failed")
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def start(self, load: Callable[[], Awaitable[int]]):
+        """Run the monitor on the current event loop; load() populates it first"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(load))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
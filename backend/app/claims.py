@@ -0,0 +1,58 @@
+"""
+SafeZonePH Claims
+Race-free writes for contended rows. A counter bump or a status claim is one
+conditional UPDATE ... RETURNING, so concurrent requests never read a stale value
+and write it back; one-per-user actions are guarded by a unique record inserted
+with ON CONFLICT DO NOTHING. Neither holds a lock beyond its own statement.
+Databases without those clauses fall back to a savepoint insert and a locked
+read-then-update.
+"""
+
+import importlib
+
+from sqlalchemy import Table, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Imported on first use, so only the dialect in use is ever loaded
+_DIALECT_INSERTS = {"postgresql": "sqlalchemy.dialects.postgresql", "sqlite": "sqlalchemy.dialects.sqlite"}
+
+
+def insert_once(db: Session, table: Table, **values) -> bool:
+    """Insert the row unless its key already exists; True if this call inserted it"""
+    module = _DIALECT_INSERTS.get(db.connection().dialect.name)
+    if module is None:
+        # No ON CONFLICT clause here: insert in a savepoint and read a key clash as "already there"
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(**values))
+        except IntegrityError:
+            return False
+        return True
+    dialect_insert = importlib.import_module(module).insert
+    return db.execute(dialect_insert(table).values(**values).on_conflict_do_nothing()).rowcount == 1
+
+
+def claim(db: Session, model, criteria: list, values: dict):
+    """UPDATE model SET values WHERE criteria, as a single statement.
+
+    Returns the updated row (loaded from RETURNING, so the session sees the new
+    values), or None when no row matched: missing, or already claimed / closed.
+    values may reference the row's own columns (n = n + 1); they read the row as
+    it is when the statement runs, not as it was loaded.
+    """
+    statement = update(model).where(*criteria).values(**values)
+    if db.connection().dialect.update_returning:
+        return db.execute(
+            statement.returning(model), execution_options={"synchronize_session": "fetch"}
+        ).scalar_one_or_none()
+    # No UPDATE ... RETURNING (MySQL): lock the matching row, update it and reload it
+    row = db.query(model).filter(*criteria).with_for_update().one_or_none()
+    if row is not None:
+        db.execute(statement, execution_options={"synchronize_session": False})
+        db.refresh(row)
+    return row
+
+
+def exists(db: Session, model, row_id: int) -> bool:
+    return db.query(model.id).filter(model.id == row_id).first() is not None
@@ -0,0 +1,288 @@
+"""
+SafeZonePH Database Engines and Sessions
+Engines are built from per-backend tuning profiles (SQLite pragmas, pool sizing)
+with instrumented pools. The opt-in async mode points DATABASE_URL at an async
+driver (sqlite+aiosqlite://, postgresql+asyncpg://) and serves requests from an
+AsyncSession on the event loop instead of a threadpool thread per blocked query.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+# Async driver -> the sync driver used for migrations and tooling on the same database
+ASYNC_DRIVERS = {
+    "aiosqlite": "pysqlite",
+    "asyncpg": "psycopg2",
+    "psycopg_async": "psycopg",
+    "aiomysql": "pymysql",
+}
+
+
+class AppSession(Session):
+    """Session class shared by both modes, so session event hooks registered on it
+    fire for plain sync sessions and for the sync session inside an AsyncSession"""
+
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).get_driver_name() in ASYNC_DRIVERS
+
+
+def sync_url(url: str) -> str:
+    """Same database, addressed through the matching sync driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_driver_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if make_url(url).get_backend_name() == "sqlite" else {}
+
+
+# ==========================================
+# TUNING PROFILES
+# ==========================================
+
+# Pool defaults per backend; DB_POOL_* env vars override any of them
+POOL_PROFILES = {
+    # One writer at a time, but WAL lets readers run alongside it on their own connections
+    "sqlite": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": -1, "pool_pre_ping": False},
+    # Recycle below typical server/proxy idle timeouts and ping before reusing a connection
+    "postgresql": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+}
+DEFAULT_POOL_PROFILE = POOL_PROFILES["postgresql"]
+
+POOL_ENV = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT_SECONDS", float),
+    "pool_recycle": ("DB_POOL_RECYCLE_SECONDS", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda value: value.lower() == "true"),
+}
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMAs applied to every new SQLite connection"""
+    return {
+        # Readers no longer block on the writer (and vice versa)
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        # Durable at checkpoints, which is safe in WAL mode and skips an fsync per commit
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Wait for the write lock instead of failing with "database is locked"
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE_BYTES", 256 * 1024 * 1024)),
+        # Negative means KiB, so this is a 64 MiB page cache per connection
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024)),
+    }
+
+
+def pool_options(backend: str) -> dict:
+    options = dict(POOL_PROFILES.get(backend, DEFAULT_POOL_PROFILE))
+    for option, (env_var, parse) in POOL_ENV.items():
+        value = os.getenv(env_var)
+        if value is not None:
+            options[option] = parse(value)
+    return options
+
+
+def _is_memory_database(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _apply_sqlite_pragmas(engine: Engine, pragmas: dict):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+# ==========================================
+# POOL METRICS
+# ==========================================
+
+class PoolStats:
+    """Checkout counts and time spent waiting for a pooled connection"""
+
+    def __init__(self, samples: int = 1024):
+        self._lock = threading.Lock()
+        self._waits: deque = deque(maxlen=samples)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._waits.append(wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.checkouts + self.timeouts
+
+            def pct(p):
+                return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3) if waits else 0.0
+
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "wait_ms_p50": pct(0.50),
+                "wait_ms_p99": pct(0.99),
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait when the pool is exhausted"""
+
+    stats: PoolStats
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> dict:
+    """Live pool occupancy plus the recorded checkout statistics"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
+
+
+# ==========================================
+# ENGINES
+# ==========================================
+
+def build_engine(url: str) -> Engine:
+    """Sync engine with the backend's tuning profile applied"""
+    parsed = make_url(url)
+    options = {"connect_args": connect_args(url)}
+    if not _is_memory_database(parsed):
+        options.update(pool_options(parsed.get_backend_name()), poolclass=InstrumentedQueuePool)
+    engine = create_engine(url, **options)
+    _instrument(engine, parsed)
+    return engine
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    """Async engine with the same profile. File SQLite gets a real pool instead of
+    aiosqlite's default NullPool (a new connection and thread per checkout)."""
+    parsed = make_url(url)
+    options = {"connect_args": connect_args(url)}
+    if not _is_memory_database(parsed):
+        options.update(pool_options(parsed.get_backend_name()), poolclass=InstrumentedAsyncQueuePool)
+    engine = create_async_engine(url, **options)
+    _instrument(engine.sync_engine, parsed)
+    return engine
+
+
+def _instrument(engine: Engine, url):
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.stats = PoolStats()
+    if url.get_backend_name() == "sqlite":
+        _apply_sqlite_pragmas(engine, sqlite_pragmas())
+
+
+def _session_params(fn) -> list[str]:
+    params = inspect.signature(fn).parameters.values()
+    return [
+        param.name for param in params
+        if isinstance(param.annotation, type) and issubclass(param.annotation, Session)
+    ]
+
+
+def bridge_sync_session(fn):
+    """Wrap a sync handler or dependency taking a Session so it runs on the AsyncSession
+    it is given instead, via run_sync (greenlet on the event loop, no thread).
+
+    The wrapper keeps fn's signature, so FastAPI resolves the same dependencies and
+    simply awaits it. Anything that isn't a sync function taking a Session is returned as is.
+    """
+    if not inspect.isfunction(fn) or inspect.iscoroutinefunction(fn) or inspect.isgeneratorfunction(fn) \
+            or inspect.isasyncgenfunction(fn):
+        return fn
+    session_params = _session_params(fn)
+    if not session_params:
+        return fn
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async_session: AsyncSession = kwargs[session_params[0]]
+
+        def call(sync_session: Session):
+            # Every Session parameter is the same request-scoped get_db session
+            kwargs.update({name: sync_session for name in session_params})
+            return fn(*args, **kwargs)
+
+        return await async_session.run_sync(call)
+
+    return wrapper
+
+
+class AsyncSessionRoute(APIRoute):
+    """Route class for async mode: sync endpoints that take a Session are bridged on registration"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, bridge_sync_session(endpoint), **kwargs)
+
+
+async def run_db(db, fn, *args):
+    """Call fn(session, *args) from an async handler without blocking the event loop:
+    run_sync on an AsyncSession, the threadpool for a sync Session"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
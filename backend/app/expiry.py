@@ -0,0 +1,90 @@
+"""
+SafeZonePH Expiry Sweeper
+Background deactivation of rows whose expiry has passed. The sweeper sleeps until
+the earliest pending expiry (or max_interval, whichever is sooner), and commits
+that introduce an earlier one wake it up, so expired rows flip promptly without
+polling on a short fixed interval.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """Runs sweep() whenever something is due. sweep() deactivates what has expired
+    and returns the next pending expiry (naive UTC), or None if nothing is pending."""
+
+    def __init__(self, sweep: Callable[[], Awaitable[Optional[datetime]]], max_interval: float = 300.0):
+        self._sweep = sweep
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self._next_expiry: Optional[datetime] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+
+    def notify(self, expires_at: Optional[datetime]):
+        """A commit added or moved an expiry; wake the sweeper if it is now the earliest.
+        Safe to call from any thread."""
+        if expires_at is None:
+            return
+        with self._lock:
+            if self._next_expiry is not None and self._next_expiry <= expires_at:
+                return
+            self._next_expiry = expires_at
+            loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            loop.call_soon_threadsafe(wake.set)
+
+    def _seconds_until_due(self) -> float:
+        with self._lock:
+            next_expiry = self._next_expiry
+        if next_expiry is None:
+            return self.max_interval
+        return min(self.max_interval, max(0.0, (next_expiry - datetime.utcnow()).total_seconds()))
+
+    async def sweep_once(self) -> Optional[datetime]:
+        with self._lock:
+            # Expiries notified while sweeping are kept if they are earlier than the result
+            self._next_expiry = None
+        next_expiry = await self._sweep()
+        self.sweeps += 1
+        with self._lock:
+            if next_expiry is not None and (self._next_expiry is None or next_expiry < self._next_expiry):
+                self._next_expiry = next_expiry
+        return next_expiry
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("expiry sweep failed")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._seconds_until_due())
+                # Woken by an earlier expiry: sleep until it is actually due
+                await asyncio.sleep(self._seconds_until_due())
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
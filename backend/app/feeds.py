@@ -0,0 +1,161 @@
+"""
+SafeZonePH Feed Versions
+Per-feed version stamps, bumped in the same transaction as any write to a feed's
+table, so public feeds can answer conditional GETs with 304 Not Modified without
+running their list query. The same stamps version the response cache keys.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Table, event, select
+from sqlalchemy.orm import Session
+
+from cache import ResponseCache
+from serialization import response_format
+
+
+class FeedVersions:
+    """Tracks which tables feed which public lists and keeps their stamps current.
+
+    Stamps live in the database (not in process memory) so every worker and
+    serverless instance agrees on them, and a restart can never reuse an ETag.
+    Read stamps are remembered for stamp_ttl seconds; commits in this process
+    forget them at once, so only writes from other workers can take that long to show.
+    """
+
+    def __init__(self, table: Table, cache: Optional[ResponseCache] = None, stamp_ttl: float = 0.0):
+        self.table = table
+        self.cache = cache
+        self.stamp_ttl = stamp_ttl
+        self._feeds_by_table: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self._stamps: dict[str, tuple[tuple[int, datetime], float]] = {}
+        self._generations: dict[str, int] = {}
+
+    def track(self, model, feed: str):
+        self._feeds_by_table.setdefault(model.__table__.name, set()).add(feed)
+
+    def feeds_for(self, table_name: str) -> set[str]:
+        return self._feeds_by_table.get(table_name, set())
+
+    def install(self, session_class: type[Session]):
+        """Bump stamps from session hooks, so no write path can forget to"""
+
+        @event.listens_for(session_class, "after_flush")
+        def bump_flushed_feeds(session, flush_context):
+            feeds = set()
+            for obj in (*session.new, *session.dirty, *session.deleted):
+                table = getattr(obj, "__table__", None)
+                if table is not None:
+                    feeds |= self.feeds_for(table.name)
+            self.bump(session, feeds)
+
+        @event.listens_for(session_class, "do_orm_execute")
+        def bump_bulk_feeds(orm_execute_state):
+            # query.update() / query.delete() skip the flush entirely
+            if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+                return
+            mapper = orm_execute_state.bind_mapper
+            if mapper is not None:
+                self.bump(orm_execute_state.session, self.feeds_for(mapper.local_table.name))
+
+        @event.listens_for(session_class, "after_commit")
+        def forget_committed_feeds(session):
+            self.forget(session.info.pop("bumped_feeds", ()))
+
+        @event.listens_for(session_class, "after_rollback")
+        def reset_bumped_feeds(session):
+            session.info.pop("bumped_feeds", None)
+
+    def bump(self, session: Session, feeds: Iterable[str]):
+        """Advance the stamps of feeds inside the session's current transaction, once per transaction"""
+        bumped = session.info.setdefault("bumped_feeds", set())
+        pending = set(feeds) - bumped
+        if not pending:
+            return
+        session.connection().execute(
+            self.table.update()
+            .where(self.table.c.feed.in_(pending))
+            .values(version=self.table.c.version + 1, updated_at=datetime.utcnow())
+        )
+        bumped |= pending
+
+    def forget(self, feeds: Iterable[str]):
+        """Drop remembered stamps so the next read sees a just-committed bump"""
+        with self._lock:
+            for feed in feeds:
+                self._stamps.pop(feed, None)
+                self._generations[feed] = self._generations.get(feed, 0) + 1
+
+    def stamp(self, db: Session, feed: str) -> Optional[tuple[int, datetime]]:
+        with self._lock:
+            remembered = self._stamps.get(feed)
+            if remembered is not None and time.monotonic() - remembered[1] < self.stamp_ttl:
+                return remembered[0]
+            generation = self._generations.get(feed, 0)
+
+        row = db.execute(
+            select(self.table.c.version, self.table.c.updated_at).where(self.table.c.feed == feed)
+        ).first()
+        if row is None:
+            return None
+        stamp = tuple(row)
+        with self._lock:
+            # A commit that landed while reading may have bumped past this row
+            if self.stamp_ttl > 0 and self._generations.get(feed, 0) == generation:
+                self._stamps[feed] = (stamp, time.monotonic())
+        return stamp
+
+    def respond(self, request: Request, db: Session, feed: str, render: Callable[[], Response],
+                scope: str = "public") -> Response:
+        """Serve a feed with ETag / Last-Modified, or 304 if the client's copy is current.
+        The stamp is read before render() runs, so a write in between only costs a refetch.
+        scope names whose view this is ("public", or a user id for per-user feeds)."""
+        stamp = self.stamp(db, feed)
+        if stamp is None:
+            return render()
+
+        version, updated_at = stamp
+        # Different pages / filters / viewers / formats of a feed are different representations
+        variant_key = f"{request.url.path}|{scope}|{response_format()}|{sorted(request.query_params.multi_items())}"
+        variant = hashlib.sha1(variant_key.encode()).hexdigest()[:12]
+        headers = {
+            "ETag": f'"{feed}-{version}-{variant}"',
+            "Last-Modified": format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if _not_modified(request, headers["ETag"], updated_at):
+            return Response(status_code=304, headers=headers)
+
+        if self.cache is not None:
+            response = self.cache.fetch(f"{feed}:{version}:{variant_key}", render)
+        else:
+            response = render()
+        response.headers.update(headers)
+        return response
+
+
+def _not_modified(request: Request, etag: str, updated_at: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since and uses weak comparison
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
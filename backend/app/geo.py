@@ -0,0 +1,132 @@
+"""
+SafeZonePH Geo Queries
+"What is near me" lookups for rows with latitude/longitude: a bounding-box
+prefilter on a spatial index (SQLite R*Tree, or a range scan over an indexed
+(latitude, longitude) pair elsewhere), then exact haversine ranking.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, inspect, select
+from sqlalchemy.orm import Session
+
+EARTH_RADIUS_KM = 6371.0088
+
+_numpy = None
+
+
+def load_numpy():
+    """NumPy, imported on first use rather than on the cold-start path; None if not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # Callers fall back to the math module
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    min_lat: float
+    max_lat: float
+    min_lng: float
+    max_lng: float
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> BoundingBox:
+    """Smallest lat/lng box containing every point within radius_km of (lat, lng)"""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle covers a pole, so every longitude is in range
+        return BoundingBox(max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0)
+    delta_lng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180 or max_lng > 180:
+        # Crosses the antimeridian; widen rather than split the box
+        min_lng, max_lng = -180.0, 180.0
+    return BoundingBox(min_lat, max_lat, min_lng, max_lng)
+
+
+def haversine_km(lat: float, lng: float, lats: Sequence[float], lngs: Sequence[float]) -> list[float]:
+    """Great-circle distances from (lat, lng) to each point, vectorized when NumPy is installed"""
+    numpy = load_numpy()
+    if numpy is not None:
+        lat1, lng1 = numpy.radians(lat), numpy.radians(lng)
+        lat2, lng2 = numpy.radians(numpy.asarray(lats, dtype=float)), numpy.radians(numpy.asarray(lngs, dtype=float))
+        a = numpy.sin((lat2 - lat1) / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin((lng2 - lng1) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))).tolist()
+
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    distances = []
+    for point_lat, point_lng in zip(lats, lngs):
+        lat2, lng2 = math.radians(point_lat), math.radians(point_lng)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+def rtree_table(name: str) -> Table:
+    """An R*Tree virtual table of point boxes keyed by the indexed row's id"""
+    return Table(
+        name, MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("min_lat", Float),
+        Column("max_lat", Float),
+        Column("min_lng", Float),
+        Column("max_lng", Float),
+    )
+
+
+class SpatialIndex:
+    """Nearby lookups for one model with latitude / longitude columns.
+
+    If the database has the model's R*Tree table (SQLite builds with the rtree
+    module; kept current by triggers) the box prefilter runs against it. Anywhere
+    else it is a range scan over the (latitude, longitude) index.
+    """
+
+    def __init__(self, model, rtree_name: str):
+        self.model = model
+        self.rtree = rtree_table(rtree_name)
+        self._has_rtree: Optional[bool] = None
+
+    def uses_rtree(self, db: Session) -> bool:
+        if self._has_rtree is None:
+            self._has_rtree = inspect(db.connection()).has_table(self.rtree.name)
+        return self._has_rtree
+
+    def candidates(self, db: Session, box: BoundingBox, *criteria) -> list[tuple]:
+        """(id, latitude, longitude) of every row inside the box matching criteria"""
+        model = self.model
+        query = db.query(model.id, model.latitude, model.longitude).filter(*criteria)
+        if self.uses_rtree(db):
+            # A subquery, so the R*Tree drives the lookup instead of being probed per row.
+            # Its boxes are rounded outward to 32-bit floats; the distance check is exact.
+            rtree = self.rtree
+            return query.filter(model.id.in_(
+                select(rtree.c.id).where(
+                    rtree.c.max_lat >= box.min_lat, rtree.c.min_lat <= box.max_lat,
+                    rtree.c.max_lng >= box.min_lng, rtree.c.min_lng <= box.max_lng,
+                )
+            )).all()
+        return query.filter(
+            model.latitude.between(box.min_lat, box.max_lat),
+            model.longitude.between(box.min_lng, box.max_lng),
+        ).all()
+
+    def nearby(self, db: Session, lat: float, lng: float, radius_km: float, limit: int, *criteria) -> list[tuple[int, float]]:
+        """(id, distance_km) of the closest rows within radius_km, nearest first"""
+        rows = self.candidates(db, bounding_box(lat, lng, radius_km), *criteria)
+        if not rows:
+            return []
+        ids, lats, lngs = zip(*rows)
+        ranked = sorted(
+            (distance, row_id) for row_id, distance in zip(ids, haversine_km(lat, lng, lats, lngs))
+            if distance <= radius_km
+        )
+        return [(row_id, distance) for distance, row_id in ranked[:limit]]
@@ -0,0 +1,328 @@
+"""
+SafeZonePH Leaderboard
+In-memory ordered index of user points, kept current as points are committed,
+so top-N, position and percentile queries never scan the users table. Commits
+made by other processes arrive when the index is reloaded (max_age).
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+MAX_LEVEL = 32
+LEVEL_PROBABILITY = 0.25
+
+GLOBAL_SCOPE = ("global",)
+
+
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.forward: list[Optional["_Node"]] = [None] * level
+        # span[i]: how many positions forward[i] jumps ahead
+        self.span = [0] * level
+
+
+class RankedIndex:
+    """Indexable skip list: insert, remove, rank and select by position in O(log n)"""
+
+    def __init__(self):
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and random.random() < LEVEL_PROBABILITY:
+            level += 1
+        return level
+
+    def insert(self, key):
+        update = [self._head] * MAX_LEVEL
+        rank = [0] * MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                self._head.span[i] = self._size
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            new.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        # Levels above the new node now jump over one more position
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        update = [self._head] * MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        if target is None or target.key != key:
+            return False
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def count_less(self, key) -> int:
+        """Number of keys strictly less than key"""
+        count = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                count += node.span[i]
+                node = node.forward[i]
+        return count
+
+    def slice(self, start: int, count: int) -> list:
+        """Up to count keys starting at 0-based position start"""
+        if start < 0 or start >= self._size or count <= 0:
+            return []
+        target = start + 1
+        traversed = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and traversed + node.span[i] <= target:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == target:
+                break
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.forward[0]
+        return keys
+
+    @classmethod
+    def from_sorted(cls, keys: list) -> "RankedIndex":
+        """Bulk build from distinct keys in ascending order, in O(n)"""
+        index = cls()
+        last = [index._head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        for position, key in enumerate(keys, start=1):
+            level = index._random_level()
+            node = _Node(key, level)
+            for i in range(level):
+                last[i].forward[i] = node
+                last[i].span[i] = position - last_position[i]
+                last[i] = node
+                last_position[i] = position
+            if level > index._level:
+                index._level = level
+        # The last node on each level spans to the end of the list
+        for i in range(MAX_LEVEL):
+            last[i].span[i] = len(keys) - last_position[i]
+        index._size = len(keys)
+        return index
+
+
+def scopes_for(city: Optional[str], barangay: Optional[str]) -> list[tuple]:
+    """Every board a user with this location appears on"""
+    scopes = [GLOBAL_SCOPE]
+    if city:
+        scopes.append(("city", city))
+        if barangay:
+            # Barangay names repeat across cities, so they are qualified by city
+            scopes.append(("barangay", city, barangay))
+    return scopes
+
+
+class Leaderboard:
+    """Per-scope ranked indexes (global, city, barangay), loaded on first use and
+    then updated incrementally. Keys are (-points, user_id): highest points first,
+    ties in a stable order, and users with equal points share a rank.
+
+    Only this process's commits reach update(). With several workers, changes(db,
+    cursor) is polled every refresh_interval seconds for (rows changed since the
+    cursor, new cursor), and changes(db, None) gives the cursor a snapshot starts
+    from; the full snapshot is reloaded once it is max_age seconds old (None:
+    never), for anything the polls can't see. Snapshots are built off to the side
+    and swapped in, so reads and commits never wait on one.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[..., Iterable[tuple]],
+        max_age: Optional[float] = None,
+        changes: Optional[Callable[..., tuple[Iterable[tuple], Any]]] = None,
+        refresh_interval: Optional[float] = None,
+    ):
+        # loader(db) yields (user_id, points, city, barangay) for every user
+        self._loader = loader
+        self._changes = changes
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval if changes is not None else None
+        self._lock = threading.Lock()
+        self._indexes: dict[tuple, RankedIndex] = {}
+        self._members: dict[int, tuple[int, list[tuple]]] = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._cursor = None
+        self._loading = False
+        self._pending: list[tuple] = []
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _due(self) -> Optional[str]:
+        """"load" for a full snapshot, "refresh" for a poll of changes, None if current"""
+        if not self._loaded:
+            return "load"
+        now = time.monotonic()
+        if self.max_age is not None and now - self._loaded_at >= self.max_age:
+            return "load"
+        if self.refresh_interval is not None and now - self._refreshed_at >= self.refresh_interval:
+            return "refresh"
+        return None
+
+    def ensure_loaded(self, db):
+        if self._due() is None:
+            return
+        with self._lock:
+            due = self._due()
+            if due is None or self._loading:
+                return
+            self._loading = True
+            cursor = self._cursor
+        try:
+            if due == "load":
+                if self._changes is not None:
+                    _, cursor = self._changes(db, None)
+                indexes, members = self._build(self._loader(db))
+            else:
+                rows, cursor = self._changes(db, cursor)
+                rows = list(rows)
+        except BaseException:
+            with self._lock:
+                self._loading = False
+                self._pending.clear()
+            raise
+        with self._lock:
+            if due == "load":
+                self._indexes, self._members = indexes, members
+            else:
+                for user_id, points, city, barangay in rows:
+                    self._apply(user_id, points or 0, city, barangay)
+            # Commits that landed while reading are newer than what was read
+            for update in self._pending:
+                self._apply(*update)
+            self._pending.clear()
+            self._cursor = cursor
+            self._loading = False
+            self._loaded = True
+            self._refreshed_at = time.monotonic()
+            if due == "load":
+                self._loaded_at = self._refreshed_at
+
+    @staticmethod
+    def _build(rows: Iterable[tuple]) -> tuple[dict, dict]:
+        """Indexes and members for a snapshot, each index bulk-built from its keys sorted once"""
+        members = {}
+        for user_id, points, city, barangay in rows:
+            members[user_id] = (points or 0, scopes_for(city, barangay))
+        keys: dict[tuple, list] = {}
+        for user_id, (points, scopes) in members.items():
+            for scope in scopes:
+                keys.setdefault(scope, []).append((-points, user_id))
+        return {scope: RankedIndex.from_sorted(sorted(scope_keys)) for scope, scope_keys in keys.items()}, members
+
+    def update(self, user_id: int, points: int, city: Optional[str], barangay: Optional[str]):
+        with self._lock:
+            if self._loaded:
+                self._apply(user_id, points or 0, city, barangay)
+            if self._loading:
+                self._pending.append((user_id, points or 0, city, barangay))
+
+    def remove(self, user_id: int):
+        with self._lock:
+            if self._loaded:
+                self._apply(user_id, None, None, None)
+            if self._loading:
+                self._pending.append((user_id, None, None, None))
+
+    def _apply(self, user_id: int, points: Optional[int], city: Optional[str], barangay: Optional[str]):
+        previous = self._members.pop(user_id, None)
+        if previous is not None:
+            old_points, old_scopes = previous
+            for scope in old_scopes:
+                index = self._indexes[scope]
+                index.remove((-old_points, user_id))
+                if not len(index):
+                    del self._indexes[scope]
+        if points is None:
+            return
+        scopes = scopes_for(city, barangay)
+        for scope in scopes:
+            self._indexes.setdefault(scope, RankedIndex()).insert((-points, user_id))
+        self._members[user_id] = (points, scopes)
+
+    def size(self, scope: tuple = GLOBAL_SCOPE) -> int:
+        with self._lock:
+            index = self._indexes.get(scope)
+            return len(index) if index else 0
+
+    def top(self, scope: tuple = GLOBAL_SCOPE, limit: int = 10, offset: int = 0) -> list[dict]:
+        """Entries at positions [offset, offset + limit) as {rank, user_id, points}"""
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                return []
+            entries = []
+            rank = None
+            previous_points = None
+            for position, (negated_points, user_id) in enumerate(index.slice(offset, limit), start=offset):
+                points = -negated_points
+                if points != previous_points:
+                    # Competition ranking: 1 + number of users with strictly more points
+                    rank = index.count_less((negated_points, 0)) + 1 if rank is None else position + 1
+                    previous_points = points
+                entries.append({"rank": rank, "user_id": user_id, "points": points})
+            return entries
+
+    def position(self, user_id: int, scope: tuple = GLOBAL_SCOPE) -> Optional[dict]:
+        """Rank, total and percentile (share of members with fewer points) of one user in a scope"""
+        with self._lock:
+            member = self._members.get(user_id)
+            index = self._indexes.get(scope)
+            if member is None or index is None or scope not in member[1]:
+                return None
+            points = member[0]
+            total = len(index)
+            at_or_above = index.count_less((-points, float("inf")))
+            return {
+                "rank": index.count_less((-points, 0)) + 1,
+                "points": points,
+                "total": total,
+                "percentile": round(100 * (total - at_or_above) / total, 1),
+            }
@@ -0,0 +1,145 @@
+"""
+SafeZonePH Data Lifecycle
+Retention policies that move cold rows (read notifications, old messages, resolved
+requests, ...) out of the hot tables into archive tables, a small batch per
+transaction, so hot tables and their indexes stay sized to active data. Archived
+rows keep their ids and stay readable through the explicit "older" endpoints.
+"""
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import Column, DateTime, delete, func, literal, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def archive_model(base, model, *indexes):
+    """Declarative twin of model on "<table>_archive": the same columns (ids are
+    kept, not generated) plus archived_at"""
+    table = model.__table__
+    attrs = {
+        "__tablename__": f"{table.name}_archive",
+        "__table_args__": indexes,
+        "archived_at": Column(DateTime, nullable=False),
+    }
+    for column in table.columns:
+        attrs[column.key] = Column(
+            column.name, column.type,
+            primary_key=column.primary_key, autoincrement=False, nullable=column.nullable,
+        )
+    return type(f"{model.__name__}Archive", (base,), attrs)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Rows of model matching cold(cutoff) move to archive once older than max_age"""
+    name: str
+    model: type
+    archive: type
+    max_age: timedelta
+    cold: Callable[[datetime], list]
+
+
+def archive_batch(db: Session, policy: RetentionPolicy, batch_size: int, now: Optional[datetime] = None) -> int:
+    """Move up to batch_size cold rows in one transaction; returns how many moved"""
+    now = now or datetime.utcnow()
+    model = policy.model
+    ids = list(db.execute(
+        select(model.id).where(
+            *policy.cold(now - policy.max_age),
+            # SQLite hands out max(id) + 1 without AUTOINCREMENT; keeping the newest
+            # row means an archived id is never reused by a new hot row
+            model.id < select(func.max(model.id)).scalar_subquery(),
+        ).order_by(model.id).limit(batch_size)
+    ).scalars())
+    if not ids:
+        return 0
+
+    hot, archive = model.__table__, policy.archive.__table__
+    names = [column.name for column in hot.columns]
+    db.execute(archive.insert().from_select(
+        names + ["archived_at"],
+        select(*hot.columns, literal(now, DateTime)).where(hot.c.id.in_(ids)),
+    ))
+    # An ORM delete, so session hooks (feed stamps) see it
+    db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+    db.commit()
+    return len(ids)
+
+
+class LifecycleEngine:
+    """Every interval, archives each policy's cold rows batch by batch.
+
+    run(fn, *args) calls fn(db, *args) on a fresh session (run_in_new_session), so
+    each batch is its own short transaction and writers never wait long behind it.
+    """
+
+    def __init__(
+        self,
+        policies: list[RetentionPolicy],
+        run: Callable[..., Awaitable[int]],
+        interval: float = 3600.0,
+        batch_size: int = 500,
+    ):
+        self.policies = {policy.name: policy for policy in policies}
+        self._run_batch = run
+        self.interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.archived = {name: 0 for name in self.policies}
+        self.runs = 0
+
+    async def run_once(self) -> dict[str, int]:
+        moved = {}
+        for name, policy in self.policies.items():
+            total = 0
+            while True:
+                count = await self._run_batch(archive_batch, policy, self.batch_size)
+                total += count
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(0)  # Let queued requests in between batches
+            moved[name] = total
+            with self._lock:
+                self.archived[name] += total
+        with self._lock:
+            self.runs += 1
+        return moved
+
+    async def _run(self):
+        while True:
+            try:
+                moved = await self.run_once()
+                if any(moved.values()):
+                    logger.info("archived %s", ", ".join(f"{count} {name}" for name, count in moved.items() if count))
+            except Exception:
+                logger.exception("archiving cold rows failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "archived": dict(self.archived),
+                "retention_days": {name: policy.max_age.days for name, policy in self.policies.items()},
+            }
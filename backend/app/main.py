@@ -1,24 +1,68 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, Header, Query, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.responses import Response
+from sqlalchemy import event, inspect, Column, Integer, String, DateTime, Boolean, Float, Index, case, func, or_
+from sqlalchemy.orm import declarative_base, sessionmaker, Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from datetime import datetime, timedelta
 from pydantic import BaseModel, EmailStr, Field
-from jose import JWTError, jwt
 import os
+import re
+import asyncio
 import hashlib
 import secrets
-from dotenv import load_dotenv
-from typing import Optional
-import uvicorn
-
-load_dotenv()
+import time
+from typing import Literal, Optional
+import migrations
+import database
+from database import AppSession, AsyncSessionRoute, bridge_sync_session, pool_status, run_db
+from realtime import chat_broker, notification_broker
+from pagination import PageParams, paginate, page_response
+from serialization import ContentNegotiationMiddleware, FastJSONResponse, Projection
+from cache import TTLCache, response_cache_from_env
+from leaderboard import Leaderboard, GLOBAL_SCOPE
+from feeds import FeedVersions
+from checkins import CheckInMonitor, next_deadline
+from expiry import ExpirySweeper
+from geo import SpatialIndex
+from areas import AreaIndex
+from lifecycle import LifecycleEngine, RetentionPolicy, archive_model
+from search import SearchIndex, SearchSource
+from matching import BuddyMatcher
+from claims import claim, exists, insert_once
+import passwords
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # Deployments without python-dotenv take settings from the environment
+    pass
+else:
+    load_dotenv()
 
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./safezoneph_dev.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# An async driver URL (sqlite+aiosqlite://, postgresql+asyncpg://) opts into async request handling
+ASYNC_DB = database.is_async_url(DATABASE_URL)
+# Always sync: runs migrations, and serves requests when ASYNC_DB is off.
+# Tuning (SQLite WAL pragmas, pool sizing) comes from the backend's profile in database.py.
+engine = database.build_engine(database.sync_url(DATABASE_URL))
+# Sessions are a per-request unit of work: endpoints flush for generated ids and commit once
+# at the end, so nothing is expired on commit and responses are built without reloading rows.
+# (In async mode they are serialized after run_sync returns, where lazy loads couldn't run anyway.)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, class_=AppSession)
+if ASYNC_DB:
+    async_engine = database.build_async_engine(DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, sync_session_class=AppSession, autoflush=False, expire_on_commit=False
+    )
+    # Standalone sessions opened from session hooks run inside run_sync and share the async pool
+    SessionLocal.configure(bind=async_engine.sync_engine)
 Base = declarative_base()
 
 # Security Configuration
@@ -27,10 +71,20 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", 1440))
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Auth caches: token digest -> user id, user id -> detached User snapshot
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
 
 # Database Models
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -40,6 +94,8 @@ class User(Base):
     barangay = Column(String, nullable=True)
     city = Column(String, nullable=True)
     location = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)  # home coordinates, used to suggest nearby buddies
+    longitude = Column(Float, nullable=True)
     bio = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
     points = Column(Integer, default=100)
@@ -50,6 +106,9 @@ class User(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -66,6 +125,9 @@ class Task(Base):
 
 class PointsHistory(Base):
     __tablename__ = "points_history"
+    __table_args__ = (
+        Index("ix_points_history_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -76,6 +138,10 @@ class PointsHistory(Base):
 
 class HelpRequest(Base):
     __tablename__ = "help_requests"
+    __table_args__ = (
+        Index("ix_help_requests_created_id", "created_at", "id"),
+        Index("ix_help_requests_lat_lng", "latitude", "longitude"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -88,10 +154,16 @@ class HelpRequest(Base):
     status = Column(String, default="open")  # open, in_progress, resolved
     responders_needed = Column(Integer, default=1)
     responders_count = Column(Integer, default=0)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class GlobalAlert(Base):
     __tablename__ = "global_alerts"
+    __table_args__ = (
+        Index("ix_global_alerts_created_id", "created_at", "id"),
+        Index("ix_global_alerts_active_expires", "is_active", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -103,11 +175,17 @@ class GlobalAlert(Base):
     affected_areas = Column(String, nullable=False)  # JSON array as string
     is_active = Column(Boolean, default=True)
     acknowledged_count = Column(Integer, default=0)
-    expires_at = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    notified_through = Column(Integer, nullable=True)  # highest user id notified so far
+    notified_at = Column(DateTime, nullable=True)  # when fan-out finished
 
 class CommunityTask(Base):
     __tablename__ = "community_tasks"
+    __table_args__ = (
+        Index("ix_community_tasks_status_created_id", "status", "created_at", "id"),
+        Index("ix_community_tasks_lat_lng", "latitude", "longitude"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -118,11 +196,18 @@ class CommunityTask(Base):
     status = Column(String, default="open")  # open, assigned, completed
     volunteer_id = Column(Integer, nullable=True)
     volunteer_name = Column(String, nullable=True)
+    volunteers_count = Column(Integer, default=0)
     created_by = Column(Integer, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_user1_user2", "user1_id", "user2_id"),
+        Index("ix_conversations_user2_user1", "user2_id", "user1_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user1_id = Column(Integer, nullable=False)
@@ -133,6 +218,10 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+        Index("ix_messages_receiver_read", "receiver_id", "read"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, nullable=False)
@@ -142,8 +231,55 @@ class Message(Base):
     read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+class FeedVersion(Base):
+    __tablename__ = "feed_versions"
+    
+    feed = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class UserArea(Base):
+    __tablename__ = "user_areas"
+    __table_args__ = (
+        Index("ix_user_areas_user_id", "user_id"),
+    )
+    
+    area = Column(String, primary_key=True)  # normalized barangay or city name
+    user_id = Column(Integer, primary_key=True)
+
+class HelpRequestResponder(Base):
+    """One row per user who responded to a help request; the key makes responding idempotent"""
+    __tablename__ = "help_request_responders"
+    __table_args__ = (
+        Index("ix_help_request_responders_user_id", "user_id"),
+    )
+    
+    help_request_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class AlertAcknowledgement(Base):
+    """One row per user who acknowledged a global alert"""
+    __tablename__ = "alert_acknowledgements"
+    __table_args__ = (
+        Index("ix_alert_acknowledgements_user_id", "user_id"),
+    )
+    
+    alert_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CommunityTaskVolunteer(Base):
+    """One row per user who volunteered for a community task. Tasks adopted from the
+    serverless API's database can have several; new ones are claimed by the first."""
+    __tablename__ = "community_task_volunteers"
+    __table_args__ = (
+        Index("ix_community_task_volunteers_user_id", "user_id"),
+    )
+    
+    task_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 # Pydantic Models
 class UserCreate(BaseModel):
@@ -154,6 +290,8 @@ class UserCreate(BaseModel):
     phone: Optional[str] = None
     barangay: Optional[str] = None
     city: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
     class Config:
         populate_by_name = True
@@ -223,6 +361,10 @@ class TaskResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TaskPage(BaseModel):
+    items: list[TaskResponse]
+    next_cursor: Optional[str]
+
 # Help Request Schemas
 class HelpRequestCreate(BaseModel):
     type: str
@@ -231,6 +373,8 @@ class HelpRequestCreate(BaseModel):
     location: str
     urgency: str
     responders_needed: int = 1
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class HelpRequestResponse(BaseModel):
     id: int
@@ -244,11 +388,23 @@ class HelpRequestResponse(BaseModel):
     status: str
     responders_needed: int
     responders_count: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class HelpRequestPage(BaseModel):
+    items: list[HelpRequestResponse]
+    next_cursor: Optional[str]
+
+class NearbyHelpRequest(HelpRequestResponse):
+    distance_km: float
+
+class NearbyHelpRequests(BaseModel):
+    items: list[NearbyHelpRequest]
+
 # Global Alert Schemas
 class GlobalAlertCreate(BaseModel):
     type: str
@@ -256,7 +412,7 @@ class GlobalAlertCreate(BaseModel):
     title: str
     message: str
     affected_areas: list[str]
-    expires_in: Optional[str] = "24"
+    expires_in: Optional[str] = "24"  # hours ("24" or "24 hours"); empty for no expiry
 
 class GlobalAlertResponse(BaseModel):
     id: int
@@ -269,12 +425,16 @@ class GlobalAlertResponse(BaseModel):
     affected_areas: str
     is_active: bool
     acknowledged_count: int
-    expires_at: Optional[str]
+    expires_at: Optional[datetime]
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class GlobalAlertPage(BaseModel):
+    items: list[GlobalAlertResponse]
+    next_cursor: Optional[str]
+
 # Community Task Schemas
 class CommunityTaskCreate(BaseModel):
     title: str
@@ -282,6 +442,8 @@ class CommunityTaskCreate(BaseModel):
     location: str
     urgency: str
     points: int = 50
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class CommunityTaskResponse(BaseModel):
     id: int
@@ -293,12 +455,25 @@ class CommunityTaskResponse(BaseModel):
     status: str
     volunteer_id: Optional[int]
     volunteer_name: Optional[str]
+    volunteers_count: int
     created_by: Optional[int]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class CommunityTaskPage(BaseModel):
+    items: list[CommunityTaskResponse]
+    next_cursor: Optional[str]
+
+class NearbyCommunityTask(CommunityTaskResponse):
+    distance_km: float
+
+class NearbyCommunityTasks(BaseModel):
+    items: list[NearbyCommunityTask]
+
 # Message Schemas
 class MessageCreate(BaseModel):
     receiver_id: int
@@ -316,6 +491,10 @@ class MessageResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class MessagePage(BaseModel):
+    items: list[MessageResponse]
+    next_cursor: Optional[str]
+
 class ConversationResponse(BaseModel):
     id: int
     participant_id: int
@@ -328,8 +507,84 @@ class ConversationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+SearchType = Literal["help_request", "community_task", "alert", "message"]
+
+class SearchHit(BaseModel):
+    type: SearchType
+    id: int
+    title: Optional[str] = None
+    snippet: str  # HTML-escaped, matches wrapped in <mark>
+    score: float
+    created_at: Optional[datetime] = None
+    details: dict = {}
+
+class SearchResults(BaseModel):
+    query: str
+    items: list[SearchHit]
+
+class BuddySuggestion(BaseModel):
+    id: int
+    name: str
+    location: Optional[str]
+    barangay: Optional[str]
+    city: Optional[str]
+    points: int
+    rank: str
+    score: float
+    distance_km: Optional[float]
+    same_barangay: bool
+    same_city: bool
+    sessions_together: int
+
+class BuddySuggestions(BaseModel):
+    items: list[BuddySuggestion]
+
+# List endpoints select only these columns and render the rows directly
+task_projection = Projection(Task, TaskResponse)
+help_request_projection = Projection(HelpRequest, HelpRequestResponse)
+global_alert_projection = Projection(GlobalAlert, GlobalAlertResponse)
+community_task_projection = Projection(CommunityTask, CommunityTaskResponse)
+
+help_request_locations = SpatialIndex(HelpRequest, "help_requests_geo")
+community_task_locations = SpatialIndex(CommunityTask, "community_tasks_geo")
+
+class NearbyParams:
+    """?lat=&lng=&radius_km=&limit= query parameters, usable as a FastAPI dependency"""
+
+    def __init__(
+        self,
+        lat: float = Query(..., ge=-90, le=90),
+        lng: float = Query(..., ge=-180, le=180),
+        radius_km: float = Query(2.0, gt=0, le=50),
+        limit: int = Query(20, ge=1, le=100),
+    ):
+        self.lat = lat
+        self.lng = lng
+        self.radius_km = radius_km
+        self.limit = limit
+
+def find_nearby(db: Session, locations: SpatialIndex, projection: Projection, near: NearbyParams, *criteria) -> dict:
+    """Closest matching rows within the radius, nearest first, each with its distance_km"""
+    ranked = locations.nearby(db, near.lat, near.lng, near.radius_km, near.limit, *criteria)
+    if not ranked:
+        return {"items": []}
+    model = locations.model
+    rows = projection.query(db).filter(model.id.in_([row_id for row_id, _ in ranked])).all()
+    items = {item["id"]: item for item in projection.items(rows)}
+    return {"items": [
+        items[row_id] | {"distance_km": round(distance, 3)}
+        for row_id, distance in ranked if row_id in items
+    ]}
+
+def require_coordinates_pair(latitude: Optional[float], longitude: Optional[float]):
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(status_code=422, detail="latitude and longitude must be given together")
+
 # FastAPI App
-app = FastAPI(title="SafeZonePH API", version="1.0.0")
+app = FastAPI(title="SafeZonePH API", version="1.0.0", default_response_class=FastJSONResponse)
+if ASYNC_DB:
+    # Sync endpoints taking a Session run on the event loop via AsyncSession.run_sync
+    app.router.route_class = AsyncSessionRoute
 
 # CORS Middleware
 app.add_middleware(
@@ -339,30 +594,86 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Accept: application/msgpack selects MessagePack for every response body, errors included
+app.add_middleware(ContentNegotiationMiddleware)
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request, exc):
+    headers = getattr(exc, "headers", None)
+    if exc.status_code in (204, 304):
+        return Response(status_code=exc.status_code, headers=headers)
+    return FastJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request, exc):
+    return FastJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
+
+# Schema is owned by migrations.py. Sessions bring it up to date on first use, so the
+# serverless handler (api/index.py), which skips startup, pays one version query per
+# cold start; long-running servers do it at startup instead of on the first request.
+# SCHEMA_VERSION, set by the deploy that ran `migrations.py upgrade`, records the check
+# for every process: at the latest version of this build, none of them query.
+schema = migrations.SchemaGate(
+    engine,
+    enabled=os.getenv("AUTO_MIGRATE", "true").lower() == "true",
+    verified_version=int(os.getenv("SCHEMA_VERSION", 0)),
+)
+
+@app.on_event("startup")
+def run_migrations():
+    schema.ensure()
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    passwords.pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    # Pooled async connections can only be closed from the event loop
+    if ASYNC_DB:
+        await async_engine.dispose()
 
 # Database Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+if ASYNC_DB:
+    async def get_db():
+        if not schema.ready:
+            await run_in_threadpool(schema.ensure)
+        async with AsyncSessionLocal() as db:
+            yield db
+else:
+    def get_db():
+        schema.ensure()
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+async def run_in_new_session(fn, *args):
+    """Call fn(db, *args) on a short-lived session outside request DI (WebSocket / streaming endpoints)"""
+    if ASYNC_DB:
+        if not schema.ready:
+            await run_in_threadpool(schema.ensure)
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+    
+    def call():
+        schema.ensure()
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    
+    return await run_in_threadpool(call)
 
 # Utility Functions
-def verify_password(plain_password, hashed_password):
-    # Simple password verification using stored salt
-    try:
-        stored_hash, salt = hashed_password.split(':')
-        password_hash = hashlib.sha256((plain_password + salt).encode()).hexdigest()
-        return password_hash == stored_hash
-    except:
-        return False
-
-def get_password_hash(password):
-    # Simple password hashing with salt
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{password_hash}:{salt}"
+def hasher_busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests right now. Please try again shortly.",
+        headers={"Retry-After": "2"},
+    )
 
 def calculate_rank(points: int) -> str:
     rank_tiers = [
@@ -379,6 +690,157 @@ def calculate_rank(points: int) -> str:
             return rank_tiers[i]["name"]
     return rank_tiers[0]["name"]
 
+def award_points(db: Session, user: User, points: int, type: str, description: str):
+    """Add points, update rank and record history; the caller commits"""
+    # current_user may be a cached snapshot, so re-read the balance before incrementing
+    db.refresh(user, attribute_names=["points"])
+    user.points += points
+    user.rank = calculate_rank(user.points)
+    db.add(PointsHistory(
+        user_id=user.id,
+        type=type,
+        description=description,
+        points=points
+    ))
+
+# Any committed change to a users row (points, rank, profile) drops its cached snapshot
+@event.listens_for(AppSession, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in session.dirty if isinstance(obj, User)}
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+@event.listens_for(AppSession, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.pop(user_id)
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_users", None)
+
+# Leaderboard: loaded from the users table on first use, then updated from committed points changes.
+# Other workers' awards are picked up from points_history every LEADERBOARD_REFRESH_SECONDS, reading
+# only the users it names; a full reload every LEADERBOARD_RELOAD_SECONDS catches the rest (location
+# changes, deletions, awards still uncommitted at a poll). 0 turns either off, e.g. for one worker.
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", 5))
+LEADERBOARD_RELOAD_SECONDS = float(os.getenv("LEADERBOARD_RELOAD_SECONDS", 3600))
+
+def _load_leaderboard(db: Session):
+    return db.query(User.id, User.points, User.city, User.barangay).all()
+
+def _leaderboard_changes(db: Session, after_id: Optional[int]) -> tuple[list, int]:
+    """Users with points history past after_id, and the newest history id (a primary key range)"""
+    last_id = db.query(func.max(PointsHistory.id)).scalar() or 0
+    if after_id is None or last_id <= after_id:
+        return [], last_id
+    awarded = db.query(PointsHistory.user_id).filter(PointsHistory.id > after_id, PointsHistory.id <= last_id)
+    return db.query(User.id, User.points, User.city, User.barangay).filter(
+        User.id.in_(awarded.distinct().scalar_subquery())
+    ).all(), last_id
+
+leaderboard = Leaderboard(
+    _load_leaderboard,
+    max_age=LEADERBOARD_RELOAD_SECONDS or None,
+    changes=_leaderboard_changes,
+    refresh_interval=LEADERBOARD_REFRESH_SECONDS or None,
+)
+
+LEADERBOARD_FIELDS = ("points", "city", "barangay")
+
+@event.listens_for(AppSession, "after_flush")
+def _collect_leaderboard_changes(session, flush_context):
+    changes = session.info.setdefault("leaderboard_changes", {})
+    for obj in session.new:
+        if isinstance(obj, User):
+            changes[obj.id] = (obj.points, obj.city, obj.barangay)
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in LEADERBOARD_FIELDS):
+                changes[obj.id] = (obj.points, obj.city, obj.barangay)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changes[obj.id] = None
+
+@event.listens_for(AppSession, "after_commit")
+def _apply_leaderboard_changes(session):
+    for user_id, values in session.info.pop("leaderboard_changes", {}).items():
+        if values is None:
+            leaderboard.remove(user_id)
+        else:
+            leaderboard.update(user_id, *values)
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_leaderboard_changes(session):
+    session.info.pop("leaderboard_changes", None)
+
+# Buddy matcher: user features (home, area, points, last activity) in NumPy columns,
+# loaded on first use and then updated from committed profile changes and activity.
+# Other workers' changes show after a reload every BUDDY_MATCHER_RELOAD_SECONDS (0: never).
+BUDDY_MATCHER_RELOAD_SECONDS = float(os.getenv("BUDDY_MATCHER_RELOAD_SECONDS", 300))
+
+def _load_buddy_features(db: Session):
+    last_points = dict(db.query(PointsHistory.user_id, func.max(PointsHistory.created_at)).group_by(PointsHistory.user_id).all())
+    last_sent = dict(db.query(Message.sender_id, func.max(Message.created_at)).group_by(Message.sender_id).all())
+    return [
+        (*row, max(filter(None, (last_points.get(row.id), last_sent.get(row.id))), default=None))
+        for row in db.query(
+            User.id, User.latitude, User.longitude, User.city, User.barangay, User.points, User.is_active
+        ).all()
+    ]
+
+buddy_matcher = BuddyMatcher(_load_buddy_features, max_age=BUDDY_MATCHER_RELOAD_SECONDS or None)
+
+BUDDY_MATCHER_FIELDS = ("latitude", "longitude", "city", "barangay", "points", "is_active")
+
+def _buddy_features(user: User) -> tuple:
+    return tuple(getattr(user, field) for field in BUDDY_MATCHER_FIELDS)
+
+@event.listens_for(AppSession, "after_flush")
+def _collect_buddy_matcher_changes(session, flush_context):
+    users = session.info.setdefault("buddy_matcher_users", {})
+    activity = session.info.setdefault("buddy_matcher_activity", [])
+    for obj in session.new:
+        if isinstance(obj, User):
+            users[obj.id] = ("user", obj.id, *_buddy_features(obj))
+        elif isinstance(obj, PointsHistory):
+            activity.append(("activity", obj.user_id, obj.created_at))
+        elif isinstance(obj, Message):
+            activity.append(("activity", obj.sender_id, obj.created_at))
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in BUDDY_MATCHER_FIELDS):
+                users[obj.id] = ("user", obj.id, *_buddy_features(obj))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            users[obj.id] = ("remove", obj.id)
+
+@event.listens_for(AppSession, "after_commit")
+def _apply_buddy_matcher_changes(session):
+    # Users first, so a new user's welcome points count as activity
+    users = session.info.pop("buddy_matcher_users", {})
+    activity = session.info.pop("buddy_matcher_activity", [])
+    if users or activity:
+        buddy_matcher.apply([*users.values(), *activity])
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_buddy_matcher_changes(session):
+    session.info.pop("buddy_matcher_users", None)
+    session.info.pop("buddy_matcher_activity", None)
+
+# Public feeds: any write to these tables bumps the feed's stamp in the same transaction.
+# Rendered pages are cached under the stamp; other workers' writes show within FEED_STAMP_TTL_SECONDS.
+FEED_STAMP_TTL_SECONDS = float(os.getenv("FEED_STAMP_TTL_SECONDS", 1))
+response_cache = response_cache_from_env()
+feed_versions = FeedVersions(FeedVersion.__table__, cache=response_cache, stamp_ttl=FEED_STAMP_TTL_SECONDS)
+feed_versions.track(GlobalAlert, "global-alerts")
+feed_versions.track(CommunityTask, "community-tasks")
+feed_versions.track(HelpRequest, "help-requests")
+feed_versions.install(AppSession)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -386,49 +848,80 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred: only token issuing and first-time verification need it
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def _cache_user(user: User):
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    user_cache.set(user.id, snapshot)
+
+def get_user_from_token(token: str, db: Session):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    # Fast path: token already verified and user snapshot still cached -> no crypto, no SQL
+    digest = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(digest)
+    if user_id is not None:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return db.merge(snapshot, load=False)
+        user = db.get(User, user_id)
+        if user is None:
+            token_cache.pop(digest)
+            raise credentials_exception
+        _cache_user(user)
+        return user
+    
+    from jose import JWTError, jwt
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise credentials_exception
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise credentials_exception
     
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise credentials_exception
+    
+    # Never serve a cached verification past the token's own expiry
+    expires_in = payload["exp"] - datetime.utcnow().timestamp() if "exp" in payload else None
+    token_cache.set(digest, user.id, ttl=expires_in)
+    _cache_user(user)
     return user
 
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    return get_user_from_token(credentials.credentials, db)
+
+if ASYNC_DB:
+    get_current_user = bridge_sync_session(get_current_user)
+
+def _user_id_from_token(db: Session, token: str) -> int:
+    return get_user_from_token(token, db).id
+
+async def load_user_id(token: str) -> int:
+    """Authenticate outside of request DI (WebSocket / streaming endpoints)"""
+    return await run_in_new_session(_user_id_from_token, token)
+
 # API Endpoints
-@app.post("/api/auth/register", response_model=Token)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+# Register and login are async so password hashing waits in the dedicated pool
+# without holding a threadpool thread; their DB work goes through run_db.
+def _find_user_by_email(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    # End the read transaction to hand the connection back before the (possibly queued)
+    # hash. The session stays open, and expire_on_commit=False keeps the row loaded.
+    db.commit()
+    return user
+
+def _create_user(db: Session, user_data: UserCreate, hashed_password: str):
     location = f"{user_data.barangay}, {user_data.city}" if user_data.barangay and user_data.city else None
     
     db_user = User(
@@ -439,14 +932,16 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         barangay=user_data.barangay,
         city=user_data.city,
         location=location,
+        latitude=user_data.latitude,
+        longitude=user_data.longitude,
         hashed_password=hashed_password,
         points=100,  # Welcome points
         rank=calculate_rank(100)
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Flush assigns the id the history row needs without reloading the row
+    db.flush()
     
     # Add welcome points to history
     points_entry = PointsHistory(
@@ -457,6 +952,26 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     db.add(points_entry)
     db.commit()
+    return db_user
+
+@app.post("/api/auth/register", response_model=Token)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    require_coordinates_pair(user_data.latitude, user_data.longitude)
+    
+    # Check if user already exists
+    existing_user = await run_db(db, _find_user_by_email, user_data.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    try:
+        hashed_password = await passwords.hash_password(user_data.password)
+    except passwords.HasherBusyError:
+        raise hasher_busy_exception()
+    
+    db_user = await run_db(db, _create_user, user_data, hashed_password)
     
     # Create access token
     access_token = create_access_token(data={"sub": db_user.email})
@@ -467,33 +982,53 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         "user": UserResponse.from_orm(db_user)
     }
 
+def _save_password_hash(db: Session, user: User, hashed_password: str):
+    user = db.merge(user)
+    user.hashed_password = hashed_password
+    db.commit()
+
 @app.post("/api/auth/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+    user = await run_db(db, _find_user_by_email, user_credentials.email)
+    
+    try:
+        valid = await passwords.verify_password(user_credentials.password, user.hashed_password if user else None)
+    except passwords.HasherBusyError:
+        raise hasher_busy_exception()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_response = UserResponse.from_orm(user)
+    
+    # Transparently upgrade legacy or outdated hashes while we have the plaintext
+    if passwords.needs_rehash(user.hashed_password):
+        try:
+            new_hash = await passwords.hash_password(user_credentials.password)
+            await run_db(db, _save_password_hash, user, new_hash)
+        except passwords.HasherBusyError:
+            pass  # Try again on the next login
+    
     access_token = create_access_token(data={"sub": user.email})
     
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
+        "user": user_response
     }
 
 @app.get("/api/auth/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     return UserResponse.from_orm(current_user)
 
-@app.get("/api/tasks")
-def get_tasks(db: Session = Depends(get_db)):
-    tasks = db.query(Task).all()
-    return [TaskResponse.from_orm(task) for task in tasks]
+@app.get("/api/tasks", response_model=TaskPage)
+def get_tasks(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    rows, next_cursor = paginate(task_projection.query(db), Task.created_at, Task.id, page)
+    return task_projection.page(rows, next_cursor)
 
 @app.post("/api/tasks", response_model=TaskResponse)
 def create_task(task_data: TaskCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -511,7 +1046,6 @@ def create_task(task_data: TaskCreate, current_user: User = Depends(get_current_
     
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
     
     return TaskResponse.from_orm(db_task)
 
@@ -530,20 +1064,9 @@ def update_task(task_id: int, task_update: TaskUpdate, current_user: User = Depe
 
     # If task was just completed (status changed from non-completed to completed), award points
     if task_update.status == "completed" and old_status != "completed":
-        current_user.points += task.points
-        current_user.rank = calculate_rank(current_user.points)
-
-        # Add to points history
-        points_entry = PointsHistory(
-            user_id=current_user.id,
-            type="task_completed",
-            description=f"Completed task: {task.title}",
-            points=task.points
-        )
-        db.add(points_entry)
+        award_points(db, current_user, task.points, "task_completed", f"Completed task: {task.title}")
 
     db.commit()
-    db.refresh(task)
     
     # Return the updated task
     return {
@@ -562,32 +1085,94 @@ def update_task(task_id: int, task_update: TaskUpdate, current_user: User = Depe
 
 # Points History Endpoint
 @app.get("/api/points/history")
-def get_points_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_points_history(page: PageParams = Depends(), current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get points history for the current user"""
-    history = db.query(PointsHistory).filter(
-        PointsHistory.user_id == current_user.id
-    ).order_by(PointsHistory.created_at.desc()).all()
+    return points_history_page(db, PointsHistory, current_user.id, page)
+
+def points_history_page(db: Session, model, user_id: int, page: PageParams):
+    """A page of points history from the live table or its archive"""
+    history, next_cursor = paginate(
+        db.query(model.id, model.type, model.description, model.points, model.created_at).filter(
+            model.user_id == user_id
+        ),
+        model.created_at, model.id, page
+    )
     
-    return [
+    # Returned as a response so the rows skip jsonable_encoder; dates render natively
+    return FastJSONResponse(page_response([
         {
-            "id": entry.id,
-            "type": entry.type,
-            "description": entry.description,
-            "points": entry.points,
-            "timestamp": entry.created_at.isoformat(),
-            "date": entry.created_at.date().isoformat()
+            "id": entry_id,
+            "type": type,
+            "description": description,
+            "points": points,
+            "timestamp": created_at,
+            "date": created_at.date()
         }
-        for entry in history
-    ]
+        for entry_id, type, description, points, created_at in history
+    ], next_cursor))
+
+@app.get("/api/leaderboard")
+def get_leaderboard(
+    city: Optional[str] = None,
+    barangay: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Top users by points, globally or within a city / barangay, plus the caller's position.
+    A barangay without a city is looked up in the caller's city."""
+    if barangay:
+        city = city or current_user.city
+        if not city:
+            raise HTTPException(status_code=400, detail="city is required to rank by barangay")
+        scope = ("barangay", city, barangay)
+    elif city:
+        scope = ("city", city)
+    else:
+        scope = GLOBAL_SCOPE
+    
+    leaderboard.ensure_loaded(db)
+    entries = leaderboard.top(scope, limit, offset)
+    
+    # Only the page's rows are read, by primary key
+    user_ids = [entry["user_id"] for entry in entries]
+    users = {u.id: u for u in db.query(User).filter(User.id.in_(user_ids)).all()} if user_ids else {}
+    
+    return {
+        "city": city,
+        "barangay": barangay,
+        "total": leaderboard.size(scope),
+        "entries": [{
+            "rank": entry["rank"],
+            "userId": entry["user_id"],
+            "name": f"{users[entry['user_id']].first_name} {users[entry['user_id']].last_name}",
+            "city": users[entry["user_id"]].city,
+            "barangay": users[entry["user_id"]].barangay,
+            "points": entry["points"],
+            "rankTitle": calculate_rank(entry["points"]),
+            "isCurrentUser": entry["user_id"] == current_user.id
+        } for entry in entries if entry["user_id"] in users],
+        "me": leaderboard.position(current_user.id, scope)
+    }
 
 # Help Request Endpoints
-@app.get("/api/help-requests")
-def get_help_requests(db: Session = Depends(get_db)):
-    requests = db.query(HelpRequest).order_by(HelpRequest.created_at.desc()).all()
-    return [HelpRequestResponse.from_orm(req) for req in requests]
+@app.get("/api/help-requests", response_model=HelpRequestPage)
+def get_help_requests(request: Request, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    def render():
+        rows, next_cursor = paginate(help_request_projection.query(db), HelpRequest.created_at, HelpRequest.id, page)
+        return help_request_projection.page(rows, next_cursor)
+    
+    return feed_versions.respond(request, db, "help-requests", render)
+
+@app.get("/api/help-requests/nearby", response_model=NearbyHelpRequests)
+def get_nearby_help_requests(near: NearbyParams = Depends(), db: Session = Depends(get_db)):
+    """Open help requests within radius_km of (lat, lng), nearest first"""
+    return FastJSONResponse(find_nearby(db, help_request_locations, help_request_projection, near, HelpRequest.status == "open"))
 
 @app.post("/api/help-requests", response_model=HelpRequestResponse)
 def create_help_request(request_data: HelpRequestCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    require_coordinates_pair(request_data.latitude, request_data.longitude)
     db_request = HelpRequest(
         user_id=current_user.id,
         user_name=f"{current_user.first_name} {current_user.last_name}",
@@ -596,52 +1181,82 @@ def create_help_request(request_data: HelpRequestCreate, current_user: User = De
         description=request_data.description,
         location=request_data.location,
         urgency=request_data.urgency,
-        responders_needed=request_data.responders_needed
+        responders_needed=request_data.responders_needed,
+        latitude=request_data.latitude,
+        longitude=request_data.longitude
     )
     
     db.add(db_request)
     db.commit()
-    db.refresh(db_request)
     
     return HelpRequestResponse.from_orm(db_request)
 
 @app.patch("/api/help-requests/{request_id}/respond")
 def respond_to_help_request(request_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    help_request = db.query(HelpRequest).filter(HelpRequest.id == request_id).first()
-    if not help_request:
-        raise HTTPException(status_code=404, detail="Help request not found")
-    
-    help_request.responders_count += 1
-    if help_request.responders_count >= help_request.responders_needed:
-        help_request.status = "in_progress"
-    
-    db.commit()
-    db.refresh(help_request)
-    
-    # Award points for responding
-    current_user.points += 25
-    current_user.rank = calculate_rank(current_user.points)
-    
-    points_entry = PointsHistory(
-        user_id=current_user.id,
-        type="help_response",
-        description=f"Responded to help request: {help_request.title}",
-        points=25
-    )
-    db.add(points_entry)
+    if not insert_once(db, HelpRequestResponder.__table__, help_request_id=request_id, user_id=current_user.id,
+                       created_at=datetime.utcnow()):
+        help_request = db.query(HelpRequest).filter(HelpRequest.id == request_id).first()
+        if not help_request:
+            raise HTTPException(status_code=404, detail="Help request not found")
+        return {"message": "Response already recorded", "request": HelpRequestResponse.from_orm(help_request)}
+    
+    # Count the response and close the request once enough responders are in, in one statement
+    help_request = claim(db, HelpRequest, [HelpRequest.id == request_id, HelpRequest.status == "open"], {
+        "responders_count": HelpRequest.responders_count + 1,
+        "status": case(
+            (HelpRequest.responders_count + 1 >= HelpRequest.responders_needed, "in_progress"),
+            else_=HelpRequest.status,
+        ),
+    })
+    if help_request is None:
+        db.rollback()
+        if not exists(db, HelpRequest, request_id):
+            raise HTTPException(status_code=404, detail="Help request not found")
+        raise HTTPException(status_code=400, detail="Help request is no longer open")
+    
+    # Award points for responding, in the same transaction as the response itself
+    award_points(db, current_user, 25, "help_response", f"Responded to help request: {help_request.title}")
     db.commit()
     
     return {"message": "Response recorded", "request": HelpRequestResponse.from_orm(help_request)}
 
 # Global Alert Endpoints
-@app.get("/api/global-alerts")
-def get_global_alerts(db: Session = Depends(get_db)):
-    alerts = db.query(GlobalAlert).order_by(GlobalAlert.created_at.desc()).all()
-    return [GlobalAlertResponse.from_orm(alert) for alert in alerts]
+@app.get("/api/global-alerts", response_model=GlobalAlertPage)
+def get_global_alerts(
+    request: Request,
+    status: Literal["active", "expired", "all"] = "active",
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Live alerts by default; ?status=expired or ?status=all for the history"""
+    def render():
+        query = global_alert_projection.query(db)
+        if status != "all":
+            # Also applied at query time, so alerts past expiry never wait on the sweeper
+            live = GlobalAlert.is_active == True
+            live &= or_(GlobalAlert.expires_at == None, GlobalAlert.expires_at > datetime.utcnow())
+            query = query.filter(live if status == "active" else ~live)
+        rows, next_cursor = paginate(query, GlobalAlert.created_at, GlobalAlert.id, page)
+        return global_alert_projection.page(rows, next_cursor)
+    
+    expire_due_alerts(db)
+    return feed_versions.respond(request, db, "global-alerts", render)
 
 @app.post("/api/global-alerts", response_model=GlobalAlertResponse)
-def create_global_alert(alert_data: GlobalAlertCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def create_global_alert(
+    alert_data: GlobalAlertCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     import json
+    expires_at = None
+    if alert_data.expires_in:
+        match = re.match(r"\s*(\d+(?:\.\d+)?)\s*(?:h|hours?)?\s*$", alert_data.expires_in)
+        if not match or float(match.group(1)) <= 0:
+            raise HTTPException(status_code=422, detail="expires_in must be a positive number of hours")
+        expires_at = datetime.utcnow() + timedelta(hours=float(match.group(1)))
+    
     db_alert = GlobalAlert(
         user_id=current_user.id,
         created_by=f"{current_user.first_name} {current_user.last_name}",
@@ -650,76 +1265,198 @@ def create_global_alert(alert_data: GlobalAlertCreate, current_user: User = Depe
         title=alert_data.title,
         message=alert_data.message,
         affected_areas=json.dumps(alert_data.affected_areas),
-        expires_at=f"{alert_data.expires_in} hours" if alert_data.expires_in else None
+        expires_at=expires_at
     )
     
     db.add(db_alert)
     db.commit()
-    db.refresh(db_alert)
+    
+    # Residents are notified after the response is sent
+    background_tasks.add_task(deliver_alert, db_alert.id)
     
     return GlobalAlertResponse.from_orm(db_alert)
 
 @app.patch("/api/global-alerts/{alert_id}/acknowledge")
 def acknowledge_alert(alert_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    alert = db.query(GlobalAlert).filter(GlobalAlert.id == alert_id).first()
-    if not alert:
+    if not insert_once(db, AlertAcknowledgement.__table__, alert_id=alert_id, user_id=current_user.id,
+                       created_at=datetime.utcnow()):
+        alert = db.query(GlobalAlert).filter(GlobalAlert.id == alert_id).first()
+        if not alert:
+            raise HTTPException(status_code=404, detail="Alert not found")
+        return {"message": "Alert already acknowledged", "alert": GlobalAlertResponse.from_orm(alert)}
+    
+    alert = claim(db, GlobalAlert, [GlobalAlert.id == alert_id], {
+        "acknowledged_count": GlobalAlert.acknowledged_count + 1,
+    })
+    if alert is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Alert not found")
-    
-    alert.acknowledged_count += 1
     db.commit()
-    db.refresh(alert)
     
     return {"message": "Alert acknowledged", "alert": GlobalAlertResponse.from_orm(alert)}
 
+@app.get("/api/global-alerts/acknowledged")
+def get_acknowledged_alerts(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Ids of the alerts the current user has acknowledged"""
+    rows = db.query(AlertAcknowledgement.alert_id).filter(AlertAcknowledgement.user_id == current_user.id)
+    return [alert_id for (alert_id,) in rows]
+
 @app.patch("/api/global-alerts/{alert_id}/toggle")
 def toggle_alert_status(alert_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     alert = db.query(GlobalAlert).filter(GlobalAlert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
+    if not alert.is_active and alert.expires_at is not None and alert.expires_at <= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Alert has expired")
+    
     alert.is_active = not alert.is_active
     db.commit()
-    db.refresh(alert)
     
     return {"message": "Alert status toggled", "alert": GlobalAlertResponse.from_orm(alert)}
 
+# ==========================================
+# ALERT EXPIRY
+# ==========================================
+# The feed already hides alerts past expires_at; the sweeper also flips them to
+# inactive in bulk, which bumps the feed's stamp so cached pages drop them on time.
+# Reads of the feed do the same for anything due, so alerts still lapse (and stop
+# matching old ETags) where no sweeper runs, e.g. on serverless instances.
+
+ALERT_SWEEP_MAX_INTERVAL_SECONDS = float(os.getenv("ALERT_SWEEP_MAX_INTERVAL_SECONDS", 300))
+ALERT_SWEEP_BATCH_SIZE = int(os.getenv("ALERT_SWEEP_BATCH_SIZE", 1000))
+
+def _deactivate_expired_alerts(db: Session) -> Optional[datetime]:
+    """Deactivate expired alerts in batches; returns the next pending expiry"""
+    now = datetime.utcnow()
+    while True:
+        expired_ids = [alert_id for (alert_id,) in db.query(GlobalAlert.id).filter(
+            GlobalAlert.is_active == True,
+            GlobalAlert.expires_at <= now
+        ).limit(ALERT_SWEEP_BATCH_SIZE)]
+        if not expired_ids:
+            break
+        db.query(GlobalAlert).filter(GlobalAlert.id.in_(expired_ids)).update(
+            {GlobalAlert.is_active: False}, synchronize_session=False
+        )
+        db.commit()
+        if len(expired_ids) < ALERT_SWEEP_BATCH_SIZE:
+            break
+    return db.query(func.min(GlobalAlert.expires_at)).filter(
+        GlobalAlert.is_active == True,
+        GlobalAlert.expires_at != None
+    ).scalar()
+
+# (checked at, next pending expiry) as this process last read them
+_alert_expiry_seen: tuple[float, Optional[datetime]] = (0.0, None)
+
+def expire_due_alerts(db: Session):
+    """Deactivate lapsed alerts before the feed's stamp is read. The next pending expiry
+    is reused for FEED_STAMP_TTL_SECONDS, so most reads cost no query at all."""
+    global _alert_expiry_seen
+    checked_at, next_expiry = _alert_expiry_seen
+    now = datetime.utcnow()
+    if time.monotonic() - checked_at < FEED_STAMP_TTL_SECONDS and (next_expiry is None or next_expiry > now):
+        return
+    next_expiry = db.query(func.min(GlobalAlert.expires_at)).filter(
+        GlobalAlert.is_active == True,
+        GlobalAlert.expires_at != None
+    ).scalar()
+    if next_expiry is not None and next_expiry <= now:
+        next_expiry = _deactivate_expired_alerts(db)
+    _alert_expiry_seen = (time.monotonic(), next_expiry)
+
+alert_sweeper = ExpirySweeper(
+    lambda: run_in_new_session(_deactivate_expired_alerts),
+    max_interval=ALERT_SWEEP_MAX_INTERVAL_SECONDS,
+)
+
+@event.listens_for(AppSession, "after_flush")
+def _collect_alert_expiries(session, flush_context):
+    expiries = [
+        obj.expires_at for obj in (*session.new, *session.dirty)
+        if isinstance(obj, GlobalAlert) and obj.is_active and obj.expires_at is not None
+    ]
+    if expiries:
+        session.info.setdefault("alert_expiries", []).extend(expiries)
+
+@event.listens_for(AppSession, "after_commit")
+def _wake_alert_sweeper(session):
+    expiries = session.info.pop("alert_expiries", None)
+    if expiries:
+        alert_sweeper.notify(min(expiries))
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_alert_expiries(session):
+    session.info.pop("alert_expiries", None)
+
+@app.on_event("startup")
+async def start_alert_sweeper():
+    if os.getenv("ALERT_SWEEPER", "true").lower() == "true":
+        alert_sweeper.start()
+
+async def stop_alert_sweeper():
+    await alert_sweeper.stop()
+
+app.router.on_shutdown.insert(0, stop_alert_sweeper)
+
 # Community Tasks Endpoints
-@app.get("/api/community-tasks")
-def get_community_tasks(db: Session = Depends(get_db)):
-    tasks = db.query(CommunityTask).filter(CommunityTask.status == "open").order_by(CommunityTask.created_at.desc()).all()
-    return [CommunityTaskResponse.from_orm(task) for task in tasks]
+@app.get("/api/community-tasks", response_model=CommunityTaskPage)
+def get_community_tasks(request: Request, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    def render():
+        rows, next_cursor = paginate(
+            community_task_projection.query(db).filter(CommunityTask.status == "open"),
+            CommunityTask.created_at, CommunityTask.id, page
+        )
+        return community_task_projection.page(rows, next_cursor)
+    
+    return feed_versions.respond(request, db, "community-tasks", render)
+
+@app.get("/api/community-tasks/nearby", response_model=NearbyCommunityTasks)
+def get_nearby_community_tasks(near: NearbyParams = Depends(), db: Session = Depends(get_db)):
+    """Open community tasks within radius_km of (lat, lng), nearest first"""
+    return FastJSONResponse(find_nearby(db, community_task_locations, community_task_projection, near, CommunityTask.status == "open"))
 
 @app.post("/api/community-tasks", response_model=CommunityTaskResponse)
 def create_community_task(task_data: CommunityTaskCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    require_coordinates_pair(task_data.latitude, task_data.longitude)
     db_task = CommunityTask(
         title=task_data.title,
         description=task_data.description,
         location=task_data.location,
         urgency=task_data.urgency,
         points=task_data.points,
-        created_by=current_user.id
+        created_by=current_user.id,
+        latitude=task_data.latitude,
+        longitude=task_data.longitude
     )
     
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
     
     return CommunityTaskResponse.from_orm(db_task)
 
 @app.post("/api/community-tasks/{task_id}/volunteer")
 def volunteer_for_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    community_task = db.query(CommunityTask).filter(CommunityTask.id == task_id).first()
-    if not community_task:
-        raise HTTPException(status_code=404, detail="Community task not found")
-    
-    if community_task.status != "open":
+    if not insert_once(db, CommunityTaskVolunteer.__table__, task_id=task_id, user_id=current_user.id,
+                       created_at=datetime.utcnow()):
+        if not exists(db, CommunityTask, task_id):
+            raise HTTPException(status_code=404, detail="Community task not found")
+        raise HTTPException(status_code=400, detail="You have already volunteered for this task")
+    
+    # Claim the task only if it is still open, so two volunteers can't both get it
+    community_task = claim(db, CommunityTask, [CommunityTask.id == task_id, CommunityTask.status == "open"], {
+        "status": "assigned",
+        "volunteer_id": current_user.id,
+        "volunteer_name": f"{current_user.first_name} {current_user.last_name}",
+        "volunteers_count": func.coalesce(CommunityTask.volunteers_count, 0) + 1,
+    })
+    if community_task is None:
+        db.rollback()
+        if not exists(db, CommunityTask, task_id):
+            raise HTTPException(status_code=404, detail="Community task not found")
         raise HTTPException(status_code=400, detail="Task is no longer available")
     
-    # Mark community task as assigned
-    community_task.status = "assigned"
-    community_task.volunteer_id = current_user.id
-    community_task.volunteer_name = f"{current_user.first_name} {current_user.last_name}"
-    
     # Create a personal task for the user
     personal_task = Task(
         title=community_task.title,
@@ -735,8 +1472,6 @@ def volunteer_for_task(task_id: int, current_user: User = Depends(get_current_us
     
     db.add(personal_task)
     db.commit()
-    db.refresh(community_task)
-    db.refresh(personal_task)
     
     return {
         "message": "Successfully volunteered for task",
@@ -744,10 +1479,32 @@ def volunteer_for_task(task_id: int, current_user: User = Depends(get_current_us
         "personal_task": TaskResponse.from_orm(personal_task)
     }
 
+@app.get("/api/community-tasks/volunteered")
+def get_volunteered_tasks(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Ids of the community tasks the current user volunteered for"""
+    rows = db.query(CommunityTaskVolunteer.task_id).filter(CommunityTaskVolunteer.user_id == current_user.id)
+    return [task_id for (task_id,) in rows]
+
 @app.get("/")
 def read_root():
     return {"message": "SafeZonePH API is running!"}
 
+@app.get("/api/health/db")
+def database_health():
+    """Connection pool occupancy and checkout wait statistics for the engine serving requests"""
+    serving_engine = async_engine.sync_engine if ASYNC_DB else engine
+    return {
+        "backend": serving_engine.dialect.name,
+        "driver": serving_engine.dialect.driver,
+        "async": ASYNC_DB,
+        "pool": pool_status(serving_engine),
+    }
+
+@app.get("/api/health/cache")
+def cache_health():
+    """Hit rates and occupancy of the feed response cache"""
+    return {"enabled": response_cache is not None, **(response_cache.stats() if response_cache else {})}
+
 @app.post("/api/seed-community-tasks")
 def seed_community_tasks(db: Session = Depends(get_db)):
     """Seed initial community tasks if none exist"""
@@ -794,6 +1551,11 @@ def seed_community_tasks(db: Session = Depends(get_db)):
 
 class BuddySession(Base):
     __tablename__ = "buddy_sessions"
+    __table_args__ = (
+        Index("ix_buddy_sessions_user_status", "user_id", "status"),
+        Index("ix_buddy_sessions_buddy_status", "buddy_id", "status"),
+        Index("ix_buddy_sessions_status", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -805,22 +1567,79 @@ class BuddySession(Base):
     destination = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
+    missed_alert_at = Column(DateTime, nullable=True)  # last missed check-in alert sent
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
-    type = Column(String, nullable=False)  # buddy_request, check_in_reminder, missed_check_in, emergency, system
+    type = Column(String, nullable=False)  # buddy_request, check_in_reminder, missed_check_in, emergency, global_alert, system
     title = Column(String, nullable=False)
     message = Column(String, nullable=False)
     related_id = Column(Integer, nullable=True)  # Related buddy session, task, etc.
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-# Create the new tables
-BuddySession.__table__.create(bind=engine, checkfirst=True)
-Notification.__table__.create(bind=engine, checkfirst=True)
+def serialize_notification(n: "Notification") -> dict:
+    return {
+        "id": n.id,
+        "type": n.type,
+        "title": n.title,
+        "message": n.message,
+        "relatedId": n.related_id,
+        "isRead": n.is_read,
+        "createdAt": n.created_at.isoformat() if n.created_at else None
+    }
+
+def count_unread_notifications(db: Session, user_id: int) -> int:
+    return db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    ).count()
+
+def publish_unread_count(user_id: int, db: Optional[Session] = None):
+    """Push the current unread count to the user's notification streams"""
+    if not notification_broker.connection_count(user_id):
+        return
+    owns_session = db is None
+    db = db or SessionLocal()
+    try:
+        count = count_unread_notifications(db, user_id)
+    finally:
+        if owns_session:
+            db.close()
+    notification_broker.publish([user_id], "unread_count", {"unreadCount": count})
+
+# Every Notification row is pushed to /api/notifications/stream once its transaction commits,
+# whichever endpoint created it. Rows are serialized at flush time because the session
+# can't load anything once after_commit runs.
+@event.listens_for(AppSession, "after_flush")
+def _collect_new_notifications(session, flush_context):
+    created = [obj for obj in session.new if isinstance(obj, Notification)]
+    if created:
+        pending = session.info.setdefault("new_notifications", [])
+        pending.extend(serialize_notification(n) | {"userId": n.user_id} for n in created)
+
+@event.listens_for(AppSession, "after_commit")
+def _publish_new_notifications(session):
+    pending = session.info.pop("new_notifications", None)
+    if not pending:
+        return
+    user_ids = set()
+    for payload in pending:
+        user_id = payload.pop("userId")
+        user_ids.add(user_id)
+        notification_broker.publish([user_id], "notification", payload, event_id=payload["id"])
+    for user_id in user_ids:
+        publish_unread_count(user_id)
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_new_notifications(session):
+    session.info.pop("new_notifications", None)
 
 # Pydantic models for buddy system
 class BuddySessionCreate(BaseModel):
@@ -857,6 +1676,8 @@ def create_buddy_session(
         destination=session_data.destination
     )
     db.add(new_session)
+    # Flush for the session's id, which the notification links to; both commit together below
+    db.flush()
     
     # Notify buddy
     notification = Notification(
@@ -869,7 +1690,6 @@ def create_buddy_session(
     db.add(notification)
     
     db.commit()
-    db.refresh(new_session)
     
     return {
         "id": new_session.id,
@@ -885,22 +1705,32 @@ def create_buddy_session(
 
 @app.get("/api/buddy/sessions")
 def get_buddy_sessions(
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all buddy sessions for current user"""
-    sessions = db.query(BuddySession).filter(
-        (BuddySession.user_id == current_user.id) | (BuddySession.buddy_id == current_user.id)
-    ).order_by(BuddySession.created_at.desc()).all()
+    """Get buddy sessions for current user, newest first"""
+    return buddy_sessions_page(db, BuddySession, current_user, page)
+
+def buddy_sessions_page(db: Session, model, current_user: User, page: PageParams):
+    """A page of the user's buddy sessions from the live table or its archive"""
+    sessions, next_cursor = paginate(
+        db.query(model).filter((model.user_id == current_user.id) | (model.buddy_id == current_user.id)),
+        model.created_at, model.id, page
+    )
+    
+    # Load every counterpart on this page in one query
+    other_ids = {s.buddy_id if s.user_id == current_user.id else s.user_id for s in sessions}
+    others = {u.id: u for u in db.query(User).filter(User.id.in_(other_ids)).all()} if other_ids else {}
     
     result = []
     for s in sessions:
         # Get buddy info
         if s.user_id == current_user.id:
-            other_user = db.query(User).filter(User.id == s.buddy_id).first()
+            other_user = others.get(s.buddy_id)
             role = "initiator"
         else:
-            other_user = db.query(User).filter(User.id == s.user_id).first()
+            other_user = others.get(s.user_id)
             role = "buddy"
         
         result.append({
@@ -916,7 +1746,7 @@ def get_buddy_sessions(
             "createdAt": s.created_at.isoformat() if s.created_at else None
         })
     
-    return result
+    return page_response(result, next_cursor)
 
 @app.get("/api/buddy/sessions/active")
 def get_active_buddy_session(
@@ -987,14 +1817,7 @@ def buddy_check_in(
     db.add(notification)
     
     # Award points for regular check-ins
-    current_user.points += 5
-    points_entry = PointsHistory(
-        user_id=current_user.id,
-        type="buddy_check_in",
-        description="Regular buddy check-in",
-        points=5
-    )
-    db.add(points_entry)
+    award_points(db, current_user, 5, "buddy_check_in", "Regular buddy check-in")
     
     db.commit()
     
@@ -1032,6 +1855,8 @@ def missed_check_in(
         related_id=session_id
     )
     db.add(notification)
+    # Counts as this interval's alert, so the check-in monitor doesn't send a second one
+    session.missed_alert_at = datetime.utcnow()
     db.commit()
     
     return {"message": "Missed check-in reported", "notificationSent": True}
@@ -1094,19 +1919,408 @@ def end_buddy_session(
     db.add(notification)
     
     # Award completion points
-    current_user.points += 25
-    points_entry = PointsHistory(
-        user_id=current_user.id,
-        type="buddy_session_completed",
-        description="Completed buddy session",
-        points=25
-    )
-    db.add(points_entry)
+    award_points(db, current_user, 25, "buddy_session_completed", "Completed buddy session")
     
     db.commit()
     
     return {"message": "Session ended successfully", "pointsEarned": 25}
 
+# ==========================================
+# MISSED CHECK-IN MONITOR
+# ==========================================
+# Active sessions' deadlines live in a timer wheel; committed changes to a session
+# reschedule it, and overdue ones alert the buddy without the client reporting it.
+
+CHECKIN_MONITOR_ENABLED = os.getenv("CHECKIN_MONITOR", "true").lower() == "true"
+CHECKIN_TICK_SECONDS = float(os.getenv("CHECKIN_TICK_SECONDS", 1))
+
+def _load_active_buddy_sessions(db: Session):
+    return db.query(
+        BuddySession.id, BuddySession.last_check_in, BuddySession.missed_alert_at, BuddySession.check_in_interval
+    ).filter(BuddySession.status == "active").yield_per(5000)
+
+def _raise_missed_check_ins(db: Session, session_ids: list[int]) -> list[tuple]:
+    """Alert buddies of overdue sessions; returns (session_id, next deadline) for sessions still active"""
+    now = datetime.utcnow()
+    overdue = db.query(
+        BuddySession.id, BuddySession.user_id, BuddySession.buddy_id, BuddySession.check_in_interval
+    ).filter(
+        BuddySession.id.in_(session_ids),
+        BuddySession.status == "active",
+        BuddySession.check_in_interval > 0
+    ).all()
+    
+    claimed = []
+    for session_id, user_id, buddy_id, interval in overdue:
+        cutoff = now - timedelta(minutes=interval)
+        # Conditional claim: loses to a check-in or to another worker's alert for this interval
+        won = db.query(BuddySession).filter(
+            BuddySession.id == session_id,
+            BuddySession.status == "active",
+            BuddySession.last_check_in <= cutoff,
+            or_(BuddySession.missed_alert_at == None, BuddySession.missed_alert_at <= cutoff)
+        ).update({BuddySession.missed_alert_at: now}, synchronize_session=False)
+        if won:
+            claimed.append((session_id, user_id, buddy_id))
+    
+    if claimed:
+        users = {u.id: u for u in db.query(User.id, User.first_name, User.last_name).filter(
+            User.id.in_({user_id for _, user_id, _ in claimed})
+        )}
+        for session_id, user_id, buddy_id in claimed:
+            missed_user = users.get(user_id)
+            name = f"{missed_user.first_name} {missed_user.last_name}" if missed_user else "Your buddy"
+            db.add(Notification(
+                user_id=buddy_id,
+                type="missed_check_in",
+                title="⚠️ Missed Check-In Alert",
+                message=f"{name} missed their check-in! Please try to contact them.",
+                related_id=session_id
+            ))
+            db.add(Notification(
+                user_id=user_id,
+                type="check_in_reminder",
+                title="Check-In Overdue",
+                message="You missed a buddy check-in. Check in now so your buddy knows you're safe.",
+                related_id=session_id
+            ))
+    db.commit()
+    
+    # Fresh deadlines from the database, whether or not this worker sent the alert
+    return [
+        (session_id, next_deadline(last_check_in, missed_alert_at, interval))
+        for session_id, last_check_in, missed_alert_at, interval in _load_active_buddy_sessions(db).filter(
+            BuddySession.id.in_(session_ids)
+        )
+    ]
+
+checkin_monitor = CheckInMonitor(
+    _load_active_buddy_sessions,
+    lambda session_ids: run_in_new_session(_raise_missed_check_ins, session_ids),
+    tick=CHECKIN_TICK_SECONDS,
+)
+
+@event.listens_for(AppSession, "after_flush")
+def _collect_buddy_deadlines(session, flush_context):
+    deadlines = {}
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, BuddySession):
+            deadlines[obj.id] = next_deadline(obj.last_check_in, obj.missed_alert_at, obj.check_in_interval) \
+                if obj.status == "active" else None
+    for obj in session.deleted:
+        if isinstance(obj, BuddySession):
+            deadlines[obj.id] = None
+    if deadlines:
+        session.info.setdefault("buddy_deadlines", {}).update(deadlines)
+
+@event.listens_for(AppSession, "after_commit")
+def _apply_buddy_deadlines(session):
+    for session_id, deadline in session.info.pop("buddy_deadlines", {}).items():
+        checkin_monitor.schedule(session_id, deadline)
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_buddy_deadlines(session):
+    session.info.pop("buddy_deadlines", None)
+
+@app.on_event("startup")
+async def start_checkin_monitor():
+    if CHECKIN_MONITOR_ENABLED:
+        checkin_monitor.start(lambda: run_in_new_session(checkin_monitor.load))
+
+async def stop_checkin_monitor():
+    await checkin_monitor.stop()
+
+# Stop sweeping before the engines are disposed
+app.router.on_shutdown.insert(0, stop_checkin_monitor)
+
+# ==========================================
+# ALERT FAN-OUT
+# ==========================================
+# A new alert notifies everyone who lives in its affected areas. Recipients come
+# from the user_areas inverted index in user id order; each chunk is one executemany
+# INSERT committed with the alert's progress cursor, so delivery runs after the
+# response, resumes after a restart and never notifies anyone twice.
+
+ALERT_FANOUT_BATCH_SIZE = int(os.getenv("ALERT_FANOUT_BATCH_SIZE", 1000))
+
+area_index = AreaIndex(UserArea.__table__, User)
+area_index.install(AppSession)
+
+def _fan_out_alert(db: Session, alert_id: int) -> int:
+    """Notify the alert's affected residents chunk by chunk; returns how many were notified"""
+    import json
+    alert = db.query(
+        GlobalAlert.user_id, GlobalAlert.title, GlobalAlert.message, GlobalAlert.affected_areas,
+        GlobalAlert.notified_through, GlobalAlert.notified_at
+    ).filter(GlobalAlert.id == alert_id).first()
+    if alert is None or alert.notified_at is not None:
+        return 0
+    
+    areas = json.loads(alert.affected_areas)
+    # Barangays the alert names bare are the ones in its author's city
+    home_city = db.query(User.city).filter(User.id == alert.user_id).scalar()
+    alerts = GlobalAlert.__table__
+    cursor = alert.notified_through or 0
+    notified = 0
+    while True:
+        user_ids = area_index.recipients(db, areas, cursor, ALERT_FANOUT_BATCH_SIZE, home_city)
+        done = len(user_ids) < ALERT_FANOUT_BATCH_SIZE
+        now = datetime.utcnow()
+        # Claim the chunk by moving the cursor on from where it was read; another
+        # worker delivering the same alert makes this match nothing
+        claimed = db.execute(alerts.update().where(
+            alerts.c.id == alert_id,
+            func.coalesce(alerts.c.notified_through, 0) == cursor,
+            alerts.c.notified_at == None
+        ).values(
+            notified_through=user_ids[-1] if user_ids else cursor,
+            notified_at=now if done else None
+        )).rowcount
+        if not claimed:
+            db.rollback()
+            break
+        
+        recipients = [user_id for user_id in user_ids if user_id != alert.user_id]
+        if recipients:
+            db.execute(Notification.__table__.insert(), [{
+                "user_id": user_id,
+                "type": "global_alert",
+                "title": alert.title,
+                "message": alert.message,
+                "related_id": alert_id,
+                "is_read": False,
+                "created_at": now,
+            } for user_id in recipients])
+        db.commit()
+        notified += len(recipients)
+        _publish_alert_notifications(db, alert_id, recipients)
+        if done:
+            break
+        cursor = user_ids[-1]
+    return notified
+
+def _publish_alert_notifications(db: Session, alert_id: int, user_ids: list[int]):
+    """Bulk inserts skip the notification hooks, so push to open streams here"""
+    connected = notification_broker.connected(user_ids)
+    if not connected:
+        return
+    for notification in db.query(Notification).filter(
+        Notification.user_id.in_(connected),
+        Notification.type == "global_alert",
+        Notification.related_id == alert_id
+    ):
+        notification_broker.publish(
+            [notification.user_id], "notification", serialize_notification(notification), event_id=notification.id
+        )
+    for user_id in connected:
+        publish_unread_count(user_id, db)
+
+async def deliver_alert(alert_id: int):
+    await run_in_new_session(_fan_out_alert, alert_id)
+
+def _undelivered_alerts(db: Session) -> list[int]:
+    return [alert_id for (alert_id,) in db.query(GlobalAlert.id).filter(
+        GlobalAlert.notified_at == None,
+        GlobalAlert.is_active == True
+    ).order_by(GlobalAlert.id)]
+
+async def _resume_alert_fan_outs():
+    for alert_id in await run_in_new_session(_undelivered_alerts):
+        await deliver_alert(alert_id)
+
+alert_fan_out_tasks: set[asyncio.Task] = set()
+
+@app.on_event("startup")
+async def resume_alert_fan_outs():
+    # Alerts whose delivery a restart cut short
+    alert_fan_out_tasks.add(asyncio.get_running_loop().create_task(_resume_alert_fan_outs()))
+
+async def stop_alert_fan_outs():
+    for task in alert_fan_out_tasks:
+        task.cancel()
+    await asyncio.gather(*alert_fan_out_tasks, return_exceptions=True)
+    alert_fan_out_tasks.clear()
+
+app.router.on_shutdown.insert(0, stop_alert_fan_outs)
+
+# ==========================================
+# DATA LIFECYCLE
+# ==========================================
+# Cold rows move from the hot tables to <table>_archive twins in the same database,
+# so each batch is one atomic transaction (attached files aren't atomic under WAL).
+# Only rows nothing live depends on are cold: unread notifications and messages
+# (unread counts), open requests and active sessions never move.
+
+NotificationArchive = archive_model(
+    Base, Notification, Index("ix_notifications_archive_user_created", "user_id", "created_at")
+)
+MessageArchive = archive_model(
+    Base, Message, Index("ix_messages_archive_conversation_created", "conversation_id", "created_at")
+)
+PointsHistoryArchive = archive_model(
+    Base, PointsHistory, Index("ix_points_history_archive_user_created", "user_id", "created_at")
+)
+HelpRequestArchive = archive_model(
+    Base, HelpRequest, Index("ix_help_requests_archive_created_id", "created_at", "id")
+)
+BuddySessionArchive = archive_model(
+    Base, BuddySession,
+    Index("ix_buddy_sessions_archive_user_created", "user_id", "created_at"),
+    Index("ix_buddy_sessions_archive_buddy_created", "buddy_id", "created_at"),
+)
+
+def retention_days(name: str, default: int) -> timedelta:
+    return timedelta(days=int(os.getenv(f"RETENTION_DAYS_{name.upper()}", default)))
+
+lifecycle = LifecycleEngine([
+    RetentionPolicy("notifications", Notification, NotificationArchive, retention_days("notifications", 30),
+                    lambda cutoff: [Notification.is_read == True, Notification.created_at < cutoff]),
+    RetentionPolicy("messages", Message, MessageArchive, retention_days("messages", 180),
+                    lambda cutoff: [Message.read == True, Message.created_at < cutoff]),
+    RetentionPolicy("points_history", PointsHistory, PointsHistoryArchive, retention_days("points_history", 365),
+                    lambda cutoff: [PointsHistory.created_at < cutoff]),
+    RetentionPolicy("help_requests", HelpRequest, HelpRequestArchive, retention_days("help_requests", 30),
+                    lambda cutoff: [HelpRequest.status == "resolved", HelpRequest.created_at < cutoff]),
+    RetentionPolicy("buddy_sessions", BuddySession, BuddySessionArchive, retention_days("buddy_sessions", 30),
+                    lambda cutoff: [BuddySession.status == "completed", BuddySession.ended_at < cutoff]),
+], run_in_new_session,
+    interval=float(os.getenv("LIFECYCLE_INTERVAL_SECONDS", 3600)),
+    batch_size=int(os.getenv("LIFECYCLE_BATCH_SIZE", 500)),
+)
+
+@app.on_event("startup")
+async def start_lifecycle():
+    if os.getenv("LIFECYCLE", "true").lower() == "true":
+        lifecycle.start()
+
+async def stop_lifecycle():
+    await lifecycle.stop()
+
+app.router.on_shutdown.insert(0, stop_lifecycle)
+
+@app.get("/api/health/lifecycle")
+def lifecycle_health():
+    """Rows archived per table since startup and the retention in force"""
+    return lifecycle.stats()
+
+# Older history: explicit paths over the archives, paged the same way as the live lists
+
+@app.get("/api/notifications/older")
+def get_older_notifications(
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Archived notifications for the current user, newest first"""
+    notifications, next_cursor = paginate(
+        db.query(NotificationArchive).filter(NotificationArchive.user_id == current_user.id),
+        NotificationArchive.created_at, NotificationArchive.id, page
+    )
+    return page_response([serialize_notification(n) for n in notifications], next_cursor)
+
+@app.get("/api/conversations/{user_id}/messages/older", response_model=MessagePage)
+def get_older_conversation_messages(
+    user_id: int,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Archived messages with a user, paged like the live conversation"""
+    conversation = db.query(Conversation).filter(
+        ((Conversation.user1_id == current_user.id) & (Conversation.user2_id == user_id)) |
+        ((Conversation.user1_id == user_id) & (Conversation.user2_id == current_user.id))
+    ).first()
+    if not conversation:
+        return page_response([], None)
+    
+    messages, next_cursor = paginate(
+        db.query(MessageArchive).filter(MessageArchive.conversation_id == conversation.id),
+        MessageArchive.created_at, MessageArchive.id, page
+    )
+    messages.reverse()
+    return page_response(messages, next_cursor)
+
+@app.get("/api/points/history/older")
+def get_older_points_history(page: PageParams = Depends(), current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Archived points history for the current user"""
+    return points_history_page(db, PointsHistoryArchive, current_user.id, page)
+
+archived_help_request_projection = Projection(HelpRequestArchive, HelpRequestResponse)
+
+@app.get("/api/help-requests/older", response_model=HelpRequestPage)
+def get_older_help_requests(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """Resolved help requests past retention"""
+    rows, next_cursor = paginate(
+        archived_help_request_projection.query(db), HelpRequestArchive.created_at, HelpRequestArchive.id, page
+    )
+    return archived_help_request_projection.page(rows, next_cursor)
+
+@app.get("/api/buddy/sessions/older")
+def get_older_buddy_sessions(
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Archived buddy sessions for the current user"""
+    return buddy_sessions_page(db, BuddySessionArchive, current_user, page)
+
+# ==========================================
+# SCHEDULED MAINTENANCE
+# ==========================================
+# One pass of each background worker, for deployments that can't keep them running
+# (Vercel runs this from the "crons" entry in vercel.json). Vercel sends CRON_SECRET
+# as a bearer token; while CRON_SECRET is unset the endpoint refuses every call.
+
+CRON_SECRET = os.getenv("CRON_SECRET")
+
+@app.get("/api/cron/maintenance")
+async def run_maintenance(authorization: Optional[str] = Header(None)):
+    """Expire alerts, alert buddies of missed check-ins, finish alert fan-outs, archive cold rows"""
+    if not CRON_SECRET or not secrets.compare_digest((authorization or "").encode(), f"Bearer {CRON_SECRET}".encode()):
+        raise HTTPException(status_code=401, detail="Not authorized")
+    next_alert_expiry = await alert_sweeper.sweep_once()
+    # Timers already on the wheel are kept, so this is safe next to a running monitor
+    await run_in_new_session(checkin_monitor.load)
+    missed_check_ins = await checkin_monitor.run_once()
+    await _resume_alert_fan_outs()
+    archived = await lifecycle.run_once()
+    return {"next_alert_expiry": next_alert_expiry, "missed_check_ins": missed_check_ins, "archived": archived}
+
+# ==========================================
+# SEARCH
+# ==========================================
+# Full-text indexes are built and kept in sync by migration 0010 (FTS5 triggers on
+# SQLite, a generated tsvector on Postgres); archived rows drop out of them.
+
+search_index = SearchIndex([
+    SearchSource("help_request", HelpRequest, ("title", "description", "location"),
+                 title="title", details=("type", "status", "urgency")),
+    SearchSource("community_task", CommunityTask, ("title", "description", "location"),
+                 title="title", details=("status", "urgency")),
+    SearchSource("alert", GlobalAlert, ("title", "message", "affected_areas"),
+                 title="title", details=("type", "priority", "is_active")),
+    SearchSource("message", Message, ("content",),
+                 details=("conversation_id", "sender_id", "receiver_id"), scope=("sender_id", "receiver_id")),
+])
+
+@app.get("/api/search", response_model=SearchResults)
+def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[list[SearchType]] = Query(None, description="kinds to search (repeatable); all by default"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=200),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+):
+    """Ranked hits with highlighted snippets. Messages are only searched for a
+    signed-in user, and only within that user's own conversations."""
+    user = get_user_from_token(credentials.credentials, db) if credentials else None
+    if user is None and types and "message" in types:
+        raise HTTPException(status_code=401, detail="Sign in to search messages")
+    kinds = list(dict.fromkeys(types)) if types else list(search_index.sources)
+    hits = search_index.search(db, q, kinds, user.id if user else None, limit=limit, offset=offset)
+    return FastJSONResponse({"query": q, "items": hits})
+
 # Notification Endpoints
 @app.get("/api/notifications")
 def get_notifications(
@@ -1122,18 +2336,7 @@ def get_notifications(
     
     notifications = query.order_by(Notification.created_at.desc()).limit(50).all()
     
-    return [
-        {
-            "id": n.id,
-            "type": n.type,
-            "title": n.title,
-            "message": n.message,
-            "relatedId": n.related_id,
-            "isRead": n.is_read,
-            "createdAt": n.created_at.isoformat() if n.created_at else None
-        }
-        for n in notifications
-    ]
+    return [serialize_notification(n) for n in notifications]
 
 @app.get("/api/notifications/unread-count")
 def get_unread_count(
@@ -1141,12 +2344,83 @@ def get_unread_count(
     db: Session = Depends(get_db)
 ):
     """Get count of unread notifications"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    return {"unreadCount": count_unread_notifications(db, current_user.id)}
+
+NOTIFICATION_STREAM_KEEPALIVE_SECONDS = 15
+NOTIFICATION_STREAM_REPLAY_LIMIT = 100
+
+def _load_notification_backlog(db: Session, user_id: int, last_event_id: Optional[int]):
+    backlog = []
+    if last_event_id is not None:
+        backlog = db.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.id > last_event_id
+        ).order_by(Notification.id).limit(NOTIFICATION_STREAM_REPLAY_LIMIT).all()
+    return [serialize_notification(n) for n in backlog], count_unread_notifications(db, user_id)
+
+@app.get("/api/notifications/stream")
+async def stream_notifications(
+    token: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Server-Sent Events feed of new notifications and unread counts.
+    EventSource can't set headers, so the JWT may also come in as ?token=."""
+    token = credentials.credentials if credentials else token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        resume_after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_after = None
     
-    return {"unreadCount": count}
+    user_id = await load_user_id(token)
+    # Subscribe before reading the backlog so nothing committed in between is lost
+    subscriber = notification_broker.subscribe(user_id)
+    try:
+        backlog, unread_count = await run_in_new_session(_load_notification_backlog, user_id, resume_after)
+    except BaseException:
+        notification_broker.unsubscribe(subscriber)
+        raise
+    
+    async def events():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            last_sent = resume_after or 0
+            for payload in backlog:
+                yield notification_broker.encoder("notification", payload, payload["id"])
+                last_sent = payload["id"]
+            yield notification_broker.encoder("unread_count", {"unreadCount": unread_count})
+            
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscriber.next(), NOTIFICATION_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    # Evicted as a slow consumer; EventSource reconnects with Last-Event-ID
+                    return
+                event_id, payload = item
+                if event_id is not None:
+                    if event_id <= last_sent:
+                        # Already sent as part of the replayed backlog
+                        continue
+                    last_sent = event_id
+                yield payload
+        finally:
+            notification_broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.put("/api/notifications/{notification_id}/read")
 def mark_notification_read(
@@ -1165,6 +2439,7 @@ def mark_notification_read(
     
     notification.is_read = True
     db.commit()
+    publish_unread_count(current_user.id, db)
     
     return {"message": "Notification marked as read"}
 
@@ -1180,6 +2455,7 @@ def mark_all_notifications_read(
     ).update({"is_read": True})
     
     db.commit()
+    publish_unread_count(current_user.id, db)
     
     return {"message": "All notifications marked as read"}
 
@@ -1199,7 +2475,6 @@ def create_notification(
     )
     db.add(notification)
     db.commit()
-    db.refresh(notification)
     
     return {
         "id": notification.id,
@@ -1213,57 +2488,83 @@ def create_notification(
 
 @app.get("/api/conversations", response_model=list[ConversationResponse])
 def get_conversations(
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all conversations for the current user"""
-    # Find all conversations where user is participant
-    conversations_data = []
-    
-    # Get conversations where user is user1
-    convs1 = db.query(Conversation).filter(Conversation.user1_id == current_user.id).all()
-    # Get conversations where user is user2
-    convs2 = db.query(Conversation).filter(Conversation.user2_id == current_user.id).all()
-    
-    all_convs = convs1 + convs2
-    
-    for conv in all_convs:
-        # Determine the other participant
-        participant_id = conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
-        participant = db.query(User).filter(User.id == participant_id).first()
-        
-        if not participant:
-            continue
-        
-        # Count unread messages
-        unread_count = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.receiver_id == current_user.id,
-            Message.read == False
-        ).count()
-        
-        conversations_data.append({
-            "id": conv.id,
-            "participant_id": participant.id,
-            "participant_name": f"{participant.first_name} {participant.last_name}",
-            "participant_email": participant.email,
-            "last_message": conv.last_message,
-            "last_message_at": conv.last_message_at,
+    """Get conversations for the current user, most recent first"""
+    # Unread counts aggregated per conversation (served by ix_messages_receiver_read)
+    unread = db.query(
+        Message.conversation_id.label("conversation_id"),
+        func.count(Message.id).label("unread_count")
+    ).filter(
+        Message.receiver_id == current_user.id,
+        Message.read == False
+    ).group_by(Message.conversation_id).subquery()
+
+    # The other participant is whichever side of the pair isn't the current user
+    participant_id = case(
+        (Conversation.user1_id == current_user.id, Conversation.user2_id),
+        else_=Conversation.user1_id
+    )
+
+    rows = db.query(
+        Conversation.id,
+        User.id,
+        (User.first_name + " " + User.last_name),
+        User.email,
+        Conversation.last_message,
+        Conversation.last_message_at,
+        func.coalesce(unread.c.unread_count, 0)
+    ).join(
+        User, User.id == participant_id
+    ).outerjoin(
+        unread, unread.c.conversation_id == Conversation.id
+    ).filter(
+        or_(Conversation.user1_id == current_user.id, Conversation.user2_id == current_user.id)
+    ).order_by(
+        Conversation.last_message_at.desc(), Conversation.id.desc()
+    ).limit(limit).all()
+
+    return [
+        {
+            "id": conv_id,
+            "participant_id": participant_id,
+            "participant_name": participant_name,
+            "participant_email": participant_email,
+            "last_message": last_message,
+            "last_message_at": last_message_at,
             "unread_count": unread_count
-        })
-    
-    # Sort by last message time
-    conversations_data.sort(key=lambda x: x["last_message_at"], reverse=True)
+        }
+        for conv_id, participant_id, participant_name, participant_email, last_message, last_message_at, unread_count in rows
+    ]
+
+def mark_conversation_read(db: Session, conversation: Conversation, reader_id: int, other_id: int) -> int:
+    """Mark the reader's unread messages in a conversation read and tell both sides"""
+    marked = db.query(Message).filter(
+        Message.conversation_id == conversation.id,
+        Message.receiver_id == reader_id,
+        Message.read == False
+    ).update({"read": True})
+    db.commit()
     
-    return conversations_data
+    if marked:
+        chat_broker.publish([other_id, reader_id], "message.read", {
+            "conversation_id": conversation.id,
+            "reader_id": reader_id,
+            "read_at": datetime.utcnow().isoformat()
+        })
+    return marked
 
-@app.get("/api/conversations/{user_id}/messages", response_model=list[MessageResponse])
+@app.get("/api/conversations/{user_id}/messages", response_model=MessagePage)
 def get_conversation_messages(
     user_id: int,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all messages in a conversation with a specific user"""
+    """Get messages in a conversation with a specific user.
+    Pages walk backwards from the newest message; each page is in chronological order."""
     # Find or create conversation
     conversation = db.query(Conversation).filter(
         ((Conversation.user1_id == current_user.id) & (Conversation.user2_id == user_id)) |
@@ -1279,23 +2580,34 @@ def get_conversation_messages(
         )
         db.add(conversation)
         db.commit()
-        db.refresh(conversation)
-        return []
+        return page_response([], None)
     
-    # Get all messages in this conversation
-    messages = db.query(Message).filter(
-        Message.conversation_id == conversation.id
-    ).order_by(Message.created_at).all()
+    messages, next_cursor = paginate(
+        db.query(Message).filter(Message.conversation_id == conversation.id),
+        Message.created_at, Message.id, page
+    )
+    messages.reverse()
+    mark_conversation_read(db, conversation, current_user.id, user_id)
     
-    # Mark messages as read
-    db.query(Message).filter(
-        Message.conversation_id == conversation.id,
-        Message.receiver_id == current_user.id,
-        Message.read == False
-    ).update({"read": True})
-    db.commit()
+    return page_response(messages, next_cursor)
+
+@app.put("/api/conversations/{user_id}/read")
+def mark_conversation_read_endpoint(
+    user_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark every message from a user as read, without fetching the thread"""
+    conversation = db.query(Conversation).filter(
+        ((Conversation.user1_id == current_user.id) & (Conversation.user2_id == user_id)) |
+        ((Conversation.user1_id == user_id) & (Conversation.user2_id == current_user.id))
+    ).first()
     
-    return messages
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    marked = mark_conversation_read(db, conversation, current_user.id, user_id)
+    return {"message": "Conversation marked as read", "marked": marked}
 
 @app.post("/api/messages", response_model=MessageResponse)
 def send_message(
@@ -1326,13 +2638,12 @@ def send_message(
             last_message_at=datetime.utcnow()
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        # Flush for the new conversation's id; everything commits together below
+        db.flush()
     else:
         # Update conversation
         conversation.last_message = message_data.content[:100]
         conversation.last_message_at = datetime.utcnow()
-        db.commit()
     
     # Create message
     message = Message(
@@ -1343,8 +2654,6 @@ def send_message(
         read=False
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
     
     # Create notification for receiver
     notification = Notification(
@@ -1357,26 +2666,129 @@ def send_message(
     db.add(notification)
     db.commit()
     
+    payload = jsonable_encoder(MessageResponse.from_orm(message))
+    chat_broker.publish([current_user.id, message_data.receiver_id], "message.new", payload)
+    
     return message
 
+# ===== REALTIME ENDPOINTS =====
+
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", 10))
+
+@app.websocket("/api/ws")
+async def realtime_socket(websocket: WebSocket, token: str = Query(...)):
+    """Push channel for new messages and read receipts.
+    Browsers can't set headers on a WebSocket, so the JWT comes in as ?token=."""
+    try:
+        user_id = await load_user_id(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscriber = chat_broker.subscribe(user_id)
+    
+    async def send_events():
+        while True:
+            item = await subscriber.next()
+            if item is None:
+                # Evicted as a slow consumer; the client reconnects and refetches
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            _event_id, payload = item
+            await asyncio.wait_for(websocket.send_text(payload), WS_SEND_TIMEOUT_SECONDS)
+    
+    async def receive_events():
+        while True:
+            text = await websocket.receive_text()
+            if text == "ping":
+                subscriber.offer('{"event": "pong"}')
+    
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_events())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        chat_broker.unsubscribe(subscriber)
+
 @app.get("/api/users/buddies")
 def get_buddies(
+    q: Optional[str] = Query(None, max_length=100, description="match in name, email or location"),
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users (potential buddies) for messaging"""
-    users = db.query(User).filter(User.id != current_user.id).all()
-    
-    return [{
+    """Get users (potential buddies) for messaging, newest members first; ?q= searches all of them"""
+    query = db.query(User).filter(User.id != current_user.id)
+    if q and q.strip():
+        needle = q.strip().lower()
+        query = query.filter(or_(*(
+            func.lower(column).contains(needle, autoescape=True)
+            for column in (User.first_name + " " + User.last_name, User.email, User.location)
+        )))
+    users, next_cursor = paginate(query, User.created_at, User.id, page)
+    
+    return page_response([{
         "id": user.id,
         "name": f"{user.first_name} {user.last_name}",
         "email": user.email,
         "location": user.location,
         "points": user.points,
         "rank": user.rank
-    } for user in users]
+    } for user in users], next_cursor)
+
+def _sessions_together(db: Session, user_id: int) -> dict[int, int]:
+    """Buddy sessions shared with each other user, archived ones included"""
+    together: dict[int, int] = {}
+    for model in (BuddySession, BuddySessionArchive):
+        other = case((model.user_id == user_id, model.buddy_id), else_=model.user_id)
+        for other_id, count in db.query(other, func.count()).filter(
+            or_(model.user_id == user_id, model.buddy_id == user_id)
+        ).group_by(other).all():
+            together[other_id] = together.get(other_id, 0) + count
+    return together
+
+@app.get("/api/buddies/suggestions", response_model=BuddySuggestions)
+def get_buddy_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Best buddy candidates for the current user, scored on proximity, shared barangay / city,
+    points, sessions together and recent activity. lat/lng (where the user is now) take the
+    place of their home coordinates."""
+    if not buddy_matcher.available:
+        raise HTTPException(status_code=503, detail="Buddy suggestions are unavailable on this server")
+    require_coordinates_pair(lat, lng)
+    buddy_matcher.ensure_loaded(db)
+    
+    ranked = buddy_matcher.suggest(current_user.id, limit, lat, lng, _sessions_together(db, current_user.id))
+    users = {user.id: user for user in db.query(
+        User.id, User.first_name, User.last_name, User.location, User.barangay, User.city, User.points, User.rank
+    ).filter(User.id.in_([match["user_id"] for match in ranked])).all()}
+    
+    return FastJSONResponse({"items": [{
+        "id": user.id,
+        "name": f"{user.first_name} {user.last_name}",
+        "location": user.location,
+        "barangay": user.barangay,
+        "city": user.city,
+        "points": user.points,
+        "rank": user.rank,
+        "score": match["score"],
+        "distance_km": match["distance_km"],
+        "same_barangay": match["same_barangay"],
+        "same_city": match["same_city"],
+        "sessions_together": match["sessions_together"],
+    } for match in ranked if (user := users.get(match["user_id"])) is not None]})
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host=os.getenv("HOST", "127.0.0.1"),
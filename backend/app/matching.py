@@ -0,0 +1,329 @@
+"""
+SafeZonePH Buddy Matching
+Scores every user as a potential buddy for the caller: proximity, same barangay /
+city, points, sessions together and recent activity. Features live in compact
+NumPy columns, loaded once and then updated from committed changes, so a top-k
+query is a handful of vector operations instead of a table scan. Changes made by
+other processes arrive when the columns are reloaded (max_age).
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from areas import area_key
+from checkins import to_timestamp
+from geo import EARTH_RADIUS_KM, load_numpy
+
+numpy = None  # bound by _load_numpy() on first use; suggestions are unavailable without it
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Weights of each signal in the score; every signal is scaled to [0, 1]
+WEIGHTS = {
+    "proximity": 3.0,
+    "same_barangay": 2.0,
+    "same_city": 1.0,
+    "points": 1.0,
+    "history": 1.5,
+    "recent": 1.0,
+}
+PROXIMITY_SCALE_KM = 5.0  # proximity is 1/e at this distance
+RECENT_SCALE_DAYS = 7.0   # recency is 1/e this long after a user's last activity
+HISTORY_CAP = 5           # sessions together beyond this add nothing
+
+INITIAL_CAPACITY = 1024
+BASE_TTL_SECONDS = 60.0  # how long the cached points + recency scores are reused
+SAMPLE_STRIDE = 64       # top-k preselection samples every n-th score
+
+
+# Everything a snapshot replaces; swapped in together under the lock
+_SNAPSHOT_STATE = (
+    "_interned", "_codes", "_slots", "_size", "_base", "_base_at", "_top_points", "_stale",
+    "_ids", "_lat", "_lng", "_city", "_barangay", "_points", "_active", "_last_active",
+)
+
+
+class BuddyMatcher:
+    """Column store of user features with O(1) upserts and a vectorized top-k.
+
+    Rows are slots in preallocated arrays (grown by doubling); a removed user's
+    slot is simply marked inactive. Loading mirrors the leaderboard: a snapshot
+    on first use, with commits that land meanwhile replayed on top, and a fresh
+    snapshot once it is max_age seconds old (None: never) for other workers' writes.
+    Snapshots are built in a separate set of columns and swapped in under the lock.
+
+    The caller-independent part of the score (points + recency, -inf when
+    inactive) is cached for BASE_TTL_SECONDS; updated slots are recomputed in
+    one batch by the next query, which then only adds the caller-relative terms.
+    """
+
+    def __init__(self, loader: Callable[..., Iterable[tuple]], max_age: Optional[float] = None):
+        # loader(db) yields (user_id, latitude, longitude, city, barangay, points, is_active, last_active)
+        self._loader = loader
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._loading = False
+        self._pending: list[tuple] = []
+        self._interned: dict[tuple, int] = {}
+        self._codes: dict[tuple, tuple[int, int]] = {}
+        self._slots: dict[int, int] = {}
+        self._size = 0
+        self._base = None
+        self._base_at = 0.0
+        self._top_points = 0.0
+        self._stale: set[int] = set()
+        self._ids = None  # columns are allocated by the first load
+
+    @property
+    def available(self) -> bool:
+        return _load_numpy()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slots)
+
+    def _allocate(self, capacity: int):
+        columns = {
+            "ids": numpy.zeros(capacity, dtype=numpy.int64),
+            # Unknown coordinates are +inf: infinitely far, so proximity is exp(-inf) = 0
+            "lat": numpy.full(capacity, numpy.inf, dtype=numpy.float32),
+            "lng": numpy.full(capacity, numpy.inf, dtype=numpy.float32),
+            "city": numpy.full(capacity, -1, dtype=numpy.int32),
+            "barangay": numpy.full(capacity, -1, dtype=numpy.int32),
+            "points": numpy.zeros(capacity, dtype=numpy.float32),
+            "active": numpy.zeros(capacity, dtype=bool),
+            "last_active": numpy.zeros(capacity, dtype=numpy.float64),
+        }
+        self._base = None
+        for name, column in columns.items():
+            existing = getattr(self, f"_{name}", None)
+            if existing is not None:
+                column[:self._size] = existing[:self._size]
+            setattr(self, f"_{name}", column)
+
+    def _area_codes(self, city: Optional[str], barangay: Optional[str]) -> tuple[int, int]:
+        """Interned (city, barangay) codes, -1 where unknown. Barangay names repeat
+        across cities, so they are qualified by city."""
+        codes = self._codes.get((city, barangay))
+        if codes is None:
+            city_key, barangay_key = area_key(city), area_key(barangay)
+            keys = (("city", city_key) if city_key else None, ("barangay", city_key, barangay_key) if barangay_key else None)
+            codes = self._codes[(city, barangay)] = tuple(
+                -1 if key is None else self._interned.setdefault(key, len(self._interned)) for key in keys
+            )
+        return codes
+
+    # ---- loading and updates ----
+
+    def _current(self) -> bool:
+        return self._loaded and (self.max_age is None or time.monotonic() - self._loaded_at < self.max_age)
+
+    def ensure_loaded(self, db):
+        if self._current() or not _load_numpy():
+            return
+        with self._lock:
+            if self._current() or self._loading:
+                return
+            self._loading = True
+        try:
+            rows = list(self._loader(db))
+            # Built off to the side: suggest() and apply() keep using the current columns meanwhile
+            fresh = BuddyMatcher(self._loader, self.max_age)
+            fresh._allocate(max(INITIAL_CAPACITY, 1 << max(len(rows) - 1, 0).bit_length()))
+            for row in rows:
+                fresh._upsert(*row)
+        except BaseException:
+            with self._lock:
+                self._loading = False
+                self._pending.clear()
+            raise
+        with self._lock:
+            for name in _SNAPSHOT_STATE:
+                setattr(self, name, getattr(fresh, name))
+            # Commits that landed while the snapshot was being read and built
+            for change in self._pending:
+                self._apply(change)
+            self._pending.clear()
+            self._loading = False
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+
+    def apply(self, changes: Iterable[tuple]):
+        """Committed changes: ("user", user_id, lat, lng, city, barangay, points, is_active),
+        ("remove", user_id) or ("activity", user_id, when)"""
+        with self._lock:
+            for change in changes:
+                if self._loaded:
+                    self._apply(change)
+                if self._loading:
+                    self._pending.append(change)
+
+    def _apply(self, change: tuple):
+        kind, user_id, *values = change
+        if kind == "user":
+            slot = self._slots.get(user_id)
+            last_active = self._last_active[slot] if slot is not None else 0.0
+            self._upsert(user_id, *values, last_active)
+        elif kind == "remove":
+            slot = self._slots.get(user_id)
+            if slot is not None:
+                self._active[slot] = False
+                self._stale.add(slot)
+        elif kind == "activity":
+            slot = self._slots.get(user_id)
+            if slot is not None:
+                self._last_active[slot] = max(self._last_active[slot], _timestamp(values[0]))
+                self._stale.add(slot)
+
+    def _upsert(self, user_id: int, latitude, longitude, city, barangay, points, is_active, last_active):
+        slot = self._slots.get(user_id)
+        if slot is None:
+            if self._size == len(self._ids):
+                self._allocate(len(self._ids) * 2)
+            slot = self._size
+            self._size += 1
+            self._slots[user_id] = slot
+            self._ids[slot] = user_id
+        located = latitude is not None and longitude is not None
+        self._lat[slot] = latitude if located else numpy.inf
+        self._lng[slot] = longitude if located else numpy.inf
+        self._city[slot], self._barangay[slot] = self._area_codes(city, barangay)
+        self._points[slot] = points or 0
+        self._active[slot] = is_active is not False
+        self._last_active[slot] = _timestamp(last_active)
+        if self._points[slot] > self._top_points:
+            self._top_points = float(self._points[slot])
+            self._base = None  # rescales every user's points term
+        self._stale.add(slot)
+
+    # ---- scoring ----
+
+    def _base_scores(self, points, last_active, active, now: float):
+        """Points + recency terms, -inf for users who can't be suggested"""
+        score = numpy.zeros(len(points), dtype=numpy.float32)
+        if self._top_points > 0:
+            score += WEIGHTS["points"] * (numpy.log1p(numpy.maximum(points, 0)) / math.log1p(self._top_points))
+        age_days = ((now - last_active) / 86400.0).astype(numpy.float32)
+        recent = numpy.exp(-numpy.maximum(age_days, 0) / numpy.float32(RECENT_SCALE_DAYS))
+        score += WEIGHTS["recent"] * numpy.where(last_active > 0, recent, numpy.float32(0))
+        return numpy.where(active, score, -numpy.inf).astype(numpy.float32)
+
+    def _current_base(self, now: float):
+        n = self._size
+        if self._base is None or now - self._base_at > BASE_TTL_SECONDS:
+            self._base = self._base_scores(self._points[:n], self._last_active[:n], self._active[:n], now)
+            self._base_at = now
+        elif self._stale:
+            if len(self._base) < n:
+                self._base = numpy.concatenate([self._base, numpy.zeros(n - len(self._base), dtype=numpy.float32)])
+            slots = numpy.fromiter(self._stale, dtype=numpy.int64, count=len(self._stale))
+            self._base[slots] = self._base_scores(
+                self._points[slots], self._last_active[slots], self._active[slots], self._base_at
+            )
+        self._stale.clear()
+        return self._base
+
+    def suggest(self, user_id: int, limit: int = 10, latitude: Optional[float] = None,
+                longitude: Optional[float] = None, history: Optional[dict[int, int]] = None,
+                now: Optional[datetime] = None) -> list[dict]:
+        """Top candidates for user_id, best first. latitude / longitude default to the
+        user's own; history maps counterpart ids to sessions already shared."""
+        with self._lock:
+            me = self._slots.get(user_id)
+            n = self._size
+            if n == 0:
+                return []
+            score = self._current_base(_timestamp(now or datetime.utcnow())).copy()
+            if me is not None:
+                score[me] = -numpy.inf
+                if latitude is None or longitude is None:
+                    latitude, longitude = float(self._lat[me]), float(self._lng[me])
+
+            located = latitude is not None and longitude is not None and not math.isinf(latitude)
+            if located:
+                # Equirectangular distance: within a metro area it is off by well under 1%
+                dy = self._lat[:n] - numpy.float32(latitude)
+                dx = (self._lng[:n] - numpy.float32(longitude)) * numpy.float32(math.cos(math.radians(latitude)))
+                distance = numpy.sqrt(dx * dx + dy * dy)
+                score += _weight("proximity") * numpy.exp(distance * numpy.float32(-KM_PER_DEGREE / PROXIMITY_SCALE_KM))
+
+            same_barangay = same_city = None
+            if me is not None:
+                if self._barangay[me] >= 0:
+                    same_barangay = self._barangay[:n] == self._barangay[me]
+                    score += _weight("same_barangay") * same_barangay
+                if self._city[me] >= 0:
+                    same_city = self._city[:n] == self._city[me]
+                    score += _weight("same_city") * same_city
+
+            shared = {}
+            for other_id, sessions in (history or {}).items():
+                slot = self._slots.get(other_id)
+                if slot is not None and slot != me:
+                    shared[slot] = sessions
+                    score[slot] += WEIGHTS["history"] * min(sessions, HISTORY_CAP) / HISTORY_CAP
+
+            top = [slot for slot in _top_k(score, limit) if score[slot] > -numpy.inf]
+            return [{
+                "user_id": int(self._ids[slot]),
+                "score": round(float(score[slot]), 4),
+                "distance_km": _distance_km(latitude, longitude, self._lat[slot], self._lng[slot]) if located else None,
+                "same_barangay": bool(same_barangay[slot]) if same_barangay is not None else False,
+                "same_city": bool(same_city[slot]) if same_city is not None else False,
+                "sessions_together": shared.get(int(slot), 0),
+            } for slot in top]
+
+
+def _weight(signal: str):
+    # float32, so weighted terms don't upcast the score vector
+    return numpy.float32(WEIGHTS[signal])
+
+
+def _top_k(score, k: int):
+    """Indices of the k highest scores, best first.
+
+    The k-th best of a strided sample is a lower bound on the k-th best overall,
+    so only scores at or above it need partitioning, usually a few hundred."""
+    if k <= 0:
+        return []
+    candidates = None
+    sample = score[::SAMPLE_STRIDE]
+    if len(sample) > k:
+        threshold = numpy.partition(sample, len(sample) - k)[len(sample) - k]
+        candidates = numpy.flatnonzero(score >= threshold)
+    if candidates is None or len(candidates) > len(score) // 4:
+        candidates = numpy.arange(len(score))
+    if len(candidates) > k:
+        candidates = candidates[numpy.argpartition(-score[candidates], k - 1)[:k]]
+    return candidates[numpy.argsort(-score[candidates], kind="stable")]
+
+
+def _load_numpy() -> bool:
+    global numpy
+    numpy = load_numpy()
+    return numpy is not None
+
+
+def _timestamp(value) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, datetime):
+        return to_timestamp(value)
+    return float(value)
+
+
+def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> Optional[float]:
+    """Great-circle distance, rounded for display; None when a point is unknown"""
+    if math.isinf(lat2) or math.isinf(lng2):
+        return None
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return round(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))), 2)
@@ -0,0 +1,977 @@
+#!/usr/bin/env python3
+"""
+SafeZonePH Schema Migrations
+Versioned upgrade/downgrade steps for the backend database.
+Usage: python migrations.py [current|history|upgrade|downgrade] [--to VERSION]
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import (
+    bindparam, func, inspect, select, text, MetaData, Table, Column, Integer, String, DateTime, Boolean,
+    Float,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from areas import area_key, user_area_keys
+
+VERSION_TABLE = "schema_version"
+
+# Serializes migrations across processes: the advisory lock key on PostgreSQL, and how
+# long SQLite waits for another process's step before giving up
+MIGRATION_LOCK_KEY = 7244018317
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", 10 * 60 * 1000))
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    downgrade: Callable[[Connection], None]
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: list[str]):
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+def _drop_index(conn: Connection, name: str):
+    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(info["name"] == column for info in inspect(conn).get_columns(table))
+
+
+def _add_column(conn: Connection, table: str, column: Column):
+    if not _has_column(conn, table, column.name):
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+
+def _drop_column(conn: Connection, table: str, column: str):
+    # SQLite supports DROP COLUMN from 3.35
+    if _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+# ==========================================
+# 0001 - BASELINE SCHEMA
+# ==========================================
+# Frozen copy of the tables as they existed before migrations were introduced.
+# Later model changes must be added as new migrations, never edited in here.
+
+def _baseline_metadata() -> MetaData:
+    metadata = MetaData()
+
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("first_name", String, nullable=False),
+        Column("last_name", String, nullable=False),
+        Column("phone", String, nullable=True),
+        Column("barangay", String, nullable=True),
+        Column("city", String, nullable=True),
+        Column("location", String, nullable=True),
+        Column("bio", String, nullable=True),
+        Column("hashed_password", String, nullable=False),
+        Column("points", Integer),
+        Column("rank", String),
+        Column("is_verified", Boolean),
+        Column("is_active", Boolean),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "tasks", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, nullable=False),
+        Column("description", String, nullable=False),
+        Column("category", String, nullable=False),
+        Column("priority", String, nullable=False),
+        Column("status", String),
+        Column("points", Integer, nullable=False),
+        Column("due_date", String, nullable=True),
+        Column("assigned_to", String, nullable=True),
+        Column("location", String, nullable=True),
+        Column("created_by", Integer, nullable=True),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "points_history", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, nullable=False),
+        Column("type", String, nullable=False),
+        Column("description", String, nullable=False),
+        Column("points", Integer, nullable=False),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "help_requests", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, nullable=False),
+        Column("user_name", String, nullable=False),
+        Column("type", String, nullable=False),
+        Column("title", String, nullable=False),
+        Column("description", String, nullable=False),
+        Column("location", String, nullable=False),
+        Column("urgency", String, nullable=False),
+        Column("status", String),
+        Column("responders_needed", Integer),
+        Column("responders_count", Integer),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "global_alerts", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, nullable=False),
+        Column("created_by", String, nullable=False),
+        Column("type", String, nullable=False),
+        Column("priority", String, nullable=False),
+        Column("title", String, nullable=False),
+        Column("message", String, nullable=False),
+        Column("affected_areas", String, nullable=False),
+        Column("is_active", Boolean),
+        Column("acknowledged_count", Integer),
+        Column("expires_at", String, nullable=True),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "community_tasks", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, nullable=False),
+        Column("description", String, nullable=False),
+        Column("location", String, nullable=False),
+        Column("urgency", String, nullable=False),
+        Column("points", Integer),
+        Column("status", String),
+        Column("volunteer_id", Integer, nullable=True),
+        Column("volunteer_name", String, nullable=True),
+        Column("created_by", Integer, nullable=True),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "conversations", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user1_id", Integer, nullable=False),
+        Column("user2_id", Integer, nullable=False),
+        Column("last_message", String, nullable=True),
+        Column("last_message_at", DateTime),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "messages", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("conversation_id", Integer, nullable=False),
+        Column("sender_id", Integer, nullable=False),
+        Column("receiver_id", Integer, nullable=False),
+        Column("content", String, nullable=False),
+        Column("read", Boolean),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "buddy_sessions", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, nullable=False),
+        Column("buddy_id", Integer, nullable=False),
+        Column("status", String),
+        Column("check_in_interval", Integer),
+        Column("last_check_in", DateTime),
+        Column("location", String, nullable=True),
+        Column("destination", String, nullable=True),
+        Column("created_at", DateTime),
+        Column("ended_at", DateTime, nullable=True),
+    )
+    Table(
+        "notifications", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, nullable=False),
+        Column("type", String, nullable=False),
+        Column("title", String, nullable=False),
+        Column("message", String, nullable=False),
+        Column("related_id", Integer, nullable=True),
+        Column("is_read", Boolean),
+        Column("created_at", DateTime),
+    )
+
+    return metadata
+
+
+def _0001_upgrade(conn: Connection):
+    # checkfirst lets databases created by the old import-time create_all adopt this version;
+    # tables created by api/index.py's own models lack some baseline columns, added here
+    metadata = _baseline_metadata()
+    metadata.create_all(bind=conn, checkfirst=True)
+    for table in metadata.sorted_tables:
+        for column in table.columns:
+            _add_column(conn, table.name, column)
+
+
+def _0001_downgrade(conn: Connection):
+    _baseline_metadata().drop_all(bind=conn, checkfirst=True)
+
+
+# ==========================================
+# 0002 - HOT QUERY INDEXES
+# ==========================================
+
+HOT_QUERY_INDEXES = [
+    ("ix_notifications_user_read_created", "notifications", ["user_id", "is_read", "created_at"]),
+    ("ix_messages_conversation_created", "messages", ["conversation_id", "created_at"]),
+    ("ix_messages_receiver_read", "messages", ["receiver_id", "read"]),
+    ("ix_points_history_user_created", "points_history", ["user_id", "created_at"]),
+    ("ix_buddy_sessions_user_status", "buddy_sessions", ["user_id", "status"]),
+    ("ix_buddy_sessions_buddy_status", "buddy_sessions", ["buddy_id", "status"]),
+    ("ix_conversations_user1_user2", "conversations", ["user1_id", "user2_id"]),
+    ("ix_conversations_user2_user1", "conversations", ["user2_id", "user1_id"]),
+]
+
+
+def _0002_upgrade(conn: Connection):
+    for name, table, columns in HOT_QUERY_INDEXES:
+        _create_index(conn, name, table, columns)
+
+
+def _0002_downgrade(conn: Connection):
+    for name, _table, _columns in reversed(HOT_QUERY_INDEXES):
+        _drop_index(conn, name)
+
+
+# ==========================================
+# 0003 - KEYSET PAGINATION INDEXES
+# ==========================================
+
+KEYSET_INDEXES = [
+    ("ix_users_created_id", "users", ["created_at", "id"]),
+    ("ix_tasks_created_id", "tasks", ["created_at", "id"]),
+    ("ix_help_requests_created_id", "help_requests", ["created_at", "id"]),
+    ("ix_global_alerts_created_id", "global_alerts", ["created_at", "id"]),
+    ("ix_community_tasks_status_created_id", "community_tasks", ["status", "created_at", "id"]),
+]
+
+
+def _0003_upgrade(conn: Connection):
+    for name, table, columns in KEYSET_INDEXES:
+        _create_index(conn, name, table, columns)
+
+
+def _0003_downgrade(conn: Connection):
+    for name, _table, _columns in reversed(KEYSET_INDEXES):
+        _drop_index(conn, name)
+
+
+# ==========================================
+# 0004 - FEED VERSION STAMPS
+# ==========================================
+
+FEEDS = ["global-alerts", "community-tasks", "help-requests"]
+
+
+def _feed_versions_table() -> Table:
+    return Table(
+        "feed_versions", MetaData(),
+        Column("feed", String, primary_key=True),
+        Column("version", Integer, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+
+
+def _0004_upgrade(conn: Connection):
+    table = _feed_versions_table()
+    table.create(bind=conn, checkfirst=True)
+    existing = set(conn.execute(table.select().with_only_columns(table.c.feed)).scalars())
+    now = datetime.utcnow()
+    rows = [{"feed": feed, "version": 1, "updated_at": now} for feed in FEEDS if feed not in existing]
+    if rows:
+        conn.execute(table.insert(), rows)
+
+
+def _0004_downgrade(conn: Connection):
+    _feed_versions_table().drop(bind=conn, checkfirst=True)
+
+
+# ==========================================
+# 0005 - MISSED CHECK-IN TRACKING
+# ==========================================
+# When the server last alerted a buddy about a missed check-in, so the monitor's
+# schedule survives restarts without re-alerting, and an index for rebuilding it.
+
+def _0005_upgrade(conn: Connection):
+    _add_column(conn, "buddy_sessions", Column("missed_alert_at", DateTime, nullable=True))
+    _create_index(conn, "ix_buddy_sessions_status", "buddy_sessions", ["status"])
+
+
+def _0005_downgrade(conn: Connection):
+    _drop_index(conn, "ix_buddy_sessions_status")
+    _drop_column(conn, "buddy_sessions", "missed_alert_at")
+
+
+# ==========================================
+# 0006 - ALERT EXPIRY TIMESTAMPS
+# ==========================================
+# global_alerts.expires_at held the requested lifetime as text ("24 hours"); it
+# becomes the actual expiry time, backfilled from created_at.
+
+LEGACY_EXPIRY = re.compile(r"\s*(\d+(?:\.\d+)?)")
+
+
+def _alert_expiry_table(expires_column: str, expires_type) -> Table:
+    return Table(
+        "global_alerts", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("created_at", DateTime),
+        Column(expires_column, expires_type),
+    )
+
+
+def _convert_alert_expiry(conn: Connection, source: str, source_type, target: str, target_type, convert: Callable):
+    table = _alert_expiry_table(source, source_type)
+    target_table = _alert_expiry_table(target, target_type)
+    rows = conn.execute(
+        select(table.c.id, table.c.created_at, table.c[source]).where(table.c[source] != None)
+    ).all()
+    updates = []
+    for alert_id, created_at, value in rows:
+        converted = convert(created_at, value) if created_at is not None else None
+        if converted is not None:
+            updates.append({"alert_id": alert_id, "value": converted})
+    if updates:
+        conn.execute(
+            target_table.update()
+            .where(target_table.c.id == bindparam("alert_id"))
+            .values({target: bindparam("value")}),
+            updates,
+        )
+
+
+def _expiry_from_text(created_at: datetime, value: str) -> Optional[datetime]:
+    match = LEGACY_EXPIRY.match(value)
+    return created_at + timedelta(hours=float(match.group(1))) if match else None
+
+
+def _text_from_expiry(created_at: datetime, value: datetime) -> str:
+    return f"{round((value - created_at).total_seconds() / 3600)} hours"
+
+
+def _0006_upgrade(conn: Connection):
+    conn.execute(text("ALTER TABLE global_alerts RENAME COLUMN expires_at TO expires_in_text"))
+    _add_column(conn, "global_alerts", Column("expires_at", DateTime, nullable=True))
+    _convert_alert_expiry(conn, "expires_in_text", String, "expires_at", DateTime, _expiry_from_text)
+    _drop_column(conn, "global_alerts", "expires_in_text")
+    _create_index(conn, "ix_global_alerts_active_expires", "global_alerts", ["is_active", "expires_at"])
+
+
+def _0006_downgrade(conn: Connection):
+    _drop_index(conn, "ix_global_alerts_active_expires")
+    conn.execute(text("ALTER TABLE global_alerts RENAME COLUMN expires_at TO expires_at_time"))
+    _add_column(conn, "global_alerts", Column("expires_at", String, nullable=True))
+    _convert_alert_expiry(conn, "expires_at_time", DateTime, "expires_at", String, _text_from_expiry)
+    _drop_column(conn, "global_alerts", "expires_at_time")
+
+
+# ==========================================
+# 0007 - SPATIAL INDEX
+# ==========================================
+# Optional coordinates for help requests and community tasks, an index on them,
+# and on SQLite builds with the rtree module an R*Tree per table that triggers
+# keep in step with every insert, coordinate update and delete.
+
+GEO_TABLES = {"help_requests": "help_requests_geo", "community_tasks": "community_tasks_geo"}
+
+
+def _has_rtree(conn: Connection) -> bool:
+    return conn.dialect.name == "sqlite" and bool(
+        conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_RTREE')")).scalar()
+    )
+
+
+def _0007_upgrade(conn: Connection):
+    rtree = _has_rtree(conn)
+    for table, geo in GEO_TABLES.items():
+        _add_column(conn, table, Column("latitude", Float, nullable=True))
+        _add_column(conn, table, Column("longitude", Float, nullable=True))
+        _create_index(conn, f"ix_{table}_lat_lng", table, ["latitude", "longitude"])
+        if not rtree:
+            continue
+        has_point = "NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL"
+        insert_point = f"INSERT INTO {geo} VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude)"
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {geo} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {geo}_insert AFTER INSERT ON {table} "
+            f"WHEN {has_point} BEGIN {insert_point}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {geo}_update AFTER UPDATE OF latitude, longitude ON {table} BEGIN "
+            f"DELETE FROM {geo} WHERE id = OLD.id; "
+            f"INSERT INTO {geo} SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude WHERE {has_point}; "
+            f"END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {geo}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {geo} WHERE id = OLD.id; END"
+        ))
+        conn.execute(text(
+            f"INSERT OR REPLACE INTO {geo} SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+            f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ))
+
+
+def _0007_downgrade(conn: Connection):
+    for table, geo in GEO_TABLES.items():
+        if conn.dialect.name == "sqlite":
+            for suffix in ("insert", "update", "delete"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {geo}_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {geo}"))
+        _drop_index(conn, f"ix_{table}_lat_lng")
+        _drop_column(conn, table, "longitude")
+        _drop_column(conn, table, "latitude")
+
+
+# ==========================================
+# 0008 - ALERT FAN-OUT
+# ==========================================
+# The area -> user inverted index behind alert delivery, backfilled from profiles,
+# and per-alert delivery progress. Alerts that already exist count as delivered.
+
+def _user_areas_table() -> Table:
+    return Table(
+        "user_areas", MetaData(),
+        Column("area", String, primary_key=True),
+        Column("user_id", Integer, primary_key=True),
+    )
+
+
+def _unqualified_area_keys(city: Optional[str], barangay: Optional[str]) -> set[str]:
+    """user_area_keys before 0014: barangays keyed by name alone"""
+    return {key for key in (area_key(city), area_key(barangay)) if key is not None}
+
+
+def _index_user_areas(conn: Connection, keys: Callable[[Optional[str], Optional[str]], set[str]]):
+    table = _user_areas_table()
+    users = conn.execute(text("SELECT id, city, barangay FROM users")).all()
+    rows = [{"area": key, "user_id": user_id} for user_id, city, barangay in users for key in keys(city, barangay)]
+    conn.execute(table.delete())
+    if rows:
+        conn.execute(table.insert(), rows)
+
+
+def _0008_upgrade(conn: Connection):
+    _user_areas_table().create(bind=conn, checkfirst=True)
+    _create_index(conn, "ix_user_areas_user_id", "user_areas", ["user_id"])
+    _index_user_areas(conn, _unqualified_area_keys)
+
+    _add_column(conn, "global_alerts", Column("notified_through", Integer, nullable=True))
+    _add_column(conn, "global_alerts", Column("notified_at", DateTime, nullable=True))
+    conn.execute(text("UPDATE global_alerts SET notified_at = created_at WHERE notified_at IS NULL"))
+
+
+def _0008_downgrade(conn: Connection):
+    _drop_column(conn, "global_alerts", "notified_at")
+    _drop_column(conn, "global_alerts", "notified_through")
+    _drop_index(conn, "ix_user_areas_user_id")
+    _user_areas_table().drop(bind=conn, checkfirst=True)
+
+
+# ==========================================
+# 0009 - ARCHIVE TABLES
+# ==========================================
+# "<table>_archive" twins of the tables the lifecycle engine trims: the hot table's
+# columns as they are now, explicit ids, archived_at, and indexes for paging history.
+
+ARCHIVE_INDEXES = {
+    "notifications": [["user_id", "created_at"]],
+    "messages": [["conversation_id", "created_at"]],
+    "points_history": [["user_id", "created_at"]],
+    "help_requests": [["created_at", "id"]],
+    "buddy_sessions": [["user_id", "created_at"], ["buddy_id", "created_at"]],
+}
+
+INDEX_NAMES = {"conversation_id": "conversation", "created_at": "created", "user_id": "user", "buddy_id": "buddy"}
+
+
+def _archive_index_name(archive: str, columns: list[str]) -> str:
+    return f"ix_{archive}_{'_'.join(INDEX_NAMES.get(column, column) for column in columns)}"
+
+
+def _0009_upgrade(conn: Connection):
+    for table, indexes in ARCHIVE_INDEXES.items():
+        archive = f"{table}_archive"
+        columns = [
+            Column(info["name"], info["type"], primary_key=info["name"] == "id", autoincrement=False,
+                   nullable=info["nullable"])
+            for info in inspect(conn).get_columns(table)
+        ]
+        Table(archive, MetaData(), *columns, Column("archived_at", DateTime, nullable=False)).create(
+            bind=conn, checkfirst=True
+        )
+        for index in indexes:
+            _create_index(conn, _archive_index_name(archive, index), archive, index)
+
+
+def _0009_downgrade(conn: Connection):
+    for table, indexes in ARCHIVE_INDEXES.items():
+        archive = f"{table}_archive"
+        # Archived rows go back to the hot table rather than being dropped with the archive
+        names = ", ".join(info["name"] for info in inspect(conn).get_columns(table))
+        conn.execute(text(f"INSERT INTO {table} ({names}) SELECT {names} FROM {archive}"))
+        for index in indexes:
+            _drop_index(conn, _archive_index_name(archive, index))
+        conn.execute(text(f"DROP TABLE IF EXISTS {archive}"))
+
+
+# ==========================================
+# 0010 - FULL-TEXT SEARCH
+# ==========================================
+# SQLite: an FTS5 table per searchable table, filled from it and kept in step by
+# triggers. Scoped tables also index their user ids as "u<id>" tokens in a
+# participants column, so access checks happen inside the full-text index.
+# Postgres: a generated, GIN-indexed tsvector column with the first column weighted A.
+
+SEARCH_TABLES = {
+    "help_requests": (["title", "description", "location"], []),
+    "community_tasks": (["title", "description", "location"], []),
+    "global_alerts": (["title", "message", "affected_areas"], []),
+    "messages": (["content"], ["sender_id", "receiver_id"]),
+}
+
+
+def _has_fts5(conn: Connection) -> bool:
+    return conn.dialect.name == "sqlite" and bool(
+        conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+    )
+
+
+def _fts_row(prefix: str, columns: list[str], scope: list[str]) -> str:
+    values = [f"{prefix}{column}" for column in columns]
+    if scope:
+        values.append(" || ' ' || ".join(f"'u' || {prefix}{column}" for column in scope))
+    return ", ".join(values)
+
+
+def _0010_upgrade(conn: Connection):
+    if conn.dialect.name == "postgresql":
+        for table, (columns, _) in SEARCH_TABLES.items():
+            first, rest = columns[0], columns[1:]
+            document = f"setweight(to_tsvector('simple', coalesce({first}, '')), 'A')"
+            if rest:
+                # concat_ws isn't immutable, which generated columns require
+                joined = " || ' ' || ".join(f"coalesce({column}, '')" for column in rest)
+                document += f" || setweight(to_tsvector('simple', {joined}), 'D')"
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({document}) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING GIN (search_vector)"))
+        return
+    if not _has_fts5(conn):
+        return  # Search falls back to scanning
+
+    for table, (columns, scope) in SEARCH_TABLES.items():
+        fts = f"{table}_fts"
+        fts_columns = columns + (["participants"] if scope else [])
+        names = ", ".join(fts_columns)
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names})"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {_fts_row('NEW.', columns, scope)}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {', '.join(columns + scope)} ON {table} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = OLD.id; "
+            f"INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {_fts_row('NEW.', columns, scope)}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = OLD.id; END"
+        ))
+        conn.execute(text(f"DELETE FROM {fts}"))
+        conn.execute(text(f"INSERT INTO {fts} (rowid, {names}) SELECT id, {_fts_row('', columns, scope)} FROM {table}"))
+
+
+def _0010_downgrade(conn: Connection):
+    for table in SEARCH_TABLES:
+        if conn.dialect.name == "postgresql":
+            _drop_index(conn, f"ix_{table}_search")
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"))
+        elif conn.dialect.name == "sqlite":
+            fts = f"{table}_fts"
+            for suffix in ("insert", "update", "delete"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+
+
+# ==========================================
+# 0011 - USER HOME COORDINATES
+# ==========================================
+# Optional home coordinates on profiles, the proximity signal for buddy suggestions.
+
+def _0011_upgrade(conn: Connection):
+    _add_column(conn, "users", Column("latitude", Float, nullable=True))
+    _add_column(conn, "users", Column("longitude", Float, nullable=True))
+
+
+def _0011_downgrade(conn: Connection):
+    _drop_column(conn, "users", "longitude")
+    _drop_column(conn, "users", "latitude")
+
+
+# ==========================================
+# 0012 - RESPONSE RECORDS
+# ==========================================
+# Who responded to which help request and who acknowledged which alert, keyed so
+# each user counts once. Earlier responses and acknowledgements left no record,
+# so the counters keep their totals and the records start empty.
+
+def _claim_record_tables() -> list[Table]:
+    metadata = MetaData()
+    return [
+        Table(
+            "help_request_responders", metadata,
+            Column("help_request_id", Integer, primary_key=True),
+            Column("user_id", Integer, primary_key=True),
+            Column("created_at", DateTime),
+        ),
+        Table(
+            "alert_acknowledgements", metadata,
+            Column("alert_id", Integer, primary_key=True),
+            Column("user_id", Integer, primary_key=True),
+            Column("created_at", DateTime),
+        ),
+    ]
+
+
+def _0012_upgrade(conn: Connection):
+    for table in _claim_record_tables():
+        table.create(bind=conn, checkfirst=True)
+        _create_index(conn, f"ix_{table.name}_user_id", table.name, ["user_id"])
+
+
+def _0012_downgrade(conn: Connection):
+    for table in reversed(_claim_record_tables()):
+        _drop_index(conn, f"ix_{table.name}_user_id")
+        table.drop(bind=conn, checkfirst=True)
+
+
+# ==========================================
+# 0013 - TASK VOLUNTEER RECORDS
+# ==========================================
+# Who volunteered for which community task, keyed so each user counts once,
+# with the total kept on the task. The task's assigned volunteer becomes its
+# first record. Databases created by api/index.py kept acknowledgements and
+# volunteers as JSON arrays of user ids on the row; those become records too and
+# the arrays are dropped, recounting the totals from the records.
+
+def _task_volunteers_table() -> Table:
+    return Table(
+        "community_task_volunteers", MetaData(),
+        Column("task_id", Integer, primary_key=True),
+        Column("user_id", Integer, primary_key=True),
+        Column("created_at", DateTime),
+    )
+
+
+def _legacy_user_ids(value: Optional[str]) -> list[int]:
+    try:
+        ids = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return list(dict.fromkeys(int(user_id) for user_id in ids if str(user_id).isdigit())) if isinstance(ids, list) else []
+
+
+def _insert_records(conn: Connection, table: Table, key: str, rows: list[tuple[int, int]]):
+    """Insert (row id, user id) records, skipping pairs already recorded"""
+    existing = set(conn.execute(select(table.c[key], table.c.user_id)).all())
+    now = datetime.utcnow()
+    # A microsecond apart, so created_at keeps the order the ids were listed in
+    new = [{key: row_id, "user_id": user_id, "created_at": now + timedelta(microseconds=i)}
+           for i, (row_id, user_id) in enumerate(dict.fromkeys(rows)) if (row_id, user_id) not in existing]
+    if new:
+        conn.execute(table.insert(), new)
+
+
+def _records_from_json(conn: Connection, table: str, column: str, records: Table, key: str, counter: str):
+    rows = conn.execute(text(f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL")).all()
+    _insert_records(conn, records, key, [
+        (row_id, user_id) for row_id, value in rows for user_id in _legacy_user_ids(value)
+    ])
+    conn.execute(text(
+        f"UPDATE {table} SET {counter} = (SELECT COUNT(*) FROM {records.name} WHERE {key} = {table}.id)"
+    ))
+    _drop_column(conn, table, column)
+
+
+def _0013_upgrade(conn: Connection):
+    volunteers = _task_volunteers_table()
+    volunteers.create(bind=conn, checkfirst=True)
+    _create_index(conn, "ix_community_task_volunteers_user_id", "community_task_volunteers", ["user_id"])
+    _add_column(conn, "community_tasks", Column("volunteers_count", Integer))
+    _insert_records(conn, volunteers, "task_id", [
+        tuple(row) for row in conn.execute(text(
+            "SELECT id, volunteer_id FROM community_tasks WHERE volunteer_id IS NOT NULL"
+        ))
+    ])
+    if _has_column(conn, "community_tasks", "volunteers"):
+        _records_from_json(conn, "community_tasks", "volunteers", volunteers, "task_id", "volunteers_count")
+    else:
+        conn.execute(text(
+            "UPDATE community_tasks SET volunteers_count = "
+            "(SELECT COUNT(*) FROM community_task_volunteers WHERE task_id = community_tasks.id)"
+        ))
+    if _has_column(conn, "global_alerts", "acknowledged_by"):
+        acknowledgements = _claim_record_tables()[1]
+        _records_from_json(conn, "global_alerts", "acknowledged_by", acknowledgements, "alert_id", "acknowledged_count")
+
+
+def _0013_downgrade(conn: Connection):
+    # Volunteer lists go back into a JSON column, which 0013 converts again on the next
+    # upgrade; a task's volunteer_id alone can't hold every volunteer
+    _add_column(conn, "community_tasks", Column("volunteers", String))
+    volunteers = _task_volunteers_table()
+    lists: dict[int, list[int]] = {}
+    for task_id, user_id in conn.execute(
+        select(volunteers.c.task_id, volunteers.c.user_id).order_by(volunteers.c.created_at, volunteers.c.user_id)
+    ):
+        lists.setdefault(task_id, []).append(user_id)
+    if lists:
+        conn.execute(
+            text("UPDATE community_tasks SET volunteers = :volunteers WHERE id = :task_id"),
+            [{"task_id": task_id, "volunteers": json.dumps(user_ids)} for task_id, user_ids in lists.items()],
+        )
+    _drop_column(conn, "community_tasks", "volunteers_count")
+    _drop_index(conn, "ix_community_task_volunteers_user_id")
+    volunteers.drop(bind=conn, checkfirst=True)
+
+
+# ==========================================
+# 0014 - BARANGAYS KEYED BY CITY
+# ==========================================
+# Barangay names repeat across cities, so user_areas keys a barangay together with
+# its city and keeps the bare name only for users who gave no city.
+
+def _0014_upgrade(conn: Connection):
+    _index_user_areas(conn, user_area_keys)
+
+
+def _0014_downgrade(conn: Connection):
+    _index_user_areas(conn, _unqualified_area_keys)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline schema", _0001_upgrade, _0001_downgrade),
+    Migration(2, "hot query indexes", _0002_upgrade, _0002_downgrade),
+    Migration(3, "keyset pagination indexes", _0003_upgrade, _0003_downgrade),
+    Migration(4, "feed version stamps", _0004_upgrade, _0004_downgrade),
+    Migration(5, "missed check-in tracking", _0005_upgrade, _0005_downgrade),
+    Migration(6, "alert expiry timestamps", _0006_upgrade, _0006_downgrade),
+    Migration(7, "spatial index", _0007_upgrade, _0007_downgrade),
+    Migration(8, "alert fan-out", _0008_upgrade, _0008_downgrade),
+    Migration(9, "archive tables", _0009_upgrade, _0009_downgrade),
+    Migration(10, "full-text search", _0010_upgrade, _0010_downgrade),
+    Migration(11, "user home coordinates", _0011_upgrade, _0011_downgrade),
+    Migration(12, "response records", _0012_upgrade, _0012_downgrade),
+    Migration(13, "task volunteer records", _0013_upgrade, _0013_downgrade),
+    Migration(14, "barangays keyed by city", _0014_upgrade, _0014_downgrade),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+
+def _version_table() -> Table:
+    return Table(
+        VERSION_TABLE, MetaData(),
+        Column("version", Integer, primary_key=True, autoincrement=False),
+        Column("name", String, nullable=False),
+        Column("applied_at", DateTime, nullable=False),
+    )
+
+
+@contextmanager
+def _migration_transaction(engine: Engine) -> Iterator[Connection]:
+    """A transaction only one process at a time can hold: pg_advisory_xact_lock on
+    PostgreSQL, BEGIN IMMEDIATE (the write lock up front) on SQLite. Callers re-check
+    the version table inside it, so a process that waited skips what the other applied."""
+    with engine.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            with conn.begin():
+                if conn.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                yield conn
+            return
+
+        # A step can outlast the app's busy_timeout, so wait longer for this lock only
+        busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+            conn.commit()
+
+
+def _ensure_version_table(engine: Engine):
+    if inspect(engine).has_table(VERSION_TABLE):
+        return
+    with _migration_transaction(engine) as conn:
+        _version_table().create(bind=conn, checkfirst=True)
+
+
+def applied_versions(engine: Engine) -> list[tuple[int, str, datetime]]:
+    """Return (version, name, applied_at) rows in ascending version order"""
+    _ensure_version_table(engine)
+    version_table = _version_table()
+    with engine.connect() as conn:
+        rows = conn.execute(version_table.select().order_by(version_table.c.version)).all()
+    return [tuple(row) for row in rows]
+
+
+def current_version(engine: Engine) -> int:
+    rows = applied_versions(engine)
+    return rows[-1][0] if rows else 0
+
+
+def is_current(engine: Engine) -> bool:
+    """Whether every migration is applied, in one query; False before the version table exists"""
+    version_table = _version_table()
+    try:
+        with engine.connect() as conn:
+            applied = conn.execute(
+                select(func.count()).select_from(version_table).where(version_table.c.version <= LATEST_VERSION)
+            ).scalar()
+    except DBAPIError:
+        return False
+    return applied == len(MIGRATIONS)
+
+
+class SchemaGate:
+    """Brings a database up to date on first use rather than at import or startup.
+
+    ensure() costs one query per process once the database is current, and runs
+    the pending migrations when it isn't; concurrent callers wait for the first,
+    and other processes wait on upgrade()'s database lock.
+    A verified_version recorded outside the process (the deploy step's SCHEMA_VERSION)
+    skips even that query, until a build ships migrations newer than it.
+    """
+
+    def __init__(self, engine: Engine, enabled: bool = True, verified_version: Optional[int] = None):
+        self.engine = engine
+        self.ready = not enabled or (verified_version is not None and verified_version >= LATEST_VERSION)
+        self._lock = threading.Lock()
+
+    def ensure(self):
+        if self.ready:
+            return
+        with self._lock:
+            if self.ready:
+                return
+            if not is_current(self.engine):
+                upgrade(self.engine)
+            self.ready = True
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> list[int]:
+    """Apply pending migrations up to target (default: latest). Returns applied versions."""
+    _ensure_version_table(engine)
+    target = LATEST_VERSION if target is None else target
+    version_table = _version_table()
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        # One locked transaction per step so a failure leaves the previous version recorded
+        with _migration_transaction(engine) as conn:
+            done = conn.execute(
+                version_table.select().where(version_table.c.version == migration.version)
+            ).first()
+            if done:
+                continue
+            migration.upgrade(conn)
+            conn.execute(version_table.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow()
+            ))
+        applied.append(migration.version)
+
+    return applied
+
+
+def downgrade(engine: Engine, target: int) -> list[int]:
+    """Revert applied migrations above target, newest first. Returns reverted versions."""
+    _ensure_version_table(engine)
+    version_table = _version_table()
+    reverted = []
+
+    for migration in reversed(MIGRATIONS):
+        if migration.version <= target:
+            break
+        with _migration_transaction(engine) as conn:
+            done = conn.execute(
+                version_table.select().where(version_table.c.version == migration.version)
+            ).first()
+            if not done:
+                continue
+            migration.downgrade(conn)
+            conn.execute(version_table.delete().where(version_table.c.version == migration.version))
+        reverted.append(migration.version)
+
+    return reverted
+
+
+def main(argv: Optional[list[str]] = None):
+    from dotenv import load_dotenv
+
+    from database import build_engine
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="SafeZonePH schema migrations")
+    parser.add_argument("command", choices=["current", "history", "upgrade", "downgrade"])
+    parser.add_argument("--to", type=int, default=None, help="target schema version")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./safezoneph_dev.db"))
+    args = parser.parse_args(argv)
+
+    engine = build_engine(args.database_url)
+
+    if args.command == "current":
+        print(f"Schema version: {current_version(engine)} (latest: {LATEST_VERSION})")
+    elif args.command == "history":
+        applied = {row[0]: row[2] for row in applied_versions(engine)}
+        for migration in MIGRATIONS:
+            applied_at = applied.get(migration.version)
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            print(f"{migration.version:04d}  {migration.name:<30} {state}")
+    elif args.command == "upgrade":
+        applied = upgrade(engine, args.to)
+        version = current_version(engine)
+        print(f"Applied: {applied or 'nothing to do'}; now at version {version}")
+        if version == LATEST_VERSION:
+            print(f"Set SCHEMA_VERSION={version} where the app runs to skip its per-process schema check")
+    else:
+        if args.to is None:
+            parser.error("downgrade requires --to VERSION")
+        reverted = downgrade(engine, args.to)
+        print(f"Reverted: {reverted or 'nothing to do'}; now at version {current_version(engine)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+SafeZonePH Keyset Pagination
+Opaque (created_at, id) cursors shared by every list endpoint.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """?limit=&after= query parameters, usable as a FastAPI dependency"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(query, created_at_column, id_column, params: PageParams) -> tuple[list[Any], Optional[str]]:
+    """Newest-first page of an ORM query and the cursor for the next (older) page.
+
+    Rows are ordered by (created_at, id) descending, so a page costs one index range
+    scan no matter how deep into the history it is.
+    """
+    if params.after:
+        created_at, row_id = decode_cursor(params.after)
+        query = query.filter(or_(
+            created_at_column < created_at,
+            and_(created_at_column == created_at, id_column < row_id)
+        ))
+
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(params.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
+
+
+def page_response(items: list[Any], next_cursor: Optional[str]) -> dict:
+    return {"items": items, "next_cursor": next_cursor}
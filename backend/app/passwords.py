@@ -0,0 +1,226 @@
+"""
+SafeZonePH Password Hashing
+New hashes are scrypt, computed in a dedicated process pool behind an admission
+gate, so a burst of logins can't starve the threadpool that serves every other
+endpoint. Legacy sha256 digests still verify and are upgraded on the next login.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+
+class HasherBusyError(Exception):
+    """Raised when a hash job can't be admitted before the queue timeout"""
+
+
+# ==========================================
+# HASHERS
+# ==========================================
+
+class ScryptHasher:
+    """Memory-hard scrypt from the standard library.
+    Encoded as scrypt$n$r$p$salt$hash with base64 salt and hash."""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, dklen: int = 32):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.dklen = dklen
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, dklen=dklen,
+            maxmem=256 * n * r + 1024 * 1024
+        )
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        derived = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        return "$".join([
+            self.algorithm, str(self.n), str(self.r), str(self.p),
+            base64.b64encode(salt).decode(), base64.b64encode(derived).decode()
+        ])
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            _, n, r, p, salt, expected = encoded.split("$")
+            expected = base64.b64decode(expected)
+            derived = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p), len(expected))
+        except (ValueError, TypeError):
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        parts = encoded.split("$")
+        return len(parts) != 6 or parts[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+    def dummy_hash(self) -> str:
+        """A hash no password matches that costs as much to verify as a real one"""
+        return "$".join([
+            self.algorithm, str(self.n), str(self.r), str(self.p),
+            base64.b64encode(bytes(16)).decode(), base64.b64encode(bytes(self.dklen)).decode()
+        ])
+
+
+class LegacySaltedSha256Hasher:
+    """Single-round sha256(password + salt) stored as hash:salt (backend/app before scrypt)"""
+
+    algorithm = "sha256-salted"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            stored_hash, salt = encoded.split(":")
+        except ValueError:
+            return False
+        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(password_hash, stored_hash)
+
+
+class LegacySha256Hasher:
+    """Unsalted sha256 hex digest (api/index.py before scrypt)"""
+
+    algorithm = "sha256"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+
+def _build_hasher() -> ScryptHasher:
+    return ScryptHasher(
+        n=int(os.getenv("SCRYPT_N", 2 ** 14)),
+        r=int(os.getenv("SCRYPT_R", 8)),
+        p=int(os.getenv("SCRYPT_P", 1)),
+    )
+
+
+# Module-level so spawned worker processes rebuild the same configuration
+hasher = _build_hasher()
+
+
+def identify(encoded: str):
+    """Pick the hasher that produced an encoded hash"""
+    if encoded.startswith(hasher.algorithm + "$"):
+        return hasher
+    if ":" in encoded:
+        return LegacySaltedSha256Hasher()
+    return LegacySha256Hasher()
+
+
+def hash_password_sync(password: str) -> str:
+    return hasher.hash(password)
+
+
+def verify_password_sync(password: str, encoded: str) -> bool:
+    return identify(encoded).verify(password, encoded)
+
+
+def needs_rehash(encoded: str) -> bool:
+    return identify(encoded) is not hasher or hasher.needs_rehash(encoded)
+
+
+def is_expensive(encoded: str) -> bool:
+    return not isinstance(identify(encoded), (LegacySaltedSha256Hasher, LegacySha256Hasher))
+
+
+def verify_password_padded_sync(password: str, encoded: str) -> bool:
+    """Legacy digests verify in microseconds, so they also pay for a dummy scrypt:
+    otherwise response times would show which accounts still have one"""
+    if not is_expensive(encoded):
+        hasher.verify(password, hasher.dummy_hash())
+    return verify_password_sync(password, encoded)
+
+
+# ==========================================
+# BOUNDED EXECUTION
+# ==========================================
+
+def _lower_priority(niceness: int):
+    """Worker initializer: hashing yields the CPU to request handling when cores are scarce"""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+
+class HashingPool:
+    """Process pool with a concurrency cap and a bounded wait for admission"""
+
+    def __init__(self, workers: int, max_concurrency: int, queue_timeout: float,
+                 use_processes: bool = True, niceness: int = 10):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.use_processes = use_processes
+        self.niceness = niceness
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # spawn avoids forking a process that already runs threads and an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_lower_priority, initargs=(self.niceness,)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, fn, *args):
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HasherBusyError()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            semaphore.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_workers = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+pool = HashingPool(
+    workers=_workers,
+    max_concurrency=int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", _workers * 2)),
+    queue_timeout=float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", 5)),
+    use_processes=os.getenv("PASSWORD_HASH_EXECUTOR", "process") == "process",
+    niceness=int(os.getenv("PASSWORD_HASH_NICE", 10)),
+)
+
+
+async def hash_password(password: str) -> str:
+    return await pool.run(hash_password_sync, password)
+
+
+async def verify_password(password: str, encoded: Optional[str]) -> bool:
+    """encoded is None for an unknown account. A dummy hash is verified anyway, so the
+    response takes as long as a wrong password and doesn't reveal which emails exist;
+    legacy digests are padded to the same cost."""
+    if encoded is None:
+        await pool.run(verify_password_sync, password, hasher.dummy_hash())
+        return False
+    return await pool.run(verify_password_padded_sync, password, encoded)
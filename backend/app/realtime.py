@@ -0,0 +1,141 @@
+"""
+SafeZonePH Realtime Broker
+In-process pub/sub that fans events out to connected clients per user.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+# Events buffered per connection before it is treated as a slow consumer
+DEFAULT_QUEUE_SIZE = 256
+
+
+def encode_json(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """WebSocket frame: a JSON envelope"""
+    return json.dumps({"event": event, "data": data}, default=str)
+
+
+def encode_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Server-Sent Events frame; the id lets EventSource resume via Last-Event-ID"""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscriber:
+    """One live connection's bounded outbox"""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.evicted = False
+
+    def offer(self, payload: str, event_id: Optional[int] = None) -> bool:
+        """Queue a payload without blocking. Returns False if the outbox is full."""
+        try:
+            self.queue.put_nowait((event_id, payload))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def next(self) -> Optional[tuple[Optional[int], str]]:
+        """Next (event_id, payload) to send, or None once the subscriber has been evicted"""
+        item = await self.queue.get()
+        return None if self.evicted else item
+
+
+class Broker:
+    """Fans encoded events out to every subscriber of the target users.
+
+    Publishing never blocks the caller: sync endpoints running in the threadpool
+    hand delivery to the subscriber's event loop, and a subscriber whose queue is
+    full is evicted instead of slowing everyone else down.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE, encoder: Callable[..., str] = encode_json):
+        self.max_queue = max_queue
+        self.encoder = encoder
+        self._subscribers: dict[int, set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        subscriber = Subscriber(user_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.user_id]
+
+    def connection_count(self, user_id: Optional[int] = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def connected(self, user_ids: Iterable[int]) -> list[int]:
+        """Those of user_ids with at least one open connection"""
+        with self._lock:
+            return [user_id for user_id in user_ids if user_id in self._subscribers]
+
+    def publish(self, user_ids: Iterable[int], event: str, data: Any, event_id: Optional[int] = None):
+        """Deliver an event to all connections of the given users"""
+        with self._lock:
+            targets = [
+                subscriber
+                for user_id in set(user_ids)
+                for subscriber in self._subscribers.get(user_id, ())
+            ]
+        if not targets:
+            return
+
+        # Encode once, fan the same string out to every connection
+        payload = self.encoder(event, data, event_id)
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        for subscriber in targets:
+            if subscriber.loop is running_loop:
+                self._deliver(subscriber, payload, event_id)
+            else:
+                try:
+                    subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, payload, event_id)
+                except RuntimeError:
+                    # Loop already closed; the connection is gone
+                    self.unsubscribe(subscriber)
+
+    def _deliver(self, subscriber: Subscriber, payload: str, event_id: Optional[int] = None):
+        if subscriber.evicted or subscriber.offer(payload, event_id):
+            return
+        self.evict(subscriber)
+
+    def evict(self, subscriber: Subscriber):
+        """Drop a slow consumer; its sender loop wakes up and closes the socket"""
+        if subscriber.evicted:
+            return
+        subscriber.evicted = True
+        self.evictions += 1
+        self.unsubscribe(subscriber)
+        # Drain so the wake-up sentinel always fits
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+
+# Chat events for /api/ws
+chat_broker = Broker()
+# Notification events for /api/notifications/stream
+notification_broker = Broker(encoder=encode_sse)
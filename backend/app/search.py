@@ -0,0 +1,186 @@
+"""
+SafeZonePH Search
+Full-text search across help requests, community tasks, alerts and messages.
+SQLite uses FTS5 tables kept in sync by triggers (BM25 ranking, snippet());
+Postgres uses a generated tsvector column (ts_rank_cd, ts_headline). Databases
+with neither fall back to a LIKE scan, unranked.
+"""
+
+import html
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, column, func, inspect, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+MAX_TERMS = 8
+SNIPPET_TOKENS = 16
+
+# Highlight markers that can't occur in stored text; swapped for <mark> after escaping
+MARK_START, MARK_END = "\x02", "\x03"
+
+TERM = re.compile(r"\w+")
+
+
+def query_terms(q: str) -> list[str]:
+    return TERM.findall(q.casefold())[:MAX_TERMS]
+
+
+def fts5_query(terms: list[str], columns: Iterable[str]) -> str:
+    """All terms, the last as a prefix (search as you type), limited to the text columns"""
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    return f"{{{' '.join(columns)}}} : ({' AND '.join(phrases)})"
+
+
+def tsquery(terms: list[str]) -> str:
+    return " & ".join([*terms[:-1], f"{terms[-1]}:*"])
+
+
+def highlight(snippet: Optional[str]) -> str:
+    """Escape a marked-up snippet for HTML and turn the markers into <mark> tags"""
+    return html.escape(snippet or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def mark_terms(value: str, terms: list[str], width: int = 160) -> str:
+    """Snippet for the scan fallback: the text around the first hit, terms marked"""
+    value = value or ""
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(value)
+    start = max(0, first.start() - width // 4) if first else 0
+    excerpt = value[start:start + width]
+    marked = pattern.sub(lambda match: f"{MARK_START}{match.group(0)}{MARK_END}", excerpt)
+    return ("…" if start else "") + marked + ("…" if start + width < len(value) else "")
+
+
+def _participant(user_id: int) -> str:
+    return f"u{user_id}"
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """One searchable table. scope columns hold user ids; a hit is only returned
+    to a user named in one of them (messages: sender and receiver)."""
+    kind: str
+    model: type
+    columns: tuple[str, ...]  # searched text, most important first
+    title: Optional[str] = None
+    details: tuple[str, ...] = ()
+    scope: tuple[str, ...] = ()
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.model.__tablename__}_fts"
+
+
+class SearchIndex:
+    def __init__(self, sources: list[SearchSource]):
+        self.sources = {source.kind: source for source in sources}
+        self._backends: dict[str, str] = {}
+
+    def backend(self, db: Session, source: SearchSource) -> str:
+        backend = self._backends.get(source.kind)
+        if backend is None:
+            connection = db.connection()
+            if connection.dialect.name == "postgresql" and any(
+                info["name"] == "search_vector" for info in inspect(connection).get_columns(source.model.__tablename__)
+            ):
+                backend = "tsvector"
+            elif inspect(connection).has_table(source.fts_table):
+                backend = "fts5"
+            else:
+                backend = "scan"
+            self._backends[source.kind] = backend
+        return backend
+
+    def search(self, db: Session, q: str, kinds: Iterable[str], user_id: Optional[int],
+               limit: int = 20, offset: int = 0) -> list[dict]:
+        """Best hits across the given kinds, best first. Scoped kinds are skipped without a user."""
+        terms = query_terms(q)
+        if not terms:
+            return []
+        hits = []
+        for kind in kinds:
+            source = self.sources[kind]
+            if source.scope and user_id is None:
+                continue
+            run = {"fts5": self._fts5, "tsvector": self._tsvector, "scan": self._scan}[self.backend(db, source)]
+            hits.extend(run(db, source, terms, user_id, limit + offset))
+        # bm25 / ts_rank_cd are on comparable scales per query; good enough to interleave kinds.
+        # Newest first among equal scores (every scan-fallback hit scores 0).
+        hits.sort(key=lambda hit: hit["created_at"] or datetime.min, reverse=True)
+        hits.sort(key=lambda hit: hit["score"], reverse=True)
+        return hits[offset:offset + limit]
+
+    def _hit(self, source: SearchSource, row, score: float, snippet: str) -> dict:
+        return {
+            "type": source.kind,
+            "id": row.id,
+            "title": getattr(row, source.title) if source.title else None,
+            "snippet": highlight(snippet),
+            "score": score,
+            "created_at": row.created_at,
+            "details": {field: getattr(row, field) for field in source.details},
+        }
+
+    def _fields(self, source: SearchSource, *extra: str) -> list:
+        fields = ["id", "created_at", *source.details, *([source.title] if source.title else []), *extra]
+        return [getattr(source.model, field) for field in dict.fromkeys(fields)]
+
+    def _fts5(self, db: Session, source: SearchSource, terms: list[str], user_id: Optional[int], limit: int) -> list[dict]:
+        model = source.model
+        fts = table(source.fts_table, column("rowid"))
+        fts_name = literal_column(source.fts_table)
+        match = fts5_query(terms, source.columns)
+        if source.scope:
+            match += f" AND participants : {_participant(user_id)}"
+        # Title column weighted up; the participants column never counts
+        weights = [5.0, *[1.0] * (len(source.columns) - 1), *([0.0] if source.scope else [])]
+        # Scoped sources snippet their first column, so the participants match isn't picked
+        snippet_column = 0 if source.scope else -1
+        rank = func.bm25(fts_name, *weights).label("rank")
+        snippet = func.snippet(fts_name, snippet_column, MARK_START, MARK_END, "…", SNIPPET_TOKENS).label("snippet")
+        rows = db.execute(
+            select(*self._fields(source), rank, snippet)
+            .join_from(model, fts, fts.c.rowid == model.id)
+            .where(fts_name.op("MATCH")(match))
+            .order_by(rank)
+            .limit(limit)
+        ).all()
+        return [self._hit(source, row, -row.rank, row.snippet) for row in rows]
+
+    def _tsvector(self, db: Session, source: SearchSource, terms: list[str], user_id: Optional[int], limit: int) -> list[dict]:
+        model = source.model
+        query = func.to_tsquery("simple", tsquery(terms))
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        document = func.concat_ws(" ", *(getattr(model, name) for name in source.columns))
+        options = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={SNIPPET_TOKENS}, MinWords=4"
+        rank = func.ts_rank_cd(vector, query).label("rank")
+        criteria = [vector.op("@@")(query)]
+        if source.scope:
+            criteria.append(or_(*(getattr(model, name) == user_id for name in source.scope)))
+        rows = db.execute(
+            select(*self._fields(source), rank, func.ts_headline("simple", document, query, options).label("snippet"))
+            .where(*criteria)
+            .order_by(rank.desc())
+            .limit(limit)
+        ).all()
+        return [self._hit(source, row, float(row.rank), row.snippet) for row in rows]
+
+    def _scan(self, db: Session, source: SearchSource, terms: list[str], user_id: Optional[int], limit: int) -> list[dict]:
+        model = source.model
+        columns = [getattr(model, name) for name in source.columns]
+        criteria = [or_(*(text_column.ilike(f"%{term}%") for text_column in columns)) for term in terms]
+        if source.scope:
+            criteria.append(or_(*(getattr(model, name) == user_id for name in source.scope)))
+        rows = db.query(*self._fields(source, *source.columns)).filter(and_(*criteria)).order_by(
+            model.created_at.desc()
+        ).limit(limit).all()
+        hits = []
+        for row in rows:
+            # Snippet the column matching the most terms
+            best = max(source.columns, key=lambda name: sum(term in (getattr(row, name) or "").casefold() for term in terms))
+            hits.append(self._hit(source, row, 0.0, mark_terms(getattr(row, best), terms)))
+        return hits
@@ -0,0 +1,169 @@
+"""
+SafeZonePH Response Serialization
+Fast JSON rendering and column projections that turn query rows straight into
+response bodies, without hydrating ORM objects or running jsonable_encoder.
+Clients that send Accept: application/msgpack get MessagePack instead, with lists
+of records encoded column-oriented.
+"""
+
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Optional
+
+import pydantic_core
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pydantic-core's encoder is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Without it every client gets JSON
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+_response_format: ContextVar[str] = ContextVar("response_format", default=JSON_MEDIA_TYPE)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON in native code; datetimes and dates come out as ISO 8601 strings"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Same text the JSON encoders produce
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def columnar(content: Any) -> Any:
+    """Lists of records sharing the same keys become {"columns": [...], "rows": [[...], ...]},
+    so field names are sent once per list instead of once per row"""
+    if isinstance(content, dict):
+        return {key: columnar(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        if content and isinstance(content[0], dict):
+            columns = tuple(content[0])
+            if all(isinstance(item, dict) and tuple(item) == columns for item in content):
+                return {
+                    "columns": list(columns),
+                    "rows": [[columnar(value) for value in item.values()] for item in content],
+                }
+        return [columnar(item) for item in content]
+    return content
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(columnar(content), default=_msgpack_default)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """MessagePack when the Accept header ranks it above JSON (ties go to an explicitly named type)"""
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    msgpack_q = json_q = wildcard_q = 0.0
+    json_named = False
+    for part in accept.split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_ALIASES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type == JSON_MEDIA_TYPE:
+            json_q, json_named = max(json_q, q), True
+        elif media_type in ("*/*", "application/*"):
+            wildcard_q = max(wildcard_q, q)
+    if not json_named:
+        json_q = wildcard_q
+    if msgpack_q > json_q or (msgpack_q > 0 and msgpack_q == json_q and not json_named):
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def response_format() -> str:
+    """Media type negotiated for the current request"""
+    return _response_format.get()
+
+
+class ContentNegotiationMiddleware:
+    """Records the negotiated format for the responses rendered while handling a request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            await self.app(scope, receive, send)
+            return
+
+        accept = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"accept"), None)
+        token = _response_format.set(negotiate(accept))
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if not any(name.lower() == b"vary" for name, _ in headers):
+                    headers.append((b"vary", b"Accept"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            _response_format.reset(token)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson when installed, pydantic-core's encoder otherwise,
+    and MessagePack when the request negotiated it"""
+
+    def render(self, content: Any) -> bytes:
+        if response_format() == MSGPACK_MEDIA_TYPE:
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return packb(content)
+        return dumps(content)
+
+
+class Projection:
+    """The columns of a model that a response schema exposes.
+
+    Querying them returns plain row tuples (no identity map, no ORM state), and
+    zipping those with the schema's field names gives the response items directly.
+    The schema stays the documented response_model, so the two can't drift apart.
+    """
+
+    def __init__(self, model, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self.columns = [getattr(model, field) for field in self.fields]
+
+    def query(self, db):
+        return db.query(*self.columns)
+
+    def items(self, rows) -> list[dict]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def page(self, rows, next_cursor: Optional[str]) -> Response:
+        if response_format() == MSGPACK_MEDIA_TYPE:
+            # Rows are already column-ordered; skip building a dict per row
+            items = {"columns": list(self.fields), "rows": [list(row) for row in rows]}
+            body = msgpack.packb({"items": items, "next_cursor": next_cursor}, default=_msgpack_default)
+            return Response(content=body, media_type=MSGPACK_MEDIA_TYPE)
+        return FastJSONResponse({"items": self.items(rows), "next_cursor": next_cursor})
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Alert fan-out benchmark: a barangay-wide alert reaching every resident, delivered
+the old way (one ORM add() per notification) and through the area index with
+chunked executemany inserts. Runs in-process against a throwaway SQLite database.
+Usage: python alert_fanout.py [--residents 50000] [--others 50000] [--batch-size 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import APP_DIR
+
+sys.path.insert(0, APP_DIR)
+
+from areas import user_area_keys  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--residents", type=int, default=50_000, help="users in the alerted barangay")
+    parser.add_argument("--others", type=int, default=50_000, help="users elsewhere")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    os.environ["ALERT_FANOUT_BATCH_SIZE"] = str(args.batch_size)
+
+    import main as app  # noqa: E402
+    import migrations  # noqa: E402
+
+    migrations.upgrade(app.engine)
+    total = args.residents + args.others
+    with app.engine.begin() as conn:
+        conn.execute(app.User.__table__.insert(), [{
+            "email": f"user{i}@example.com", "first_name": "Resident", "last_name": str(i),
+            "hashed_password": "x", "city": "Quezon City",
+            "barangay": "San Miguel" if i < args.residents else f"Barangay {i % 40}",
+        } for i in range(total)])
+        rows = conn.execute(app.User.__table__.select().with_only_columns(
+            app.User.id, app.User.city, app.User.barangay
+        )).all()
+        started = time.perf_counter()
+        app.area_index.write(conn, {user_id: user_area_keys(city, barangay) for user_id, city, barangay in rows})
+        print(f"index       {total} users in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def new_alert(db) -> int:
+        alert = app.GlobalAlert(
+            user_id=0, created_by="Benchmark", type="weather", priority="critical",
+            title="Flash flood warning", message="Move to higher ground now.",
+            affected_areas=json.dumps(["Brgy. San Miguel"]),
+        )
+        db.add(alert)
+        db.commit()
+        return alert.id
+
+    db = app.SessionLocal()
+    try:
+        alert_id = new_alert(db)
+        started = time.perf_counter()
+        for (user_id,) in db.query(app.User.id).filter(app.User.barangay == "San Miguel"):
+            db.add(app.Notification(
+                user_id=user_id, type="global_alert", title="Flash flood warning",
+                message="Move to higher ground now.", related_id=alert_id,
+            ))
+        db.commit()
+        elapsed = time.perf_counter() - started
+        print(f"orm add()   {args.residents} notifications in {elapsed:.2f}s")
+
+        alert_id = new_alert(db)
+        started = time.perf_counter()
+        notified = app._fan_out_alert(db, alert_id)
+        elapsed = time.perf_counter() - started
+        print(f"fan-out     {notified} notifications in {elapsed:.2f}s "
+              f"({args.batch_size}-row batches, {notified / elapsed:,.0f}/s)")
+    finally:
+        db.close()
+        app.engine.dispose()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Buddy matching benchmark: builds the suggestion matcher over synthetic users spread
+across Metro Manila, then times top-k queries and incremental profile / activity
+updates. Runs in-process without a database.
+Usage: python buddy_matching.py [--users 500000] [--queries 200] [--limit 10]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import APP_DIR
+
+sys.path.insert(0, APP_DIR)
+
+from matching import BuddyMatcher  # noqa: E402
+
+CITIES = ["Quezon City", "Manila", "Makati", "Pasig", "Taguig", "Caloocan", "Marikina", "Pasay"]
+
+
+def synthetic_users(count: int, rng: random.Random):
+    now = datetime.utcnow()
+    for user_id in range(1, count + 1):
+        city = rng.choice(CITIES)
+        has_home = rng.random() < 0.7
+        yield (
+            user_id,
+            rng.uniform(14.35, 14.78) if has_home else None,
+            rng.uniform(120.90, 121.15) if has_home else None,
+            city,
+            f"Barangay {rng.randrange(150)}",
+            rng.randrange(0, 5000),
+            rng.random() > 0.02,
+            now - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = list(synthetic_users(args.users, rng))
+    matcher = BuddyMatcher(lambda db: rows)
+    if not matcher.available:
+        sys.exit("NumPy is not installed")
+
+    started = time.perf_counter()
+    matcher.ensure_loaded(None)
+    print(f"load        {len(matcher)} users in {time.perf_counter() - started:.2f}s")
+
+    timings = []
+    for _ in range(args.queries):
+        user_id = rng.randrange(1, args.users + 1)
+        history = {rng.randrange(1, args.users + 1): rng.randrange(1, 4) for _ in range(rng.randrange(10))}
+        started = time.perf_counter()
+        matcher.suggest(user_id, args.limit, history=history)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"top-{args.limit:<6} median {statistics.median(timings):.1f}ms, "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f}ms over {args.queries} queries")
+
+    started = time.perf_counter()
+    updates = 10_000
+    now = datetime.utcnow()
+    matcher.apply(
+        ("activity", rng.randrange(1, args.users + 1), now) if i % 2 else
+        ("user", rng.randrange(1, args.users + 1), 14.6, 121.0, "Pasig", "Kapitolyo", rng.randrange(5000), True)
+        for i in range(updates)
+    )
+    elapsed = time.perf_counter() - started
+    print(f"updates     {updates} in {elapsed * 1000:.0f}ms ({elapsed / updates * 1e6:.1f}us each)")
+
+    started = time.perf_counter()
+    matcher.suggest(1, args.limit)
+    print(f"top-{args.limit:<6} {(time.perf_counter() - started) * 1000:.1f}ms right after the updates")
+
+
+if __name__ == "__main__":
+    main()
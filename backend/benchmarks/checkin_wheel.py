@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Missed check-in scheduler benchmark: the hashed timer wheel behind the check-in
+monitor with many concurrent active buddy sessions. Reports the cost of scheduling,
+rescheduling on check-in, and of each one-second tick, against simulated time.
+Usage: python checkin_wheel.py [--sessions 100000] [--interval-minutes 30] [--slots 512]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import APP_DIR
+
+sys.path.insert(0, APP_DIR)
+
+from checkins import TimerWheel  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--interval-minutes", type=int, default=30)
+    parser.add_argument("--slots", type=int, default=512)
+    args = parser.parse_args()
+
+    interval = args.interval_minutes * 60
+    wheel = TimerWheel(tick=1.0, slots=args.slots)
+    now = 1_700_000_000.0
+    wheel.advance(now)
+
+    started = time.perf_counter()
+    for session_id in range(args.sessions):
+        wheel.schedule(session_id, now + random.uniform(0, interval))
+    elapsed = time.perf_counter() - started
+    print(f"schedule    {args.sessions} timers in {elapsed * 1000:.0f}ms ({elapsed / args.sessions * 1e6:.2f}us each)")
+
+    # Simulate one full interval second by second; every fired session is rescheduled
+    tick_times, fired = [], 0
+    reschedule_time = 0.0
+    for second in range(1, interval + 1):
+        tick_started = time.perf_counter()
+        expired = wheel.advance(now + second)
+        tick_times.append(time.perf_counter() - tick_started)
+        fired += len(expired)
+        reschedule_started = time.perf_counter()
+        for session_id, _ in expired:
+            wheel.schedule(session_id, now + second + interval)
+        reschedule_time += time.perf_counter() - reschedule_started
+
+    tick_times.sort()
+    print(f"ticks       {len(tick_times)} simulated seconds, {fired} timers fired, {len(wheel)} still scheduled")
+    print(f"tick cost   p50={tick_times[len(tick_times) // 2] * 1e6:.0f}us "
+          f"p99={tick_times[int(len(tick_times) * 0.99)] * 1e6:.0f}us max={tick_times[-1] * 1e6:.0f}us")
+    print(f"reschedule  {fired} in {reschedule_time * 1000:.0f}ms ({reschedule_time / max(fired, 1) * 1e6:.2f}us each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Claim contention stress test: many users respond to one help request, acknowledge
+one alert and volunteer for one community task all at once, each sending every
+request twice. Exits non-zero if any counter lost an update, counted a user twice,
+or the task went to more than one volunteer.
+Usage: python claim_contention.py [--users 60] [--scheme sqlite|sqlite+aiosqlite]
+Requires httpx (pip install httpx).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from common import running_server
+
+
+async def register_users(client: httpx.AsyncClient, count: int) -> list[dict]:
+    async def register(i: int) -> dict:
+        response = await client.post("/api/auth/register", json={
+            "email": f"claim{i}@example.com",
+            "password": "benchmark-password",
+            "firstName": "Claim",
+            "lastName": str(i),
+        })
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return list(await asyncio.gather(*(register(i) for i in range(count))))
+
+
+async def storm(client: httpx.AsyncClient, method: str, path: str, users: list[dict]) -> tuple[Counter, float]:
+    """Send the request as every user, twice each, all in flight together"""
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.request(method, path, headers=headers) for headers in users * 2))
+    return Counter(response.status_code for response in responses), time.perf_counter() - started
+
+
+async def run(base_url: str, user_count: int) -> list[str]:
+    failures = []
+    limits = httpx.Limits(max_connections=user_count * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        users = await register_users(client, user_count)
+        owner = users[0]
+
+        help_request = (await client.post("/api/help-requests", headers=owner, json={
+            "type": "evacuation", "title": "Stress", "description": "Everyone respond",
+            "location": "Here", "urgency": "high", "responders_needed": user_count,
+        })).json()
+        statuses, elapsed = await storm(client, "PATCH", f"/api/help-requests/{help_request['id']}/respond", users)
+        help_request = next(item for item in (await client.get("/api/help-requests")).json()["items"]
+                            if item["id"] == help_request["id"])
+        print(f"respond     {dict(statuses)} in {elapsed:.2f}s -> responders_count={help_request['responders_count']}, "
+              f"status={help_request['status']}")
+        if help_request["responders_count"] != user_count or help_request["status"] != "in_progress":
+            failures.append(f"help request counted {help_request['responders_count']} of {user_count} responders")
+        if statuses[200] != len(users) * 2:
+            failures.append(f"respond: {dict(statuses)}")
+
+        alert = (await client.post("/api/global-alerts", headers=owner, json={
+            "type": "weather", "priority": "high", "title": "Stress", "message": "Acknowledge",
+            "affected_areas": ["Nowhere"],
+        })).json()
+        statuses, elapsed = await storm(client, "PATCH", f"/api/global-alerts/{alert['id']}/acknowledge", users)
+        alert = next(item for item in (await client.get("/api/global-alerts")).json()["items"] if item["id"] == alert["id"])
+        print(f"acknowledge {dict(statuses)} in {elapsed:.2f}s -> acknowledged_count={alert['acknowledged_count']}")
+        if alert["acknowledged_count"] != user_count:
+            failures.append(f"alert counted {alert['acknowledged_count']} of {user_count} acknowledgements")
+        if statuses[200] != len(users) * 2:
+            failures.append(f"acknowledge: {dict(statuses)}")
+
+        task = (await client.post("/api/community-tasks", headers=owner, json={
+            "title": "Stress", "description": "Only one volunteer", "location": "Here", "urgency": "low",
+        })).json()
+        statuses, elapsed = await storm(client, "POST", f"/api/community-tasks/{task['id']}/volunteer", users)
+        print(f"volunteer   {dict(statuses)} in {elapsed:.2f}s")
+        if statuses[200] != 1 or statuses[400] != len(users) * 2 - 1:
+            failures.append(f"task claimed {statuses[200]} times")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=60)
+    parser.add_argument("--scheme", default="sqlite")
+    args = parser.parse_args()
+
+    with running_server(scheme=args.scheme) as base_url:
+        failures = asyncio.run(run(base_url, args.users))
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark: time from a fresh interpreter importing an entry point to its
+first response, for the uvicorn app (backend/app/main.py, lifespan startup then a
+request) and the serverless handler (api/index.py, one Mangum invocation). The
+first run of each creates its database; the rest start against an existing one.
+SQL statements run before the first response are counted too: against a remote
+database each one is a round trip added to the cold start, which --db-latency-ms
+simulates by sleeping before every statement. The serverless handler is also
+timed with SCHEMA_VERSION set, as a deploy that ran the migrations would set it.
+Usage: python cold_start.py [--runs 5] [--path /api/global-alerts] [--db-latency-ms 0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import APP_DIR
+
+sys.path.insert(0, APP_DIR)
+
+from migrations import LATEST_VERSION  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(APP_DIR))
+
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+def round_trip(*args):
+    statements.append(1)
+    time.sleep({latency!r})
+event.listen(Engine, "before_cursor_execute", round_trip)
+sys.path.insert(0, {directory!r})
+module = __import__({module!r})
+imported = time.perf_counter()
+
+async def serve_once(app, path):
+    import httpx
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.get(path)
+        return response.status_code, time.perf_counter()
+    finally:
+        await app.router.shutdown()
+
+if {serverless!r}:
+    response = module.handler({{
+        "version": "2.0", "routeKey": "$default", "rawPath": {path!r}, "rawQueryString": "",
+        "headers": {{"host": "bench"}}, "isBase64Encoded": False,
+        "requestContext": {{"stage": "$default", "http": {{
+            "method": "GET", "path": {path!r}, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1",
+        }}}},
+    }}, None)
+    status, responded = response["statusCode"], time.perf_counter()
+else:
+    status, responded = asyncio.run(serve_once(module.app, {path!r}))
+print(json.dumps({{
+    "status": status, "import": imported - started, "first_response": responded - started, "statements": len(statements),
+}}))
+"""
+
+ENTRY_POINTS = {
+    "uvicorn (backend/app/main.py)": {"directory": APP_DIR, "module": "main", "serverless": False},
+    "serverless (api/index.py)": {"directory": os.path.join(ROOT_DIR, "api"), "module": "index", "serverless": True},
+    "serverless, SCHEMA_VERSION set": {
+        "directory": os.path.join(ROOT_DIR, "api"), "module": "index", "serverless": True,
+        "env": {"SCHEMA_VERSION": str(LATEST_VERSION)},
+    },
+}
+
+
+def cold_start(entry: dict, path: str, database_url: str, latency: float) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, **entry.get("env", {}))
+    env.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    child = CHILD.format(path=path, latency=latency, directory=entry["directory"], module=entry["module"],
+                         serverless=entry["serverless"])
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", child],
+        cwd=entry["directory"], env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts against an existing database")
+    parser.add_argument("--path", default="/api/global-alerts")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated round trip per SQL statement")
+    args = parser.parse_args()
+    latency = args.db_latency_ms / 1000
+
+    for label, entry in ENTRY_POINTS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            # The database is created without the stamp, as the deploy's migration step would
+            first = cold_start({**entry, "env": {}}, args.path, database_url, latency)
+            runs = [cold_start(entry, args.path, database_url, latency) for _ in range(args.runs)]
+        for run in runs:
+            run["serving"] = run["first_response"] - run["import"]
+        median = {
+            key: statistics.median(run[key] for run in runs) * 1000
+            for key in ("import", "first_response", "serving", "process")
+        }
+        print(f"{label}")
+        print(f"  new database       first response {first['first_response'] * 1000:6.0f}ms, "
+              f"{first['statements']} SQL statements (HTTP {first['status']})")
+        print(f"  existing database  import {median['import']:6.0f}ms, first response {median['first_response']:6.0f}ms "
+              f"({median['serving']:4.0f}ms after import), process {median['process']:6.0f}ms (median of {args.runs}), "
+              f"{runs[-1]['statements']} SQL statements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Shared helpers for the SafeZonePH backend benchmarks.
+Benchmarks start the real app under uvicorn against a throwaway SQLite database.
+"""
+
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label: str, samples: list[float]) -> str:
+    ms = [s * 1000 for s in samples]
+    return (
+        f"{label:<32} n={len(ms):<6} p50={percentile(ms, 50):7.1f}ms "
+        f"p95={percentile(ms, 95):7.1f}ms p99={percentile(ms, 99):7.1f}ms"
+    )
+
+
+@contextlib.contextmanager
+def running_server(env: dict | None = None, app: str = "main:app", cwd: str = APP_DIR, scheme: str = "sqlite"):
+    """Run the app under uvicorn on a free port with a fresh database; yields the base URL"""
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        server_env = dict(os.environ)
+        server_env.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+        server_env["DATABASE_URL"] = f"{scheme}:///{os.path.join(tmp, 'bench.db')}"
+        server_env.update(env or {})
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+            cwd=cwd, env=server_env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    httpx.get(base_url + "/", timeout=1)
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or process.poll() is not None:
+                        raise RuntimeError("server did not start")
+                    time.sleep(0.1)
+            yield base_url
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
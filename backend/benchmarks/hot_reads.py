@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Hot read benchmark: many clients polling the public feeds (/api/global-alerts,
+/api/community-tasks, /api/help-requests) with the response cache off and on,
+while a trickle of writes keeps invalidating them.
+Usage: python hot_reads.py [--clients 200] [--duration 10] [--rows 200] [--write-interval 1]
+Requires httpx.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from common import running_server, summarize
+
+MODES = {
+    "uncached": {"RESPONSE_CACHE_MAX_BYTES": "0"},
+    "cached": {},
+}
+FEEDS = ["/api/global-alerts", "/api/community-tasks", "/api/help-requests"]
+
+
+async def seed(client: httpx.AsyncClient, rows: int) -> dict:
+    response = await client.post("/api/auth/register", json={
+        "email": "reader@example.com",
+        "password": "benchmark-password",
+        "firstName": "Read",
+        "lastName": "Er",
+    })
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for i in range(rows):
+        await client.post("/api/global-alerts", headers=headers, json={
+            "type": "weather", "priority": "high", "title": f"Flood advisory #{i}",
+            "message": "Water levels are rising along the creek; move vehicles to higher ground.",
+            "affected_areas": ["Brgy. San Miguel", "Brgy. Poblacion"],
+        })
+        await client.post("/api/help-requests", headers=headers, json={
+            "type": "safety", "title": f"Need an escort home #{i}",
+            "description": "Walking home late from the market and the street lights are out near the bridge.",
+            "location": "Brgy. San Miguel", "urgency": "high",
+        })
+    await client.post("/api/seed-community-tasks")
+    return headers
+
+
+async def load(base_url: str, clients: int, duration: float, rows: int, write_interval: float):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        headers = await seed(client, rows)
+        samples, errors, writes = [], 0, 0
+        stop_at = time.monotonic() + duration
+
+        async def reader(offset: int):
+            nonlocal errors
+            i = offset
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(FEEDS[i % len(FEEDS)])
+                    response.raise_for_status()
+                    samples.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+                i += 1
+
+        async def writer():
+            nonlocal writes
+            while time.monotonic() < stop_at:
+                await asyncio.sleep(write_interval)
+                await client.post("/api/global-alerts", headers=headers, json={
+                    "type": "weather", "priority": "critical", "title": f"Update #{writes}",
+                    "message": "Evacuate low-lying areas now.", "affected_areas": ["Brgy. San Miguel"],
+                })
+                writes += 1
+
+        await asyncio.gather(writer(), *(reader(i) for i in range(clients)))
+        stats = (await client.get("/api/health/cache")).json()
+        return samples, errors, writes, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--rows", type=int, default=200, help="alerts and help requests to seed")
+    parser.add_argument("--write-interval", type=float, default=1, help="seconds between alert writes")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        with running_server(env=MODES[mode]) as base_url:
+            samples, errors, writes, stats = asyncio.run(
+                load(base_url, args.clients, args.duration, args.rows, args.write_interval)
+            )
+        print(summarize(f"{mode} ({len(samples) / args.duration:.0f} req/s)", samples)
+              + f" errors={errors} writes={writes} hits={stats.get('hits')} misses={stats.get('misses')}")
+
+
+if __name__ == "__main__":
+    main()
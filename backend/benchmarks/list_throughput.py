@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+List endpoint throughput: ORM hydration + from_orm + jsonable_encoder versus the
+column projection + native JSON path used by /api/help-requests and /api/global-alerts.
+Reports rows/second for rendering a page in-process and for full requests through the app.
+Usage: python list_throughput.py [--rows 5000] [--page-size 200] [--repeat 50]
+Requires httpx (for TestClient).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import APP_DIR
+
+
+def seed(main, rows: int):
+    db = main.SessionLocal()
+    db.add_all(main.HelpRequest(
+        user_id=1, user_name="Juan Dela Cruz", type="safety", title=f"Need an escort home #{i}",
+        description="Walking home late from the market and the street lights are out near the bridge.",
+        location="Brgy. San Miguel", urgency="high", responders_needed=2
+    ) for i in range(rows))
+    db.add_all(main.GlobalAlert(
+        user_id=1, created_by="Barangay Office", type="weather", priority="high",
+        title=f"Flood advisory #{i}", message="Water levels are rising along the creek; move vehicles to higher ground.",
+        affected_areas=json.dumps(["Brgy. San Miguel", "Brgy. Poblacion"]), expires_at="24 hours"
+    ) for i in range(rows))
+    db.commit()
+    db.close()
+
+
+def orm_page(main, model, schema, page_size: int) -> bytes:
+    """The previous read path, kept here as the baseline"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    db = main.SessionLocal()
+    try:
+        rows = db.query(model).order_by(model.created_at.desc(), model.id.desc()).limit(page_size).all()
+        content = jsonable_encoder({"items": [schema.from_orm(row) for row in rows], "next_cursor": None})
+        return JSONResponse(content).body
+    finally:
+        db.close()
+
+
+def projection_page(main, model, projection, page_size: int) -> bytes:
+    db = main.SessionLocal()
+    try:
+        rows = projection.query(db).order_by(model.created_at.desc(), model.id.desc()).limit(page_size).all()
+        return projection.page(rows, None).body
+    finally:
+        db.close()
+
+
+def rate(label: str, fn, rows_per_call: int, repeat: int):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<48} {elapsed * 1000:8.2f} ms/page {rows_per_call / elapsed:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    sys.path.insert(0, APP_DIR)
+    import warnings
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    import main as app_main
+    import migrations
+    from fastapi.testclient import TestClient
+
+    migrations.upgrade(app_main.engine)
+    seed(app_main, args.rows)
+
+    feeds = [
+        ("help-requests", app_main.HelpRequest, app_main.HelpRequestResponse, app_main.help_request_projection),
+        ("global-alerts", app_main.GlobalAlert, app_main.GlobalAlertResponse, app_main.global_alert_projection),
+    ]
+    print(f"{args.rows} rows per table, pages of {args.page_size}")
+    for name, model, schema, projection in feeds:
+        assert json.loads(orm_page(app_main, model, schema, args.page_size)) == \
+            json.loads(projection_page(app_main, model, projection, args.page_size))
+        rate(f"{name}: ORM + from_orm + jsonable_encoder",
+             lambda: orm_page(app_main, model, schema, args.page_size), args.page_size, args.repeat)
+        rate(f"{name}: projection + native JSON",
+             lambda: projection_page(app_main, model, projection, args.page_size), args.page_size, args.repeat)
+
+    with TestClient(app_main.app) as client:
+        for name, *_ in feeds:
+            url = f"/api/{name}?limit={args.page_size}"
+            rate(f"GET {url}", lambda: client.get(url).raise_for_status(), args.page_size, args.repeat)
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Login burst isolation benchmark.
+Measures latency of unrelated endpoints on their own and again while a burst of
+logins runs, to show password hashing doesn't starve the rest of the API.
+Usage: python login_isolation.py [--users 50] [--burst 64] [--duration 10]
+Requires httpx (pip install httpx).
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from common import running_server, summarize
+
+
+async def register_users(client: httpx.AsyncClient, count: int) -> list[str]:
+    tokens = []
+    for i in range(count):
+        response = await client.post("/api/auth/register", json={
+            "email": f"bench{i}@example.com",
+            "password": "benchmark-password",
+            "firstName": "Bench",
+            "lastName": str(i),
+        })
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+
+async def hammer_reads(client: httpx.AsyncClient, token: str, concurrency: int, stop_at: float) -> list[float]:
+    samples = []
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def worker():
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            await client.get("/api/help-requests", headers=headers)
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def login_burst(client: httpx.AsyncClient, users: int, concurrency: int, stop_at: float):
+    samples, rejected = [], 0
+
+    async def worker(offset: int):
+        nonlocal rejected
+        i = offset
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            response = await client.post("/api/auth/login", json={
+                "email": f"bench{i % users}@example.com",
+                "password": "benchmark-password",
+            })
+            if response.status_code == 503:
+                rejected += 1
+            else:
+                samples.append(time.perf_counter() - started)
+            i += concurrency
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return samples, rejected
+
+
+async def run(base_url: str, args):
+    limits = httpx.Limits(max_connections=args.burst + args.readers + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        tokens = await register_users(client, args.users)
+
+        baseline = await hammer_reads(client, tokens[0], args.readers, time.monotonic() + args.duration)
+        print(summarize("reads (idle)", baseline))
+
+        stop_at = time.monotonic() + args.duration
+        reads, (logins, rejected) = await asyncio.gather(
+            hammer_reads(client, tokens[0], args.readers, stop_at),
+            login_burst(client, args.users, args.burst, stop_at),
+        )
+        print(summarize("reads (during login burst)", reads))
+        print(summarize("logins", logins))
+        print(f"{'logins rejected (503)':<32} {rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent clients on the unrelated endpoint")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per phase")
+    args = parser.parse_args()
+
+    with running_server() as base_url:
+        asyncio.run(run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Concurrent polling benchmark: sync threadpool mode vs async database mode.
+Many clients poll /api/notifications/unread-count (what every open tab does);
+with sync handlers they queue behind the threadpool, with async mode they don't.
+Usage: python polling_concurrency.py [--clients 500] [--duration 10]
+Requires httpx and aiosqlite.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from common import running_server, summarize
+
+MODES = {
+    "sync": "sqlite",
+    "async": "sqlite+aiosqlite",
+}
+
+
+async def poll(base_url: str, clients: int, duration: float) -> tuple[list[float], int]:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        response = await client.post("/api/auth/register", json={
+            "email": "poller@example.com",
+            "password": "benchmark-password",
+            "firstName": "Poll",
+            "lastName": "Er",
+        })
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        samples, errors = [], 0
+        stop_at = time.monotonic() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/notifications/unread-count", headers=headers)
+                    response.raise_for_status()
+                    samples.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        return samples, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["sync", "async"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        with running_server(scheme=MODES[mode]) as base_url:
+            samples, errors = asyncio.run(poll(base_url, args.clients, args.duration))
+        print(summarize(f"{mode} ({len(samples) / args.duration:.0f} req/s)", samples) + f" errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
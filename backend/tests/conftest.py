@@ -0,0 +1,69 @@
+"""
+Shared fixtures for the backend tests. main.py configures itself from the
+environment at import time, so the settings are pinned here before any test
+imports it: a throwaway file-backed SQLite database, cheap scrypt parameters,
+hashing on threads, and no background workers.
+Run from backend/: pip install -r requirements-dev.txt && python -m pytest
+"""
+
+import atexit
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
+
+_DB_DIR = tempfile.mkdtemp(prefix="safezoneph-tests-")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_DB_DIR, 'app.db')}",
+    "JWT_SECRET_KEY": "test-secret",
+    "PASSWORD_HASH_EXECUTOR": "thread",
+    "SCRYPT_N": str(2 ** 10),
+    "ALERT_SWEEPER": "false",
+    "CHECKIN_MONITOR": "false",
+    "LIFECYCLE": "false",
+})
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def main():
+    import main
+
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(main):
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a fresh user; returns its id, email, password and auth headers"""
+    def make(password: str = "correct horse", **fields) -> dict:
+        email = f"user{next(_emails)}@example.com"
+        response = client.post("/api/auth/register", json={
+            "email": email, "password": password, "firstName": "Test", "lastName": "User", **fields,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return {
+            "id": body["user"]["id"],
+            "email": email,
+            "password": password,
+            "headers": {"Authorization": f"Bearer {body['access_token']}"},
+        }
+
+    return make
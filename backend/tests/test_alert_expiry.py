@@ -0,0 +1,59 @@
+"""
+Alert expiry without the background sweeper (conftest turns it off, as api/index.py
+does): reading the feed deactivates lapsed alerts and moves its ETag, and
+/api/cron/maintenance runs one pass of every worker for a scheduler to call.
+"""
+
+import time
+
+import pytest
+
+
+def test_lapsed_alert_leaves_the_feed_and_its_etag(client, main, make_user):
+    owner = make_user()
+    alert = client.post("/api/global-alerts", headers=owner["headers"], json={
+        "type": "weather", "priority": "low", "title": "Brief", "message": "Lapses in a second",
+        "affected_areas": ["Nowhere"], "expires_in": "0.0003",
+    }).json()
+    feed = client.get("/api/global-alerts")
+    assert alert["id"] in [item["id"] for item in feed.json()["items"]]
+    assert client.get("/api/global-alerts", headers={"If-None-Match": feed.headers["ETag"]}).status_code == 304
+
+    time.sleep(1.5)
+
+    feed = client.get("/api/global-alerts", headers={"If-None-Match": feed.headers["ETag"]})
+    assert feed.status_code == 200
+    assert alert["id"] not in [item["id"] for item in feed.json()["items"]]
+    with main.SessionLocal() as db:
+        assert db.get(main.GlobalAlert, alert["id"]).is_active is False
+
+
+@pytest.fixture
+def cron_secret(main, monkeypatch):
+    monkeypatch.setattr(main, "CRON_SECRET", "cron-secret")
+    return {"Authorization": "Bearer cron-secret"}
+
+
+def test_maintenance_needs_the_cron_secret(client, main, monkeypatch):
+    assert client.get("/api/cron/maintenance").status_code == 401
+    monkeypatch.setattr(main, "CRON_SECRET", "cron-secret")
+    assert client.get("/api/cron/maintenance", headers={"Authorization": "Bearer guess"}).status_code == 401
+
+
+def test_maintenance_flags_missed_check_ins(client, main, make_user, cron_secret):
+    user, buddy = make_user(), make_user()
+    session = client.post("/api/buddy/sessions", headers=user["headers"], json={
+        "buddy_id": buddy["id"], "check_in_interval": 30,
+    })
+    assert session.status_code == 200, session.text
+    with main.SessionLocal() as db:
+        row = db.query(main.BuddySession).filter_by(user_id=user["id"]).one()
+        row.last_check_in -= main.timedelta(minutes=31)
+        db.commit()
+
+    result = client.get("/api/cron/maintenance", headers=cron_secret)
+
+    assert result.status_code == 200
+    assert result.json()["missed_check_ins"] >= 1
+    notifications = client.get("/api/notifications", headers=buddy["headers"]).json()
+    assert "missed_check_in" in [notification["type"] for notification in notifications]
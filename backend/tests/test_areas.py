@@ -0,0 +1,40 @@
+"""
+Alert recipients from the area index (areas.py): barangays are keyed within their
+city, so an alert for one city's barangay misses its namesakes elsewhere.
+"""
+
+from areas import alert_area_keys, user_area_keys
+
+
+def test_barangays_are_keyed_by_city():
+    assert user_area_keys("Pasig City", "Brgy. San Miguel") == {"pasig", "pasig|san miguel"}
+    assert user_area_keys(None, "Brgy. San Miguel") == {"san miguel"}
+    assert user_area_keys("Manila", None) == {"manila"}
+
+    assert alert_area_keys("Brgy. San Miguel, Pasig City") == {"pasig|san miguel"}
+    assert alert_area_keys("San Miguel", home_city="Pasig") == {"san miguel", "pasig|san miguel"}
+    assert alert_area_keys("Manila") == {"manila"}
+
+
+def test_alert_reaches_its_barangay_and_not_namesakes(client, main, make_user):
+    official = make_user(city="Pasig")
+    pasig = make_user(city="Pasig City", barangay="San Miguel")
+    manila = make_user(city="Manila", barangay="San Miguel")
+    no_city = make_user(barangay="Brgy. San Miguel")
+
+    def recipients(areas, home_city=None):
+        with main.SessionLocal() as db:
+            user_ids = set(main.area_index.recipients(db, areas, 0, 1000, home_city))
+        return user_ids & {pasig["id"], manila["id"], no_city["id"]}
+
+    assert recipients(["San Miguel, Manila"]) == {manila["id"]}
+    assert recipients(["Brgy. San Miguel"], home_city="Pasig") == {pasig["id"], no_city["id"]}
+    assert recipients(["Pasig"]) == {pasig["id"]}
+
+    # Fan-out reads the home city off the alert's author
+    client.post("/api/global-alerts", headers=official["headers"], json={
+        "type": "weather", "priority": "high", "title": "Flood", "message": "Evacuate", "affected_areas": ["San Miguel"],
+    }).json()
+    with main.SessionLocal() as db:
+        notified = {row.user_id for row in db.query(main.Notification).filter(main.Notification.title.contains("Flood"))}
+    assert notified & {pasig["id"], manila["id"], no_city["id"]} == {pasig["id"], no_city["id"]}
@@ -0,0 +1,30 @@
+"""
+Read receipts (PUT /api/conversations/{user_id}/read): the chat page marks a
+pushed message read without refetching the thread.
+"""
+
+
+def unread(client, user) -> dict:
+    conversations = client.get("/api/conversations", headers=user["headers"]).json()
+    return {conversation["participant_id"]: conversation["unread_count"] for conversation in conversations}
+
+
+def test_marking_a_conversation_read_clears_its_unread_count(client, make_user):
+    sender, reader = make_user(), make_user()
+    for content in ("Kumusta?", "Ligtas ka ba?"):
+        sent = client.post("/api/messages", headers=sender["headers"], json={"receiver_id": reader["id"], "content": content})
+        assert sent.status_code == 200
+    assert unread(client, reader) == {sender["id"]: 2}
+
+    response = client.put(f"/api/conversations/{sender['id']}/read", headers=reader["headers"])
+
+    assert response.status_code == 200
+    assert response.json()["marked"] == 2
+    assert unread(client, reader) == {sender["id"]: 0}
+    # The sender's own messages don't count as read by the sender
+    assert client.put(f"/api/conversations/{reader['id']}/read", headers=sender["headers"]).json()["marked"] == 0
+
+
+def test_marking_an_unknown_conversation_read_is_not_found(client, make_user):
+    user = make_user()
+    assert client.put("/api/conversations/999999/read", headers=user["headers"]).status_code == 404
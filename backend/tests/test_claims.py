@@ -0,0 +1,110 @@
+"""
+Race-free claims (claims.py): every user sends the same request twice, all at
+once, against the file-backed SQLite database. Counters must match the number
+of distinct users and a community task must go to exactly one volunteer.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+USERS = 12
+
+
+@pytest.fixture
+def crowd(make_user):
+    return [make_user() for _ in range(USERS)]
+
+
+def storm(client, method: str, path: str, users: list[dict]) -> list:
+    """Send the request as every user, twice each, all in flight together"""
+    requests = [user["headers"] for user in users] * 2
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        return list(executor.map(lambda headers: client.request(method, path, headers=headers), requests))
+
+
+def test_concurrent_responses_count_each_user_once(client, main, make_user, crowd):
+    owner = make_user()
+    help_request = client.post("/api/help-requests", headers=owner["headers"], json={
+        "type": "evacuation", "title": "Stress", "description": "Everyone respond", "location": "Here",
+        "urgency": "high", "responders_needed": USERS,
+    }).json()
+
+    responses = storm(client, "PATCH", f"/api/help-requests/{help_request['id']}/respond", crowd)
+
+    assert Counter(response.status_code for response in responses) == {200: USERS * 2}
+    assert Counter(response.json()["message"] for response in responses) == {
+        "Response recorded": USERS, "Response already recorded": USERS,
+    }
+    with main.SessionLocal() as db:
+        row = db.get(main.HelpRequest, help_request["id"])
+        assert (row.responders_count, row.status) == (USERS, "in_progress")
+        assert db.query(main.HelpRequestResponder).filter_by(help_request_id=row.id).count() == USERS
+
+
+def test_concurrent_acknowledgements_count_each_user_once(client, main, make_user, crowd):
+    owner = make_user()
+    alert = client.post("/api/global-alerts", headers=owner["headers"], json={
+        "type": "weather", "priority": "high", "title": "Stress", "message": "Acknowledge", "affected_areas": ["Nowhere"],
+    }).json()
+
+    responses = storm(client, "PATCH", f"/api/global-alerts/{alert['id']}/acknowledge", crowd)
+
+    assert Counter(response.status_code for response in responses) == {200: USERS * 2}
+    with main.SessionLocal() as db:
+        assert db.get(main.GlobalAlert, alert["id"]).acknowledged_count == USERS
+    acknowledged = client.get("/api/global-alerts/acknowledged", headers=crowd[0]["headers"]).json()
+    assert alert["id"] in acknowledged
+
+
+def test_concurrent_volunteers_assign_the_task_once(client, main, make_user, crowd):
+    owner = make_user()
+    task = client.post("/api/community-tasks", headers=owner["headers"], json={
+        "title": "Stress", "description": "Only one volunteer", "location": "Here", "urgency": "low",
+    }).json()
+
+    responses = storm(client, "POST", f"/api/community-tasks/{task['id']}/volunteer", crowd)
+
+    assert Counter(response.status_code for response in responses) == {200: 1, 400: USERS * 2 - 1}
+    winner = next(response for response in responses if response.status_code == 200).json()
+    winner_id = winner["personal_task"]["created_by"]
+    assert winner["community_task"]["volunteers_count"] == 1
+    with main.SessionLocal() as db:
+        row = db.get(main.CommunityTask, task["id"])
+        assert (row.status, row.volunteer_id, row.volunteers_count) == ("assigned", winner_id, 1)
+        assert db.query(main.CommunityTaskVolunteer.user_id).filter_by(task_id=task["id"]).all() == [(winner_id,)]
+    winner_headers = next(user["headers"] for user in crowd if user["id"] == winner_id)
+    assert task["id"] in client.get("/api/community-tasks/volunteered", headers=winner_headers).json()
+
+
+def test_insert_once_without_on_conflict(main, monkeypatch):
+    """Dialects without ON CONFLICT insert in a savepoint; a duplicate leaves the transaction usable"""
+    import claims
+
+    monkeypatch.setattr(claims, "_DIALECT_INSERTS", {})
+    table = main.AlertAcknowledgement.__table__
+    with main.SessionLocal() as db:
+        row = {"alert_id": 10**9, "user_id": 1, "created_at": datetime.utcnow()}
+        assert claims.insert_once(db, table, **row) is True
+        assert claims.insert_once(db, table, **row) is False
+        assert db.query(main.AlertAcknowledgement).filter_by(alert_id=10**9).count() == 1
+        db.rollback()
+
+
+def test_claim_without_returning(main, make_user, client, monkeypatch):
+    """Dialects without UPDATE ... RETURNING lock, update and reload the row"""
+    import claims
+
+    owner = make_user()
+    task = client.post("/api/community-tasks", headers=owner["headers"], json={
+        "title": "Fallback", "description": "Claimed once", "location": "Here", "urgency": "low",
+    }).json()
+    with main.SessionLocal() as db:
+        monkeypatch.setattr(db.connection().dialect, "update_returning", False)
+        criteria = [main.CommunityTask.id == task["id"], main.CommunityTask.status == "open"]
+        claimed = claims.claim(db, main.CommunityTask, criteria, {"status": "assigned", "volunteer_id": owner["id"]})
+        assert (claimed.status, claimed.volunteer_id) == ("assigned", owner["id"])
+        assert claims.claim(db, main.CommunityTask, criteria, {"status": "assigned"}) is None
+        db.rollback()
@@ -0,0 +1,48 @@
+"""
+Conditional GETs on the public feeds (feeds.py): a client's ETag or Last-Modified
+keeps getting 304 until a write to the feed's table commits, including bulk
+UPDATEs that never load the rows.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def task(client, make_user):
+    owner = make_user()
+    return client.post("/api/community-tasks", headers=owner["headers"], json={
+        "title": "Feed", "description": "Watched", "location": "Here", "urgency": "low",
+    }).json()
+
+
+def test_unchanged_feed_answers_304(client, task):
+    first = client.get("/api/community-tasks")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    for headers in ({"If-None-Match": etag}, {"If-None-Match": f'"other", W/{etag}'},
+                    {"If-Modified-Since": first.headers["Last-Modified"]}):
+        cached = client.get("/api/community-tasks", headers=headers)
+        assert (cached.status_code, cached.content) == (304, b"")
+        assert cached.headers["ETag"] == etag
+
+
+def test_each_page_has_its_own_etag(client, task):
+    etag = client.get("/api/community-tasks").headers["ETag"]
+    other_page = client.get("/api/community-tasks", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+    assert other_page.headers["ETag"] != etag
+
+
+def test_a_committed_write_changes_the_etag(client, make_user, task):
+    etag = client.get("/api/community-tasks").headers["ETag"]
+    volunteer = make_user()
+
+    # Claimed with a bulk UPDATE, which bumps the stamp in the same transaction
+    assert client.post(f"/api/community-tasks/{task['id']}/volunteer", headers=volunteer["headers"]).status_code == 200
+
+    fresh = client.get("/api/community-tasks", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    # The feed lists open tasks only
+    assert task["id"] not in [item["id"] for item in fresh.json()["items"]]
@@ -0,0 +1,109 @@
+"""
+Leaderboard (leaderboard.py) outside this process's commits: polled changes for
+other workers' awards, full reloads once the snapshot is max_age old, and the
+bulk-built indexes those reloads swap in.
+"""
+
+from leaderboard import GLOBAL_SCOPE, Leaderboard, RankedIndex
+
+
+def test_reload_picks_up_other_workers_commits():
+    table = {1: 10, 2: 20}
+    board = Leaderboard(lambda db: [(user_id, points, None, None) for user_id, points in table.items()], max_age=0.0)
+    board.ensure_loaded(None)
+    assert [entry["user_id"] for entry in board.top(GLOBAL_SCOPE)] == [2, 1]
+
+    table[1] = 30  # committed by another worker: no update() here
+    board.ensure_loaded(None)
+
+    assert [entry["user_id"] for entry in board.top(GLOBAL_SCOPE)] == [1, 2]
+
+
+def test_snapshot_is_kept_without_max_age():
+    table = {1: 10}
+    board = Leaderboard(lambda db: [(user_id, points, None, None) for user_id, points in table.items()])
+    board.ensure_loaded(None)
+    table[1] = 30
+    board.ensure_loaded(None)
+
+    assert board.position(1)["points"] == 10
+
+
+def test_commits_during_a_reload_are_replayed_on_the_new_snapshot():
+    board = None
+
+    def load(db):
+        rows = [(1, 10, "Manila", None), (2, 20, "Manila", None)]
+        if board.loaded:
+            # This process commits while the reload is reading; the old index still serves
+            board.update(1, 50, "Manila", None)
+            assert board.position(1)["points"] == 50
+        return rows
+
+    board = Leaderboard(load, max_age=0.0)
+    board.ensure_loaded(None)
+    board.ensure_loaded(None)
+
+    assert board.top(("city", "Manila")) == [
+        {"rank": 1, "user_id": 1, "points": 50}, {"rank": 2, "user_id": 2, "points": 20},
+    ]
+
+
+def test_bulk_built_index_matches_inserts():
+    keys = sorted((-(n * 7919 % 500), n) for n in range(2000))
+    built = RankedIndex.from_sorted(keys)
+    inserted = RankedIndex()
+    for key in reversed(keys):
+        inserted.insert(key)
+
+    for start in (0, 1, 999, 1998, 1999):
+        assert built.slice(start, 5) == inserted.slice(start, 5) == keys[start:start + 5]
+    for key in keys[::97]:
+        assert built.count_less(key) == inserted.count_less(key) == keys.index(key)
+    # Still a valid skip list for incremental updates
+    built.remove(keys[10])
+    built.insert((1, 10**6))
+    assert built.slice(0, len(built)) == keys[:10] + keys[11:] + [(1, 10**6)]
+
+
+def test_refresh_reads_only_changed_users():
+    table = {1: 10, 2: 20, 3: 30}
+    history = []  # user ids, in points_history id order
+    reads = []
+
+    def changes(db, after):
+        if after is None:
+            return [], len(history)
+        changed = sorted(set(history[after:]))
+        reads.append(changed)
+        return [(user_id, table[user_id], None, None) for user_id in changed], len(history)
+
+    board = Leaderboard(
+        lambda db: [(user_id, points, None, None) for user_id, points in table.items()],
+        changes=changes, refresh_interval=0.0,
+    )
+    board.ensure_loaded(None)
+    table[1] = 50  # awarded by another worker
+    history.append(1)
+
+    board.ensure_loaded(None)
+
+    assert reads == [[1]]
+    assert [entry["user_id"] for entry in board.top(GLOBAL_SCOPE)] == [1, 3, 2]
+
+
+def test_other_workers_awards_reach_the_endpoint(client, main, make_user, monkeypatch):
+    user = make_user()
+    client.get("/api/leaderboard", headers=user["headers"])
+    monkeypatch.setattr(main.leaderboard, "refresh_interval", 0.0)
+
+    # Another worker's award: straight to the database, no commit hooks in this process
+    with main.engine.begin() as conn:
+        conn.execute(main.User.__table__.update().where(main.User.__table__.c.id == user["id"]).values(points=10**6))
+        conn.execute(main.PointsHistory.__table__.insert().values(
+            user_id=user["id"], type="task", description="Elsewhere", points=10**6, created_at=main.datetime.utcnow(),
+        ))
+
+    board = client.get("/api/leaderboard", headers=user["headers"]).json()
+    assert board["entries"][0]["userId"] == user["id"]
+    assert board["me"]["rank"] == 1
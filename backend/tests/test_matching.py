@@ -0,0 +1,51 @@
+"""
+BuddyMatcher (matching.py) reloads: another worker's profile changes only reach
+this process's columns through a reload once the snapshot is max_age old.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from matching import BuddyMatcher
+
+pytestmark = pytest.mark.skipif(not BuddyMatcher(list).available, reason="suggestions need NumPy")
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def user(user_id: int, is_active: bool = True) -> tuple:
+    return (user_id, 14.6, 121.0, "Manila", "Ermita", 100, is_active, NOW)
+
+
+def suggested(matcher: BuddyMatcher, user_id: int) -> list[int]:
+    return [candidate["user_id"] for candidate in matcher.suggest(user_id, now=NOW)]
+
+
+def test_reload_picks_up_other_workers_changes():
+    table = {1: user(1), 2: user(2, is_active=False)}
+    matcher = BuddyMatcher(lambda db: list(table.values()), max_age=0.0)
+    matcher.ensure_loaded(None)
+    assert suggested(matcher, 1) == []
+
+    table[2] = user(2)  # committed by another worker: no apply() here
+    table[3] = user(3)
+    matcher.ensure_loaded(None)
+
+    assert sorted(suggested(matcher, 1)) == [2, 3]
+
+
+def test_commits_during_a_reload_are_replayed_on_the_new_snapshot():
+    matcher = None
+
+    def load(db):
+        if matcher.loaded:
+            matcher.apply([("remove", 2)])
+        return [user(1), user(2)]
+
+    matcher = BuddyMatcher(load, max_age=0.0)
+    matcher.ensure_loaded(None)
+    assert suggested(matcher, 1) == [2]
+    matcher.ensure_loaded(None)
+
+    assert suggested(matcher, 1) == []
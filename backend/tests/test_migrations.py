@@ -0,0 +1,205 @@
+"""
+Schema migrations (migrations.py) against fresh file-backed SQLite databases,
+including databases created by api/index.py before it served the backend app.
+"""
+
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+import migrations
+
+# api/index.py's own tables, as its create_all left them before join tables
+INDEX_DATABASE = [
+    """CREATE TABLE users (
+        id INTEGER PRIMARY KEY, email VARCHAR NOT NULL UNIQUE, first_name VARCHAR NOT NULL,
+        last_name VARCHAR NOT NULL, phone VARCHAR, barangay VARCHAR, city VARCHAR, location VARCHAR,
+        bio VARCHAR, hashed_password VARCHAR NOT NULL, points INTEGER, rank VARCHAR,
+        is_verified BOOLEAN, is_active BOOLEAN, created_at DATETIME
+    )""",
+    """CREATE TABLE global_alerts (
+        id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, created_by VARCHAR NOT NULL, type VARCHAR NOT NULL,
+        priority VARCHAR NOT NULL, title VARCHAR NOT NULL, message VARCHAR NOT NULL, affected_areas VARCHAR,
+        is_active BOOLEAN, acknowledged_by VARCHAR, created_at DATETIME
+    )""",
+    """CREATE TABLE community_tasks (
+        id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR NOT NULL, location VARCHAR NOT NULL,
+        urgency VARCHAR NOT NULL, points INTEGER NOT NULL, status VARCHAR, volunteers VARCHAR, created_at DATETIME
+    )""",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def index_engine(engine):
+    with engine.begin() as conn:
+        for statement in INDEX_DATABASE:
+            conn.execute(text(statement))
+        conn.execute(text(
+            "INSERT INTO global_alerts (id, user_id, created_by, type, priority, title, message, is_active, "
+            "acknowledged_by, created_at) VALUES "
+            "(1, 1, 'Ana', 'weather', 'high', 'Flood', 'Evacuate', 1, '[1, 2, 2, \"x\"]', '2024-06-01 08:00:00'), "
+            "(2, 1, 'Ana', 'weather', 'low', 'Rain', 'Stay in', 1, NULL, '2024-06-01 09:00:00')"
+        ))
+        conn.execute(text(
+            "INSERT INTO community_tasks (id, title, description, location, urgency, points, status, volunteers, "
+            "created_at) VALUES "
+            "(1, 'Supplies', 'Deliver water', 'Brgy. 1', 'high', 75, 'open', '[3, 1]', '2024-06-01 08:00:00'), "
+            "(2, 'Cleanup', 'Sweep the hall', 'Brgy. 2', 'low', 35, 'open', '[]', '2024-06-01 08:00:00')"
+        ))
+    return engine
+
+
+def rows(engine, sql: str) -> list[tuple]:
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(sql))]
+
+
+def columns(engine, table: str) -> set[str]:
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def schema(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        table: (columns(engine, table), {index["name"] for index in inspector.get_indexes(table)})
+        for table in inspector.get_table_names()
+    }
+
+
+def test_full_round_trip(engine):
+    assert migrations.upgrade(engine) == [migration.version for migration in migrations.MIGRATIONS]
+    upgraded = schema(engine)
+    assert migrations.is_current(engine)
+
+    assert migrations.downgrade(engine, 0) == [migration.version for migration in reversed(migrations.MIGRATIONS)]
+    assert migrations.current_version(engine) == 0
+    assert set(schema(engine)) == {"schema_version"}
+
+    migrations.upgrade(engine)
+    assert schema(engine) == upgraded
+
+
+def test_upgrade_is_idempotent(engine):
+    migrations.upgrade(engine)
+    assert migrations.upgrade(engine) == []
+
+
+def test_index_database_round_trips_through_every_version(index_engine):
+    migrations.upgrade(index_engine)
+    upgraded = {table: table_columns for table, (table_columns, _) in schema(index_engine).items()}
+
+    migrations.downgrade(index_engine, 0)
+    migrations.upgrade(index_engine)
+
+    # Same tables and columns; the recreated baseline tables also get the indexes create_all never made
+    assert {table: table_columns for table, (table_columns, _) in schema(index_engine).items()} == upgraded
+
+
+def test_0013_turns_index_json_arrays_into_records(index_engine):
+    migrations.upgrade(index_engine)
+
+    assert rows(index_engine, "SELECT alert_id, user_id FROM alert_acknowledgements ORDER BY 1, 2") == [(1, 1), (1, 2)]
+    assert rows(index_engine, "SELECT id, acknowledged_count FROM global_alerts ORDER BY id") == [(1, 2), (2, 0)]
+    assert rows(index_engine, "SELECT task_id, user_id FROM community_task_volunteers ORDER BY 1, 2") == [(1, 1), (1, 3)]
+    # Every volunteer is kept and nothing is assigned on their behalf
+    assert rows(index_engine, "SELECT id, volunteers_count, status, volunteer_id FROM community_tasks ORDER BY id") == [
+        (1, 2, "open", None), (2, 0, "open", None),
+    ]
+    assert "acknowledged_by" not in columns(index_engine, "global_alerts")
+    assert "volunteers" not in columns(index_engine, "community_tasks")
+
+
+def test_0013_records_volunteers_assigned_before_it(engine):
+    migrations.upgrade(engine, 12)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO community_tasks (id, title, description, location, urgency, points, status, volunteer_id) "
+            "VALUES (1, 'Supplies', 'Deliver water', 'Brgy. 1', 'high', 75, 'assigned', 7), "
+            "(2, 'Cleanup', 'Sweep the hall', 'Brgy. 2', 'low', 35, 'open', NULL)"
+        ))
+
+    assert migrations.upgrade(engine, 13) == [13]
+
+    assert rows(engine, "SELECT task_id, user_id FROM community_task_volunteers") == [(1, 7)]
+    assert rows(engine, "SELECT id, volunteers_count FROM community_tasks ORDER BY id") == [(1, 1), (2, 0)]
+
+
+def test_0013_downgrade_keeps_every_volunteer(index_engine):
+    migrations.upgrade(index_engine, 13)
+
+    assert migrations.downgrade(index_engine, 12) == [13]
+    assert "community_task_volunteers" not in inspect(index_engine).get_table_names()
+    assert {task_id: json.loads(value) for task_id, value in rows(
+        index_engine, "SELECT id, volunteers FROM community_tasks WHERE volunteers IS NOT NULL"
+    )} == {1: [3, 1]}
+
+    migrations.upgrade(index_engine)
+    assert rows(index_engine, "SELECT task_id, user_id FROM community_task_volunteers ORDER BY 1, 2") == [(1, 1), (1, 3)]
+    assert rows(index_engine, "SELECT id, volunteers_count FROM community_tasks ORDER BY id") == [(1, 2), (2, 0)]
+
+
+def test_0014_keys_barangays_by_city(engine):
+    migrations.upgrade(engine, 13)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, first_name, last_name, hashed_password, city, barangay) VALUES "
+            "(1, 'a@example.com', 'A', 'User', 'x', 'Pasig City', 'Brgy. San Miguel'), "
+            "(2, 'b@example.com', 'B', 'User', 'x', NULL, 'San Miguel')"
+        ))
+    migrations.downgrade(engine, 7)
+    migrations.upgrade(engine, 13)
+    assert rows(engine, "SELECT area, user_id FROM user_areas ORDER BY 2, 1") == [
+        ("pasig", 1), ("san miguel", 1), ("san miguel", 2),
+    ]
+
+    assert migrations.upgrade(engine) == [14]
+    assert rows(engine, "SELECT area, user_id FROM user_areas ORDER BY 2, 1") == [
+        ("pasig", 1), ("pasig|san miguel", 1), ("san miguel", 2),
+    ]
+
+
+def test_schema_gate_trusts_a_current_verified_version(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    migrations.SchemaGate(engine, verified_version=migrations.LATEST_VERSION).ensure()
+    assert statements == []
+
+    # A stamp older than this build's migrations is checked, and the database upgraded
+    migrations.SchemaGate(engine, verified_version=migrations.LATEST_VERSION - 1).ensure()
+    assert migrations.current_version(engine) == migrations.LATEST_VERSION
+
+
+def test_concurrent_upgrades_apply_each_step_once(tmp_path):
+    # One engine per thread, like separate worker processes starting on a fresh database
+    engines = [create_engine(f"sqlite:///{tmp_path / 'shared.db'}") for _ in range(4)]
+    start = threading.Barrier(len(engines))
+    applied, errors = [], []
+
+    def run(engine):
+        start.wait()
+        try:
+            applied.extend(migrations.upgrade(engine))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(engine,)) for engine in engines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(applied) == [migration.version for migration in migrations.MIGRATIONS]
+    assert migrations.is_current(engines[0])
+    for engine in engines:
+        engine.dispose()
@@ -0,0 +1,69 @@
+"""
+Keyset pagination (pagination.py): walking next_cursor visits every row once,
+newest first, including rows that share a created_at; the buddy search runs
+server-side so it finds users past the first page.
+"""
+
+from datetime import datetime
+
+
+def walk(client, path: str, limit: int) -> list[dict]:
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({"after": cursor} if cursor else {})}
+        page = client.get(path, params=params).json()
+        assert len(page["items"]) <= limit
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+        assert pages < 1000
+
+
+def test_cursor_walk_visits_every_row_once(client, main):
+    created_at = datetime(2001, 1, 1, 12, 0)
+    with main.SessionLocal() as db:
+        requests = [main.HelpRequest(
+            user_id=1, user_name="Test User", type="general", title=f"Tie {n}", description="Same second",
+            location="Here", urgency="low", created_at=created_at,
+        ) for n in range(7)]
+        db.add_all(requests)
+        db.commit()
+        tied = [request.id for request in requests]
+
+    for limit in (1, 2, 3, 50):
+        items = walk(client, "/api/help-requests", limit)
+        ids = [item["id"] for item in items]
+        assert len(ids) == len(set(ids))
+        # Ties on created_at fall back to the id, newest first
+        assert [item_id for item_id in ids if item_id in tied] == sorted(tied, reverse=True)
+        keys = [(item["created_at"], item["id"]) for item in items]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    response = client.get("/api/help-requests", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_user_search_reaches_past_the_first_page(client, main, make_user):
+    searcher = make_user()
+    with main.SessionLocal() as db:
+        target = main.User(email="zebediah@example.com", first_name="Zebediah", last_name="100%_Real",
+                           hashed_password="unused", created_at=datetime(2001, 1, 1))
+        db.add(target)
+        db.add_all(main.User(email=f"filler{n}@example.com", first_name="Filler", last_name=str(n),
+                             hashed_password="unused") for n in range(60))
+        db.commit()
+        target_id = target.id
+
+    first_page = client.get("/api/users/buddies", headers=searcher["headers"]).json()
+    assert target_id not in [user["id"] for user in first_page["items"]]
+
+    for q in ("zebediah", "ZEBEDIAH 100%_real", "zebediah@example"):
+        found = client.get("/api/users/buddies", params={"q": q}, headers=searcher["headers"]).json()
+        assert [user["id"] for user in found["items"]] == [target_id], q
+    # LIKE wildcards in the query are matched literally
+    assert client.get("/api/users/buddies", params={"q": "_%"}, headers=searcher["headers"]).json()["items"] == []
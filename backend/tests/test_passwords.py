@@ -0,0 +1,86 @@
+"""
+Password hashing (passwords.py) through the login endpoint: legacy sha256 hashes
+and scrypt hashes with outdated parameters are upgraded on a successful login, and
+every kind of stored hash costs the same scrypt to check.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+import passwords
+
+
+def add_user(main, email: str, hashed_password: str) -> int:
+    with main.SessionLocal() as db:
+        user = main.User(email=email, first_name="Legacy", last_name="User", hashed_password=hashed_password)
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def stored_hash(main, user_id: int) -> str:
+    with main.SessionLocal() as db:
+        return db.get(main.User, user_id).hashed_password
+
+
+def login(client, email: str, password: str) -> int:
+    return client.post("/api/auth/login", json={"email": email, "password": password}).status_code
+
+
+@pytest.mark.parametrize("legacy_hash", [
+    hashlib.sha256(b"hunter2pepper").hexdigest() + ":pepper",  # salted, backend/app
+    hashlib.sha256(b"hunter2").hexdigest(),  # unsalted, api/index.py
+], ids=["salted", "unsalted"])
+def test_legacy_hash_is_upgraded_on_login(client, main, legacy_hash):
+    email = f"legacy-{len(legacy_hash)}@example.com"
+    user_id = add_user(main, email, legacy_hash)
+
+    assert login(client, email, "wrong") == 401
+    assert stored_hash(main, user_id) == legacy_hash
+
+    assert login(client, email, "hunter2") == 200
+    upgraded = stored_hash(main, user_id)
+    assert upgraded.startswith("scrypt$")
+    assert not passwords.needs_rehash(upgraded)
+    assert login(client, email, "hunter2") == 200
+    assert stored_hash(main, user_id) == upgraded
+
+
+def test_outdated_scrypt_parameters_are_upgraded_on_login(client, main):
+    weaker = passwords.ScryptHasher(n=passwords.hasher.n // 2).hash("hunter2")
+    user_id = add_user(main, "weaker-scrypt@example.com", weaker)
+
+    assert login(client, "weaker-scrypt@example.com", "hunter2") == 200
+
+    upgraded = stored_hash(main, user_id)
+    assert upgraded != weaker
+    assert upgraded.split("$")[1] == str(passwords.hasher.n)
+
+
+def test_unknown_email_is_rejected_like_a_wrong_password(client, make_user):
+    user = make_user()
+    assert login(client, "nobody@example.com", user["password"]) == 401
+    assert login(client, user["email"], "wrong") == 401
+
+
+@pytest.mark.parametrize("encoded", [
+    None,  # unknown email
+    hashlib.sha256(b"hunter2pepper").hexdigest() + ":pepper",
+    hashlib.sha256(b"hunter2").hexdigest(),
+    passwords.hasher.hash("hunter2"),
+], ids=["unknown", "salted", "unsalted", "scrypt"])
+def test_every_verification_costs_one_scrypt_in_the_pool(monkeypatch, encoded):
+    derives, jobs = [], []
+    derive, run = passwords.ScryptHasher._derive, passwords.pool.run
+    monkeypatch.setattr(passwords.ScryptHasher, "_derive", lambda self, *args: derives.append(1) or derive(self, *args))
+
+    async def counted_run(fn, *args):
+        jobs.append(fn)
+        return await run(fn, *args)
+
+    monkeypatch.setattr(passwords.pool, "run", counted_run)
+
+    assert asyncio.run(passwords.verify_password("wrong", encoded)) is False
+    assert (len(jobs), len(derives)) == (1, 1)
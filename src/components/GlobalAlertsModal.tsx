@@ -65,12 +65,12 @@ const GlobalAlertsModal: React.FC<GlobalAlertsModalProps> = ({ isOpen, onClose,
     if (isOpen) {
       loadAlerts();
     }
-  }, [isOpen]);
+  }, [isOpen, filter]);
 
   const loadAlerts = async () => {
     setIsLoading(true);
     try {
-      const response = await apiService.getGlobalAlerts();
+      const response = await apiService.getGlobalAlerts(undefined, filter);
       if (response.data) {
         setAlerts(response.data);
       }
@@ -141,9 +141,17 @@ const GlobalAlertsModal: React.FC<GlobalAlertsModalProps> = ({ isOpen, onClose,
     return alertTypes.find(t => t.value === type) || alertTypes[2];
   };
 
+  // expires_at is a naive UTC timestamp
+  const expiryDate = (alert: Alert) => (alert.expires_at ? new Date(`${alert.expires_at}Z`) : null);
+
+  const isLive = (alert: Alert) => {
+    const expiry = expiryDate(alert);
+    return alert.is_active && (!expiry || expiry > new Date());
+  };
+
   const filteredAlerts = alerts.filter(alert => {
-    if (filter === 'active') return alert.is_active;
-    if (filter === 'expired') return !alert.is_active;
+    if (filter === 'active') return isLive(alert);
+    if (filter === 'expired') return !isLive(alert);
     return true;
   });
 
@@ -375,7 +383,7 @@ const GlobalAlertsModal: React.FC<GlobalAlertsModalProps> = ({ isOpen, onClose,
                   <div
                     key={alert.id}
                     className={`p-4 rounded-xl border-2 transition-all ${
-                      alert.is_active
+                      isLive(alert)
                         ? `${priorityColors[alert.priority]} border-current`
                         : 'bg-gray-100 border-gray-200 opacity-60'
                     }`}
@@ -390,7 +398,7 @@ const GlobalAlertsModal: React.FC<GlobalAlertsModalProps> = ({ isOpen, onClose,
                           <span className={`px-2 py-0.5 rounded-full text-xs font-medium ${priorityColors[alert.priority]}`}>
                             {alert.priority}
                           </span>
-                          {!alert.is_active && (
+                          {!isLive(alert) && (
                             <span className="px-2 py-0.5 rounded-full text-xs font-medium bg-gray-200 text-gray-600">
                               Expired
                             </span>
@@ -404,7 +412,7 @@ const GlobalAlertsModal: React.FC<GlobalAlertsModalProps> = ({ isOpen, onClose,
                           {alert.expires_at && (
                             <>
                               <span>•</span>
-                              <span>Expires: {alert.expires_at}</span>
+                              <span>Expires: {expiryDate(alert)?.toLocaleString()}</span>
                             </>
                           )}
                         </div>
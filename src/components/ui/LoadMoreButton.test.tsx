@@ -0,0 +1,31 @@
+import React from 'react';
+import { render, screen, fireEvent } from '@testing-library/react';
+import LoadMoreButton from './LoadMoreButton';
+
+describe('LoadMoreButton Component', () => {
+  const mockOnClick = jest.fn();
+
+  beforeEach(() => {
+    mockOnClick.mockClear();
+  });
+
+  test('renders nothing when there is no next page', () => {
+    render(<LoadMoreButton hasMore={false} loading={false} onClick={mockOnClick} />);
+
+    expect(screen.queryByRole('button')).not.toBeInTheDocument();
+  });
+
+  test('calls onClick when clicked', () => {
+    render(<LoadMoreButton hasMore={true} loading={false} onClick={mockOnClick} label="Load older" />);
+
+    fireEvent.click(screen.getByText('Load older'));
+    expect(mockOnClick).toHaveBeenCalledTimes(1);
+  });
+
+  test('is disabled while the next page loads', () => {
+    render(<LoadMoreButton hasMore={true} loading={true} onClick={mockOnClick} />);
+
+    expect(screen.getByRole('button')).toBeDisabled();
+    expect(screen.getByText('Loading...')).toBeInTheDocument();
+  });
+});
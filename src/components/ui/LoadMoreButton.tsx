@@ -0,0 +1,28 @@
+import React from 'react';
+
+interface LoadMoreButtonProps {
+  hasMore: boolean;
+  loading: boolean;
+  onClick: () => void;
+  label?: string;
+}
+
+// Sits under a cursor-paginated list while the server still reports a next page
+const LoadMoreButton: React.FC<LoadMoreButtonProps> = ({ hasMore, loading, onClick, label = 'Load more' }) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center pt-4">
+      <button
+        type="button"
+        onClick={onClick}
+        disabled={loading}
+        className="btn-outline px-6 py-2 text-sm disabled:opacity-50 disabled:cursor-not-allowed"
+      >
+        {loading ? 'Loading...' : label}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
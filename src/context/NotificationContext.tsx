@@ -19,30 +19,31 @@ export const NotificationProvider: React.FC<{ children: ReactNode }> = ({ childr
   const [notifications, setNotifications] = useState<Notification[]>(mockNotifications);
   const { user } = useAuth();
 
-  const unreadCount = notifications.filter(n => !n.isRead).length;
+  const [serverUnreadCount, setServerUnreadCount] = useState<number | null>(null);
 
-  // Fetch notifications from backend
+  const unreadCount = serverUnreadCount ?? notifications.filter(n => !n.isRead).length;
+
+  // Fetch notifications from backend, then follow the live stream
   useEffect(() => {
     if (!user) return;
 
+    // Convert backend notifications to frontend format
+    const formatNotification = (n: any): Notification => ({
+      id: n.id.toString(),
+      type: n.type as Notification['type'],
+      title: n.title,
+      message: n.message,
+      timestamp: n.createdAt ?? n.created_at,
+      isRead: n.isRead ?? n.is_read,
+      data: n.data,
+      actionUrl: n.action_url
+    });
+
     const fetchNotifications = async () => {
       try {
         const response = await apiService.getNotifications();
         if (!response.data) return;
-        
-        // Convert backend notifications to frontend format
-        const formattedNotifications = response.data.map((n: any) => ({
-          id: n.id.toString(),
-          type: n.type as Notification['type'],
-          title: n.title,
-          message: n.message,
-          timestamp: n.created_at,
-          isRead: n.is_read,
-          data: n.data,
-          actionUrl: n.action_url
-        }));
-        
-        setNotifications(formattedNotifications);
+        setNotifications(response.data.map(formatNotification));
       } catch (error) {
         console.error('Failed to fetch notifications:', error);
         // Keep using mock data on error
@@ -50,10 +51,26 @@ export const NotificationProvider: React.FC<{ children: ReactNode }> = ({ childr
     };
 
     fetchNotifications();
-    
-    // Poll for new notifications every 30 seconds
-    const interval = setInterval(fetchNotifications, 30000);
-    return () => clearInterval(interval);
+
+    const stream = apiService.openNotificationStream();
+    if (!stream) {
+      // No EventSource support: poll for new notifications every 30 seconds
+      const interval = setInterval(fetchNotifications, 30000);
+      return () => clearInterval(interval);
+    }
+
+    stream.addEventListener('notification', (event) => {
+      const incoming = formatNotification(JSON.parse((event as MessageEvent).data));
+      setNotifications(prev => [incoming, ...prev.filter(n => n.id !== incoming.id)]);
+    });
+    stream.addEventListener('unread_count', (event) => {
+      setServerUnreadCount(JSON.parse((event as MessageEvent).data).unreadCount);
+    });
+
+    return () => {
+      stream.close();
+      setServerUnreadCount(null);
+    };
   }, [user]);
 
   const addNotification = (notification: Omit<Notification, 'id' | 'timestamp' | 'isRead'>) => {
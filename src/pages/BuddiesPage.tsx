@@ -1,9 +1,10 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Search, UserPlus, MessageCircle, Phone, MapPin, Star, CheckCircle } from 'lucide-react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import Layout from '../components/layout/Layout';
 import BuddyCard from '../components/buddies/BuddyCard';
 import Modal from '../components/ui/Modal';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
 import { mockBuddies } from '../data/mockData';
 import { Buddy } from '../types';
 import { apiService } from '../services/api';
@@ -31,10 +32,13 @@ const BuddiesPage: React.FC = () => {
   const [activeSessions, setActiveSessions] = useState<any[]>([]);
   const [loading, setLoading] = useState(false);
   const [buddies, setBuddies] = useState<Buddy[]>([]);
+  const [buddiesCursor, setBuddiesCursor] = useState<string | null>(null);
+  const [loadingMoreBuddies, setLoadingMoreBuddies] = useState(false);
   
   // Add buddy search state
   const [buddySearchQuery, setBuddySearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState<SearchableUser[]>([]);
+  const latestBuddySearch = useRef('');
 
   const [checkInData, setCheckInData] = useState({
     mood: 'good',
@@ -68,9 +72,10 @@ const BuddiesPage: React.FC = () => {
     }
   };
 
-  const fetchBuddies = async () => {
+  // Without a cursor this (re)loads the first page; with one it appends the next page
+  const fetchBuddies = async (after?: string) => {
     try {
-      const response = await apiService.getBuddies();
+      const response = await apiService.getBuddies(after ? { after } : undefined);
       if (response.data) {
         // Convert backend buddy data to frontend Buddy type
         const formattedBuddies: Buddy[] = response.data.map((buddy: any) => ({
@@ -90,13 +95,21 @@ const BuddiesPage: React.FC = () => {
           verifiedSince: new Date().toISOString(),
           lastActive: new Date().toISOString(),
         }));
-        setBuddies(formattedBuddies);
+        setBuddies(prev => (after ? [...prev, ...formattedBuddies] : formattedBuddies));
+        setBuddiesCursor(response.nextCursor ?? null);
       }
     } catch (error) {
       console.error('Failed to fetch buddies:', error);
     }
   };
 
+  const loadMoreBuddies = async () => {
+    if (!buddiesCursor) return;
+    setLoadingMoreBuddies(true);
+    await fetchBuddies(buddiesCursor);
+    setLoadingMoreBuddies(false);
+  };
+
   const filteredBuddies = buddies.filter(buddy => {
     const matchesSearch = buddy.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
       (buddy.location?.toLowerCase().includes(searchQuery.toLowerCase()) || false);
@@ -104,23 +117,22 @@ const BuddiesPage: React.FC = () => {
     return matchesSearch && matchesStatus;
   });
 
-  // Handle buddy search - searches through real users from backend
+  // Handle buddy search - the backend matches name, email or location across every user
   const handleBuddySearch = async (query: string) => {
     setBuddySearchQuery(query);
+    latestBuddySearch.current = query;
     
-    if (query.length === 0) {
+    if (query.trim().length === 0) {
       setSearchResults([]);
       return;
     }
     
-    const searchLower = query.toLowerCase();
-    
     try {
-      // Fetch all users from backend
-      const response = await apiService.getBuddies();
+      const response = await apiService.getBuddies({ limit: 20 }, query.trim());
+      // A slower response to an earlier keystroke must not replace newer results
+      if (latestBuddySearch.current !== query) return;
       if (response.data) {
-        // Convert to SearchableUser format and filter
-        const allUsers: SearchableUser[] = response.data.map((user: any) => ({
+        const matches: SearchableUser[] = response.data.map((user: any) => ({
           id: user.id.toString(),
           name: user.name,
           email: user.email,
@@ -131,14 +143,7 @@ const BuddiesPage: React.FC = () => {
         // Filter out users who are already buddies
         const existingBuddyIds = buddies.map(b => b.userId);
         
-        const results = allUsers.filter(user => {
-          const isAlreadyBuddy = existingBuddyIds.includes(user.id);
-          const matchesName = user.name.toLowerCase().includes(searchLower);
-          const matchesEmail = user.email?.toLowerCase().includes(searchLower);
-          const matchesLocation = user.location?.toLowerCase().includes(searchLower);
-          
-          return !isAlreadyBuddy && (matchesName || matchesEmail || matchesLocation);
-        });
+        const results = matches.filter(user => !existingBuddyIds.includes(user.id));
         
         setSearchResults(results);
       }
@@ -335,6 +340,13 @@ const BuddiesPage: React.FC = () => {
           ))}
         </div>
 
+        <LoadMoreButton
+          hasMore={buddiesCursor !== null}
+          loading={loadingMoreBuddies}
+          onClick={loadMoreBuddies}
+          label="Load more buddies"
+        />
+
         {filteredBuddies.length === 0 && (
           <div className="text-center py-12 md:py-16">
             <div className="w-14 h-14 md:w-16 md:h-16 rounded-full bg-deep-slate/10 flex items-center justify-center mx-auto mb-3 md:mb-4">
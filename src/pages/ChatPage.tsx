@@ -7,6 +7,7 @@ import Layout from '../components/layout/Layout';
 import { useAuth } from '../context/AuthContext';
 import { timeAgo } from '../utils/helpers';
 import apiService from '../services/api';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
 
 interface Message {
   id: number;
@@ -37,6 +38,18 @@ interface Buddy {
   rank: string;
 }
 
+// Where the next older page of a thread comes from: live messages, then the archive
+type MessagesPage = { source: 'live' | 'archive'; after?: string };
+
+// Oldest first, one copy per id: pages and pushed messages overlap at their edges
+const mergeMessages = (...lists: Message[][]): Message[] => {
+  const byId = new Map<number, Message>();
+  lists.forEach(list => list.forEach(message => byId.set(message.id, message)));
+  return Array.from(byId.values()).sort((a, b) => (
+    a.created_at === b.created_at ? a.id - b.id : a.created_at < b.created_at ? -1 : 1
+  ));
+};
+
 const ChatPage: React.FC = () => {
   const { user } = useAuth();
   const [searchQuery, setSearchQuery] = useState('');
@@ -45,36 +58,152 @@ const ChatPage: React.FC = () => {
   const [messages, setMessages] = useState<Message[]>([]);
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [buddies, setBuddies] = useState<Buddy[]>([]);
+  const [buddiesCursor, setBuddiesCursor] = useState<string | null>(null);
+  const [loadingMoreBuddies, setLoadingMoreBuddies] = useState(false);
+  const [olderMessagesPage, setOlderMessagesPage] = useState<MessagesPage | null>(null);
+  const [loadingOlderMessages, setLoadingOlderMessages] = useState(false);
   const [loading, setLoading] = useState(true);
   const [sending, setSending] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const [isMobileConversationOpen, setIsMobileConversationOpen] = useState(false);
   const [error, setError] = useState('');
 
+  const [socketConnected, setSocketConnected] = useState(false);
+  const selectedConversationRef = useRef<Conversation | null>(null);
+  const conversationsRef = useRef<Conversation[]>([]);
+
+  useEffect(() => {
+    selectedConversationRef.current = selectedConversation;
+  }, [selectedConversation]);
+
+  useEffect(() => {
+    conversationsRef.current = conversations;
+  }, [conversations]);
+
   // Load conversations and buddies
   useEffect(() => {
     loadConversations();
     loadBuddies();
-    // Refresh conversations every 5 seconds
+  }, []);
+
+  // Realtime push channel; polling below only runs while it is down
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryDelay = 1000;
+    let closed = false;
+
+    const connect = () => {
+      socket = apiService.openRealtimeSocket();
+      if (!socket) return;
+
+      socket.onopen = () => {
+        retryDelay = 1000;
+        setSocketConnected(true);
+        // Catch up on anything sent while disconnected
+        loadConversations();
+        const current = selectedConversationRef.current;
+        if (current) {
+          loadMessages(current.participant_id, true);
+        }
+      };
+
+      socket.onmessage = (event) => {
+        try {
+          handleRealtimeEvent(JSON.parse(event.data));
+        } catch (err) {
+          console.error('Failed to handle realtime event:', err);
+        }
+      };
+
+      socket.onclose = () => {
+        setSocketConnected(false);
+        if (!closed) {
+          retryTimer = setTimeout(connect, retryDelay);
+          retryDelay = Math.min(retryDelay * 2, 30000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, []);
+
+  // Fallback: refresh conversations every 5 seconds
+  useEffect(() => {
+    if (socketConnected) return;
     const interval = setInterval(loadConversations, 5000);
     return () => clearInterval(interval);
-  }, []);
+  }, [socketConnected]);
 
   // Load messages when conversation is selected
   useEffect(() => {
     if (selectedConversation) {
       loadMessages(selectedConversation.participant_id);
-      // Refresh messages every 3 seconds when conversation is open
+      if (socketConnected) return;
+      // Fallback: refresh messages every 3 seconds when conversation is open
       const interval = setInterval(() => {
         loadMessages(selectedConversation.participant_id, true);
       }, 3000);
       return () => clearInterval(interval);
     }
-  }, [selectedConversation]);
+  }, [selectedConversation, socketConnected]);
+
+  const handleRealtimeEvent = (payload: { event: string; data?: any }) => {
+    const myId = parseInt(user?.id || '0');
+    const current = selectedConversationRef.current;
+
+    if (payload.event === 'message.new') {
+      const message: Message = payload.data;
+      const otherId = message.sender_id === myId ? message.receiver_id : message.sender_id;
+      const incoming = message.receiver_id === myId;
+      const isOpen = current !== null && current.participant_id === otherId;
+      if (isOpen) {
+        setMessages(prev => mergeMessages(prev, [message]));
+        if (incoming) {
+          apiService.markConversationRead(otherId).catch(err => console.error('Failed to mark messages read:', err));
+        }
+      }
+
+      // Bump the conversation in place; only one we haven't listed yet needs a fetch
+      const known = conversationsRef.current.some(c => c.id === message.conversation_id);
+      if (!known) {
+        loadConversations();
+        return;
+      }
+      setConversations(prev => {
+        const conversation = prev.find(c => c.id === message.conversation_id);
+        if (!conversation) return prev;
+        const bumped = {
+          ...conversation,
+          last_message: message.content.slice(0, 100),
+          last_message_at: message.created_at,
+          unread_count: incoming && !isOpen ? conversation.unread_count + 1 : conversation.unread_count,
+        };
+        return [bumped, ...prev.filter(c => c.id !== conversation.id)];
+      });
+    } else if (payload.event === 'message.read') {
+      const { conversation_id, reader_id } = payload.data;
+      if (reader_id !== myId) {
+        setMessages(prev => prev.map(m => (
+          m.conversation_id === conversation_id && m.sender_id === myId ? { ...m, read: true } : m
+        )));
+      } else {
+        // Read here or in another tab
+        setConversations(prev => prev.map(c => (c.id === conversation_id ? { ...c, unread_count: 0 } : c)));
+      }
+    }
+  };
 
+  // Follow new messages to the bottom, but stay put when older pages load above them
+  const lastMessageId = messages.length > 0 ? messages[messages.length - 1].id : null;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [lastMessageId]);
 
   const loadConversations = async () => {
     try {
@@ -89,22 +218,38 @@ const ChatPage: React.FC = () => {
     }
   };
 
-  const loadBuddies = async () => {
+  const loadBuddies = async (after?: string) => {
     try {
-      const response = await apiService.getBuddies();
+      const response = await apiService.getBuddies(after ? { after } : undefined);
       if (response.data) {
-        setBuddies(response.data);
+        const page = response.data;
+        setBuddies(prev => (after ? [...prev, ...page] : page));
+        setBuddiesCursor(response.nextCursor ?? null);
       }
     } catch (err) {
       console.error('Failed to load buddies:', err);
     }
   };
 
+  const loadMoreBuddies = async () => {
+    if (!buddiesCursor) return;
+    setLoadingMoreBuddies(true);
+    await loadBuddies(buddiesCursor);
+    setLoadingMoreBuddies(false);
+  };
+
+  // The newest page of a thread; silent refreshes keep older pages already loaded above it
   const loadMessages = async (participantId: number, silent = false) => {
     try {
       const response = await apiService.getConversationMessages(participantId);
       if (response.data) {
-        setMessages(response.data);
+        const page: Message[] = response.data;
+        if (silent) {
+          setMessages(prev => mergeMessages(prev, page));
+        } else {
+          setMessages(page);
+          setOlderMessagesPage(response.nextCursor ? { source: 'live', after: response.nextCursor } : { source: 'archive' });
+        }
       }
     } catch (err) {
       if (!silent) {
@@ -113,6 +258,32 @@ const ChatPage: React.FC = () => {
     }
   };
 
+  const loadOlderMessages = async () => {
+    const current = selectedConversationRef.current;
+    if (!current || !olderMessagesPage) return;
+    setLoadingOlderMessages(true);
+    try {
+      const { source, after } = olderMessagesPage;
+      const options = after ? { after } : undefined;
+      const response = source === 'live'
+        ? await apiService.getConversationMessages(current.participant_id, options)
+        : await apiService.getOlderConversationMessages(current.participant_id, options);
+      if (response.data && selectedConversationRef.current === current) {
+        const page: Message[] = response.data;
+        setMessages(prev => mergeMessages(page, prev));
+        if (response.nextCursor) {
+          setOlderMessagesPage({ source, after: response.nextCursor });
+        } else {
+          setOlderMessagesPage(source === 'live' ? { source: 'archive' } : null);
+        }
+      }
+    } catch (err) {
+      console.error('Failed to load older messages:', err);
+    } finally {
+      setLoadingOlderMessages(false);
+    }
+  };
+
   const filteredConversations = conversations.filter(conv =>
     conv.participant_name.toLowerCase().includes(searchQuery.toLowerCase())
   );
@@ -137,7 +308,7 @@ const ChatPage: React.FC = () => {
       );
 
       if (response.data) {
-        setMessages(prev => [...prev, response.data!]);
+        setMessages(prev => (prev.some(m => m.id === response.data!.id) ? prev : [...prev, response.data!]));
         setNewMessage('');
         loadConversations();
       } else if (response.error) {
@@ -168,6 +339,7 @@ const ChatPage: React.FC = () => {
       setSelectedConversation(newConv);
       setIsMobileConversationOpen(true);
       setMessages([]);
+      setOlderMessagesPage(null);
     }
   };
 
@@ -247,7 +419,7 @@ const ChatPage: React.FC = () => {
                   <p className="text-deep-slate/60 mb-4">No conversations yet</p>
                   <p className="text-sm text-deep-slate/40 mb-4">Start a conversation with a buddy:</p>
                   <div className="space-y-2 max-h-64 overflow-y-auto">
-                    {buddies.slice(0, 5).map(buddy => (
+                    {buddies.map(buddy => (
                       <button
                         key={buddy.id}
                         onClick={() => startNewConversation(buddy)}
@@ -262,6 +434,12 @@ const ChatPage: React.FC = () => {
                         </div>
                       </button>
                     ))}
+                    <LoadMoreButton
+                      hasMore={buddiesCursor !== null}
+                      loading={loadingMoreBuddies}
+                      onClick={loadMoreBuddies}
+                      label="More buddies"
+                    />
                   </div>
                 </div>
               )}
@@ -302,6 +480,12 @@ const ChatPage: React.FC = () => {
                 </div>
 
                 <div className="flex-1 overflow-y-auto p-4 space-y-4 bg-warm-sand/30">
+                  <LoadMoreButton
+                    hasMore={olderMessagesPage !== null}
+                    loading={loadingOlderMessages}
+                    onClick={loadOlderMessages}
+                    label="Load older messages"
+                  />
                   {messages.length === 0 ? (
                     <div className="h-full flex items-center justify-center text-deep-slate/40">
                       <p>No messages yet. Start the conversation!</p>
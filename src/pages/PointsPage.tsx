@@ -9,12 +9,18 @@ import { mockPointsHistory, rankTiers } from '../data/mockData';
 import { getRankProgress, timeAgo } from '../utils/helpers';
 import { PointsHistory } from '../types';
 import apiService from '../services/api';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
+
+// Where the next page of history comes from: recent entries, then the archive
+type HistoryPage = { source: 'recent' | 'older'; after?: string };
 
 const PointsPage: React.FC = () => {
   const { user } = useAuth();
   const [activeTab, setActiveTab] = useState<'history' | 'rewards' | 'leaderboard'>('history');
   const [leaderboardView, setLeaderboardView] = useState<'national' | 'regional' | 'barangay'>('national');
   const [pointsHistory, setPointsHistory] = useState<PointsHistory[]>([]);
+  const [nextHistoryPage, setNextHistoryPage] = useState<HistoryPage | null>(null);
+  const [loadingMoreHistory, setLoadingMoreHistory] = useState(false);
 
   useEffect(() => {
     // Load points history from API
@@ -23,6 +29,7 @@ const PointsPage: React.FC = () => {
         const response = await apiService.getPointsHistory();
         if (response.data) {
           setPointsHistory(response.data);
+          setNextHistoryPage(response.nextCursor ? { source: 'recent', after: response.nextCursor } : { source: 'older' });
         } else if (response.error) {
           console.error('Failed to load points history:', response.error);
           // Fallback to mock data
@@ -38,6 +45,31 @@ const PointsPage: React.FC = () => {
     loadPointsHistory();
   }, []);
 
+  const loadMoreHistory = async () => {
+    if (!nextHistoryPage) return;
+    setLoadingMoreHistory(true);
+    try {
+      const { source, after } = nextHistoryPage;
+      const options = after ? { after } : undefined;
+      const response = source === 'recent'
+        ? await apiService.getPointsHistory(options)
+        : await apiService.getOlderPointsHistory(options);
+      if (response.data) {
+        const page: PointsHistory[] = response.data;
+        setPointsHistory(prev => [...prev, ...page]);
+        if (response.nextCursor) {
+          setNextHistoryPage({ source, after: response.nextCursor });
+        } else {
+          setNextHistoryPage(source === 'recent' ? { source: 'older' } : null);
+        }
+      }
+    } catch (error) {
+      console.error('Failed to load more points history:', error);
+    } finally {
+      setLoadingMoreHistory(false);
+    }
+  };
+
   const rankProgress = user ? getRankProgress(user.points, user.rank) : { current: 0, next: 100, percentage: 0 };
   const currentTierIndex = rankTiers.findIndex(t => t.name === user?.rank);
   const currentTier = rankTiers[currentTierIndex];
@@ -213,6 +245,16 @@ const PointsPage: React.FC = () => {
                 </div>
               )}
             </div>
+            {pointsHistory.length > 0 && (
+              <div className="p-3 sm:p-4 border-t border-deep-slate/10">
+                <LoadMoreButton
+                  hasMore={nextHistoryPage !== null}
+                  loading={loadingMoreHistory}
+                  onClick={loadMoreHistory}
+                  label="Show older activity"
+                />
+              </div>
+            )}
           </div>
         )}
 
@@ -13,6 +13,20 @@ import { useAuth } from '../context/AuthContext';
 import { useToast } from '../context/ToastContext';
 import { Task } from '../types';
 import apiService from '../services/api';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
+
+const toTask = (task: any): Task => ({
+  id: task.id.toString(),
+  title: task.title,
+  description: task.description,
+  category: task.category,
+  priority: task.priority,
+  status: task.status,
+  points: task.points,
+  dueDate: task.due_date,
+  assignedTo: task.assigned_to,
+  location: task.location,
+});
 
 const TasksPage: React.FC = () => {
   const location = useLocation();
@@ -24,6 +38,8 @@ const TasksPage: React.FC = () => {
   const [categoryFilter, setCategoryFilter] = useState<string>('all');
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [selectedTask, setSelectedTask] = useState<Task | null>(null);
+  const [tasksCursor, setTasksCursor] = useState<string | null>(null);
+  const [loadingMoreTasks, setLoadingMoreTasks] = useState(false);
 
   const [newTask, setNewTask] = useState({
     title: '',
@@ -66,18 +82,8 @@ const TasksPage: React.FC = () => {
       try {
         const response = await apiService.getTasks();
         if (response.data) {
-          setTasks(response.data.map((task: any) => ({
-            id: task.id.toString(),
-            title: task.title,
-            description: task.description,
-            category: task.category,
-            priority: task.priority,
-            status: task.status,
-            points: task.points,
-            dueDate: task.due_date,
-            assignedTo: task.assigned_to,
-            location: task.location,
-          })));
+          setTasks(response.data.map(toTask));
+          setTasksCursor(response.nextCursor ?? null);
         }
       } catch (error) {
         console.error('Failed to load tasks:', error);
@@ -87,6 +93,23 @@ const TasksPage: React.FC = () => {
     loadTasks();
   }, [setTasks]);
 
+  // Search, filters and stats cover the pages loaded so far
+  const loadMoreTasks = async () => {
+    if (!tasksCursor) return;
+    setLoadingMoreTasks(true);
+    try {
+      const response = await apiService.getTasks({ after: tasksCursor });
+      if (response.data) {
+        setTasks([...useTasksStore.getState().tasks, ...response.data.map(toTask)]);
+        setTasksCursor(response.nextCursor ?? null);
+      }
+    } catch (error) {
+      console.error('Failed to load more tasks:', error);
+    } finally {
+      setLoadingMoreTasks(false);
+    }
+  };
+
   const filteredTasks = tasks.filter(task => {
     const matchesSearch = task.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
       task.description.toLowerCase().includes(searchQuery.toLowerCase());
@@ -291,6 +314,13 @@ const TasksPage: React.FC = () => {
           ))}
         </div>
 
+        <LoadMoreButton
+          hasMore={tasksCursor !== null}
+          loading={loadingMoreTasks}
+          onClick={loadMoreTasks}
+          label="Load more tasks"
+        />
+
         {filteredTasks.length === 0 && (
           <div className="text-center py-16">
             <div className="w-16 h-16 rounded-full bg-deep-slate/10 flex items-center justify-center mx-auto mb-4">
@@ -3,6 +3,12 @@ import { API_BASE_URL } from '../config/api.config';
 interface ApiResponse<T> {
   data?: T;
   error?: string;
+  nextCursor?: string | null;
+}
+
+export interface PageOptions {
+  limit?: number;
+  after?: string;
 }
 
 class ApiService {
@@ -43,6 +49,23 @@ class ApiService {
     return { error: errorMessage };
   }
 
+  // List endpoints return { items, next_cursor }; older deployments return a bare array
+  private async handlePageResponse<T>(response: Response): Promise<ApiResponse<T[]>> {
+    const result = await this.handleResponse<any>(response);
+    if (!result.data || Array.isArray(result.data)) {
+      return result;
+    }
+    return { data: result.data.items, nextCursor: result.data.next_cursor };
+  }
+
+  private withPage(url: string, page?: PageOptions, filters: Record<string, string> = {}): string {
+    const params = new URLSearchParams(filters);
+    if (page?.limit) params.set('limit', page.limit.toString());
+    if (page?.after) params.set('after', page.after);
+    const query = params.toString();
+    return query ? `${url}?${query}` : url;
+  }
+
   setToken(token: string) {
     this.token = token;
     localStorage.setItem('safezoneph_token', token);
@@ -93,13 +116,13 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getTasks(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/tasks`, {
+  async getTasks(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/tasks`, page), {
       method: 'GET',
       headers: this.getHeaders(),
     });
 
-    return this.handleResponse(response);
+    return this.handlePageResponse(response);
   }
 
   async createTask(taskData: {
@@ -141,8 +164,32 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getPointsHistory(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/points/history`, {
+  async getPointsHistory(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/points/history`, page), {
+      method: 'GET',
+      headers: this.getHeaders(),
+    });
+
+    return this.handlePageResponse(response);
+  }
+
+  // Entries past retention, once getPointsHistory has run out of pages
+  async getOlderPointsHistory(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/points/history/older`, page), {
+      method: 'GET',
+      headers: this.getHeaders(),
+    });
+
+    return this.handlePageResponse(response);
+  }
+
+  async getLeaderboard(options: { city?: string; barangay?: string; limit?: number; offset?: number } = {}): Promise<ApiResponse<any>> {
+    const params = new URLSearchParams();
+    Object.entries(options).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') params.set(key, String(value));
+    });
+    const query = params.toString();
+    const response = await fetch(`${API_BASE_URL}/api/leaderboard${query ? `?${query}` : ''}`, {
       method: 'GET',
       headers: this.getHeaders(),
     });
@@ -151,13 +198,22 @@ class ApiService {
   }
 
   // Help Requests
-  async getHelpRequests(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/help-requests`, {
+  async getHelpRequests(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/help-requests`, page), {
       method: 'GET',
       headers: this.getHeaders(),
     });
 
-    return this.handleResponse(response);
+    return this.handlePageResponse(response);
+  }
+
+  async getOlderHelpRequests(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/help-requests/older`, page), {
+      method: 'GET',
+      headers: this.getHeaders(),
+    });
+
+    return this.handlePageResponse(response);
   }
 
   async createHelpRequest(requestData: {
@@ -167,6 +223,8 @@ class ApiService {
     location: string;
     urgency: string;
     responders_needed?: number;
+    latitude?: number;
+    longitude?: number;
   }): Promise<ApiResponse<any>> {
     const response = await fetch(`${API_BASE_URL}/api/help-requests`, {
       method: 'POST',
@@ -186,14 +244,36 @@ class ApiService {
     return this.handleResponse(response);
   }
 
+  async getNearbyHelpRequests(near: { lat: number; lng: number; radius_km?: number; limit?: number }): Promise<ApiResponse<any[]>> {
+    return this.getNearby('help-requests', near);
+  }
+
+  async getNearbyCommunityTasks(near: { lat: number; lng: number; radius_km?: number; limit?: number }): Promise<ApiResponse<any[]>> {
+    return this.getNearby('community-tasks', near);
+  }
+
+  private async getNearby(feed: string, near: { lat: number; lng: number; radius_km?: number; limit?: number }): Promise<ApiResponse<any[]>> {
+    const params = new URLSearchParams();
+    Object.entries(near).forEach(([key, value]) => {
+      if (value !== undefined) params.set(key, String(value));
+    });
+    const response = await fetch(`${API_BASE_URL}/api/${feed}/nearby?${params.toString()}`, {
+      method: 'GET',
+      headers: this.getHeaders(),
+    });
+
+    return this.handlePageResponse(response);
+  }
+
   // Global Alerts
-  async getGlobalAlerts(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/global-alerts`, {
+  async getGlobalAlerts(page?: PageOptions, status: 'active' | 'expired' | 'all' = 'active'): Promise<ApiResponse<any[]>> {
+    const url = this.withPage(`${API_BASE_URL}/api/global-alerts`, page);
+    const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}status=${status}`, {
       method: 'GET',
       headers: this.getHeaders(),
     });
 
-    return this.handleResponse(response);
+    return this.handlePageResponse(response);
   }
 
   async createGlobalAlert(alertData: {
@@ -232,13 +312,13 @@ class ApiService {
   }
 
   // Community Tasks
-  async getCommunityTasks(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/community-tasks`, {
+  async getCommunityTasks(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/community-tasks`, page), {
       method: 'GET',
       headers: this.getHeaders(),
     });
 
-    return this.handleResponse(response);
+    return this.handlePageResponse(response);
   }
 
   async createCommunityTask(taskData: {
@@ -247,6 +327,8 @@ class ApiService {
     location: string;
     urgency: string;
     points?: number;
+    latitude?: number;
+    longitude?: number;
   }): Promise<ApiResponse<any>> {
     const response = await fetch(`${API_BASE_URL}/api/community-tasks`, {
       method: 'POST',
@@ -266,6 +348,24 @@ class ApiService {
     return this.handleResponse(response);
   }
 
+  // Search. Snippets are HTML-escaped with matches wrapped in <mark>; messages are
+  // only searched when signed in, and only within the user's own conversations.
+  async search(
+    q: string,
+    options: { types?: Array<'help_request' | 'community_task' | 'alert' | 'message'>; limit?: number; offset?: number } = {}
+  ): Promise<ApiResponse<any>> {
+    const params = new URLSearchParams({ q });
+    options.types?.forEach(type => params.append('types', type));
+    if (options.limit) params.set('limit', options.limit.toString());
+    if (options.offset) params.set('offset', options.offset.toString());
+    const response = await fetch(`${API_BASE_URL}/api/search?${params.toString()}`, {
+      method: 'GET',
+      headers: this.getHeaders(),
+    });
+
+    return this.handleResponse(response);
+  }
+
   // ==========================================
   // BUDDY SESSION ENDPOINTS
   // ==========================================
@@ -293,11 +393,18 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getBuddySessions(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/buddy/sessions`, {
+  async getBuddySessions(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/buddy/sessions`, page), {
       headers: this.getHeaders(),
     });
-    return this.handleResponse(response);
+    return this.handlePageResponse(response);
+  }
+
+  async getOlderBuddySessions(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/buddy/sessions/older`, page), {
+      headers: this.getHeaders(),
+    });
+    return this.handlePageResponse(response);
   }
 
   async getActiveBuddySession(): Promise<ApiResponse<any>> {
@@ -361,6 +468,13 @@ class ApiService {
     return this.handleResponse(response);
   }
 
+  async getOlderNotifications(page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/notifications/older`, page), {
+      headers: this.getHeaders(),
+    });
+    return this.handlePageResponse(response);
+  }
+
   async getUnreadNotificationCount(): Promise<ApiResponse<{ unreadCount: number }>> {
     const response = await fetch(`${API_BASE_URL}/api/notifications/unread-count`, {
       headers: this.getHeaders(),
@@ -384,6 +498,17 @@ class ApiService {
     return this.handleResponse(response);
   }
 
+  // Server-Sent Events feed of new notifications and unread counts. EventSource
+  // resends Last-Event-ID on reconnect, so only missed notifications are replayed.
+  openNotificationStream(): EventSource | null {
+    if (!this.token || typeof EventSource === 'undefined') {
+      return null;
+    }
+    return new EventSource(
+      `${API_BASE_URL}/api/notifications/stream?token=${encodeURIComponent(this.token)}`
+    );
+  }
+
   async deleteNotification(notificationId: number): Promise<ApiResponse<any>> {
     const response = await fetch(`${API_BASE_URL}/api/notifications/${notificationId}`, {
       method: 'DELETE',
@@ -403,8 +528,23 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getConversationMessages(userId: number): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/conversations/${userId}/messages`, {
+  async getConversationMessages(userId: number, page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/conversations/${userId}/messages`, page), {
+      headers: this.getHeaders(),
+    });
+    return this.handlePageResponse(response);
+  }
+
+  async getOlderConversationMessages(userId: number, page?: PageOptions): Promise<ApiResponse<any[]>> {
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/conversations/${userId}/messages/older`, page), {
+      headers: this.getHeaders(),
+    });
+    return this.handlePageResponse(response);
+  }
+
+  async markConversationRead(userId: number): Promise<ApiResponse<any>> {
+    const response = await fetch(`${API_BASE_URL}/api/conversations/${userId}/read`, {
+      method: 'PUT',
       headers: this.getHeaders(),
     });
     return this.handleResponse(response);
@@ -422,8 +562,36 @@ class ApiService {
     return this.handleResponse(response);
   }
 
-  async getBuddies(): Promise<ApiResponse<any[]>> {
-    const response = await fetch(`${API_BASE_URL}/api/users/buddies`, {
+  // Push channel for new messages and read receipts. The token goes in the
+  // query string because browsers can't set headers on a WebSocket.
+  openRealtimeSocket(): WebSocket | null {
+    if (!this.token || typeof WebSocket === 'undefined') {
+      return null;
+    }
+    const base = (API_BASE_URL || window.location.origin).replace(/^http/, 'ws');
+    return new WebSocket(`${base}/api/ws?token=${encodeURIComponent(this.token)}`);
+  }
+
+  // search matches name, email or location across every user, not just the loaded page
+  async getBuddies(page?: PageOptions, search?: string): Promise<ApiResponse<any[]>> {
+    const filters: Record<string, string> = search ? { q: search } : {};
+    const response = await fetch(this.withPage(`${API_BASE_URL}/api/users/buddies`, page, filters), {
+      headers: this.getHeaders(),
+    });
+    return this.handlePageResponse(response);
+  }
+
+  // Ranked server-side; pass the current position to score proximity from there instead of home
+  async getBuddySuggestions(
+    options: { limit?: number; lat?: number; lng?: number } = {}
+  ): Promise<ApiResponse<any>> {
+    const params = new URLSearchParams();
+    if (options.limit) params.set('limit', options.limit.toString());
+    if (options.lat !== undefined && options.lng !== undefined) {
+      params.set('lat', options.lat.toString());
+      params.set('lng', options.lng.toString());
+    }
+    const response = await fetch(`${API_BASE_URL}/api/buddies/suggestions?${params.toString()}`, {
       headers: this.getHeaders(),
     });
     return this.handleResponse(response);